@@ -0,0 +1,330 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+from src.scraper.src.utils import color_print
+
+# Words searched in the project and screen names, most of them used by the generator
+SEARCH_QUERIES = ["check", "écran", "parametres", "mobile", "dash", "zzz"]
+
+
+def get_percentiles(durations):
+    """
+    Returns:
+        dict: The p50, p95 and p99 of the durations, in milliseconds.
+    """
+    if len(durations) == 1:
+        return {"p50": durations[0], "p95": durations[0], "p99": durations[0]}
+
+    quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]}
+
+
+class ApiBenchmark:
+    """
+    Drives the read routes of the API through the Flask test client.
+
+    Each scenario picks its URLs among the projects, screens, tags and share keys of the
+    docs folder, with a seeded random generator so two runs send the same requests. The
+    app runs in this process, without any network or server in the measure.
+    """
+
+    def __init__(self, docs_root: Path, seed=0, accept_encoding=None):
+        # Imported once CATALOG_BACKEND is set, the catalog reads it on import
+        from src.app import create_app
+
+        self.docs_root = docs_root
+        self.rng = random.Random(seed)
+        self.headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+
+        self.app = create_app(str(docs_root))
+        self.client = self.app.test_client()
+
+        self.load_fixtures()
+
+    def load_fixtures(self):
+        """
+        Lists the projects, screens, tags and share keys the scenarios request.
+        """
+        self.project_ids = []
+        self.screens = []
+        self.archived_screens = []
+        self.share_keys = []
+
+        for project_dir in (self.docs_root / "projects").iterdir():
+            if not (project_dir / "project.json").is_file():
+                continue
+
+            self.project_ids.append(int(project_dir.name))
+
+            with (project_dir / "screens.json").open("r") as f:
+                screens_data = json.load(f)
+
+            for screen in screens_data.get("screens", []):
+                self.screens.append((project_dir.name, screen["id"]))
+
+            for screen in screens_data.get("archivedscreens", []):
+                self.archived_screens.append((project_dir.name, screen["id"]))
+
+            with (project_dir / "shares.json").open("r") as f:
+                self.share_keys += [share["key"] for share in json.load(f)["shares"]]
+
+        with (self.docs_root / "common" / "tags.json").open("r") as f:
+            self.tag_ids = [tag["id"] for tag in json.load(f)]
+
+        if not self.project_ids or not self.screens:
+            raise ValueError(f"No projects with screens found in {self.docs_root}")
+
+        # Cursors of the successive pages, collected once by walking the projects
+        self.cursors = []
+        cursor = None
+
+        while len(self.cursors) < 50:
+            url = "/projects?limit=40" + (f"&cursor={cursor}" if cursor else "")
+            cursor = self.client.get(url).get_json()["nextCursor"]
+
+            if cursor is None:
+                break
+
+            self.cursors.append(cursor)
+
+    def get_scenarios(self):
+        """
+        Returns:
+            dict: The name of each scenario and the function returning its next URL.
+        """
+        rng = self.rng
+        page_count = max(1, len(self.project_ids) // 40)
+
+        def pick_screen():
+            return rng.choice(self.screens)
+
+        return {
+            "projects": lambda: "/projects",
+            "projects_page": lambda: f"/projects?page={rng.randint(1, page_count)}",
+            "projects_cursor": lambda: (
+                f"/projects?cursor={rng.choice(self.cursors)}"
+                if self.cursors
+                else "/projects"
+            ),
+            "projects_search": lambda: f"/projects?search={rng.choice(SEARCH_QUERIES)}",
+            "projects_tag": lambda: f"/projects?tag={rng.choice(self.tag_ids)}",
+            "projects_type": lambda: f"/projects?type={rng.choice(['prototype', 'board', 'archived'])}",
+            "projects_sort_name": lambda: f"/projects?sort=name&page={rng.randint(1, page_count)}",
+            "projects_combined": lambda: (
+                f"/projects?search={rng.choice(SEARCH_QUERIES)}&tag={rng.choice(self.tag_ids)}"
+                f"&type={rng.choice(['all', 'prototype', 'archived'])}"
+                f"&sort={rng.choice(['updatedAt', 'name'])}&page={rng.randint(1, 3)}"
+            ),
+            "project": lambda: f"/projects/{rng.choice(self.project_ids)}",
+            "project_search": lambda: (
+                f"/projects/{rng.choice(self.project_ids)}?search={rng.choice(SEARCH_QUERIES)}"
+            ),
+            "screen": lambda: "/projects/{}/screens/{}".format(*pick_screen()),
+            "screen_archived": lambda: "/projects/{}/screens/{}".format(
+                *rng.choice(self.archived_screens or self.screens)
+            ),
+            "screen_inspect": lambda: "/projects/{}/screens/{}/inspect".format(
+                *pick_screen()
+            ),
+            "screen_history": lambda: "/projects/{}/screens/{}/history".format(
+                *pick_screen()
+            ),
+            "share": lambda: f"/share/{rng.choice(self.share_keys)}",
+            "share_unknown": lambda: f"/share/unknown{rng.randrange(10**6)}",
+            "tags": lambda: "/tags",
+        }
+
+    def run_scenario(self, get_url, requests, warmup):
+        """
+        Sends the requests of a scenario one after the other.
+
+        Returns:
+            dict: The number of requests, errors, latency percentiles (ms) and throughput.
+        """
+        for _ in range(warmup):
+            self.client.get(get_url(), headers=self.headers)
+
+        durations = []
+        errors = 0
+        response_bytes = 0
+        started = time.perf_counter()
+
+        for _ in range(requests):
+            url = get_url()
+
+            request_started = time.perf_counter()
+            response = self.client.get(url, headers=self.headers)
+            body = response.get_data()
+            durations.append((time.perf_counter() - request_started) * 1000)
+
+            response_bytes += len(body)
+
+            if response.status_code >= 500:
+                errors += 1
+
+        elapsed = time.perf_counter() - started
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "mean": statistics.fmean(durations),
+            **get_percentiles(durations),
+            "max": max(durations),
+            "throughput": requests / elapsed,
+            "bytes": response_bytes // requests,
+        }
+
+    def run(self, requests=200, warmup=10, scenario_names=None):
+        """
+        Runs the scenarios, all of them by default.
+
+        Returns:
+            dict: The results of each scenario.
+        """
+        scenarios = self.get_scenarios()
+        results = {}
+
+        for name, get_url in scenarios.items():
+            if scenario_names and name not in scenario_names:
+                continue
+
+            results[name] = self.run_scenario(get_url, requests, warmup)
+            print_result(name, results[name])
+
+        return results
+
+
+def print_result(name, result):
+    color_print(
+        f"{name:<20} {result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} "
+        f"{result['max']:>8.2f} {result['throughput']:>9.0f} {result['bytes']:>9} "
+        f"{result['errors']:>6}",
+        "white" if not result["errors"] else "red",
+    )
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compares the p95 of each scenario with a baseline run.
+
+    Args:
+        results (dict): The results of this run.
+        baseline (dict): The results of the baseline run.
+        threshold (float): Ratio of the baseline p95 above which a scenario regressed.
+
+    Returns:
+        list: The names of the scenarios which regressed.
+    """
+    regressions = []
+
+    color_print(
+        f"\nCompared with the baseline (p95, threshold x{threshold}):", "yellow"
+    )
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = result["p95"] / baseline[name]["p95"] if baseline[name]["p95"] else 1
+        regressed = ratio > threshold
+
+        if regressed:
+            regressions.append(name)
+
+        color_print(
+            f" • {name}: {baseline[name]['p95']:.2f}ms → {result['p95']:.2f}ms (x{ratio:.2f})",
+            "red" if regressed else "green",
+        )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the read routes of the API on a docs folder."
+    )
+    parser.add_argument(
+        "docs_root",
+        nargs="?",
+        default=os.getenv("DOCS_ROOT"),
+        help="docs folder to serve, built by bench.generate (defaults to DOCS_ROOT)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="requests measured per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=10, help="requests sent before measuring"
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        help="scenario to run, can be repeated (all by default)",
+    )
+    parser.add_argument(
+        "--catalog-backend",
+        choices=["memory", "sqlite"],
+        help="catalog of the app (defaults to the CATALOG_BACKEND env variable)",
+    )
+    parser.add_argument(
+        "--accept-encoding",
+        help="Accept-Encoding header of the requests, e.g. 'br, gzip'",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the URLs picked")
+    parser.add_argument("--output", help="file to save the results to, as JSON")
+    parser.add_argument(
+        "--baseline", help="results saved by a previous run, to detect regressions"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="p95 ratio to the baseline above which a scenario regressed",
+    )
+    args = parser.parse_args()
+
+    if not args.docs_root:
+        parser.error("the docs folder is required (argument or DOCS_ROOT)")
+
+    # Read by the catalog when the app is imported
+    if args.catalog_backend:
+        os.environ["CATALOG_BACKEND"] = args.catalog_backend
+
+    benchmark = ApiBenchmark(
+        Path(args.docs_root), seed=args.seed, accept_encoding=args.accept_encoding
+    )
+
+    color_print(
+        f"{len(benchmark.project_ids)} projects, {len(benchmark.screens)} screens, "
+        f"{args.requests} requests per scenario ({os.getenv('CATALOG_BACKEND', 'memory')} catalog)\n",
+        "yellow",
+    )
+    color_print(
+        f"{'scenario':<20} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+        f"{'req/s':>9} {'bytes':>9} {'errors':>6}",
+        "yellow",
+    )
+
+    results = benchmark.run(
+        requests=args.requests, warmup=args.warmup, scenario_names=args.scenarios
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=4))
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+        if compare_results(results, baseline, args.threshold):
+            sys.exit(1)
+
+    if any(result["errors"] for result in results.values()):
+        sys.exit(1)
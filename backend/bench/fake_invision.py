@@ -0,0 +1,746 @@
+import json
+import time
+import zlib
+import random
+import struct
+import hashlib
+import logging
+import argparse
+import threading
+
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+from bench.generate import (
+    REFERENCE_TIME,
+    get_name,
+    build_tags,
+    build_history,
+    build_inspect,
+    build_project,
+    build_screen_details,
+    build_screen_summary,
+    build_archived_screen_details,
+)
+
+# Size of the chunks the responses are sent in, the bandwidth caps apply per chunk
+CHUNK_SIZE = 64 * 1024
+
+# Icons shared by the inspect layers of all the screens, like the exported assets of a design system
+SHARED_ASSET_COUNT = 50
+
+# Width in pixels of the images served, their height gives them the asset size
+ASSET_WIDTH = 256
+
+# Cookie set by the login and required by the API
+SESSION_COOKIE = "fake-invision-session"
+
+
+def build_png(pixels: bytes, width):
+    """
+    Encodes RGB pixels as a PNG image, without any dependency.
+
+    Returns:
+        bytes: The PNG file, about the size of the pixels which are random.
+    """
+    height = max(1, len(pixels) // (width * 3))
+    rows = b"".join(
+        b"\x00"
+        + pixels[row * width * 3 : (row + 1) * width * 3].ljust(width * 3, b"\x00")
+        for row in range(height)
+    )
+
+    def get_chunk(kind, data):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + get_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + get_chunk(b"IDAT", zlib.compress(rows, 1))
+        + get_chunk(b"IEND", b"")
+    )
+
+
+class Bandwidth:
+    """
+    Token bucket limiting the bytes sent per second, shared by the responses it's passed to.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.available = 0.0
+        self.updated = time.monotonic()
+
+    def consume(self, size):
+        """
+        Waits until a chunk of `size` bytes can be sent.
+        """
+        with self.lock:
+            now = time.monotonic()
+            # A second of bursts at most
+            self.available = min(
+                self.rate, self.available + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.available -= size
+            delay = -self.available / self.rate if self.available < 0 else 0
+
+        if delay:
+            time.sleep(delay)
+
+
+class FakeInVision:
+    """
+    Local stand-in for the InVision API and asset servers, to scrape offline.
+
+    The projects, screens and assets are generated from a seed, the payloads being built
+    on each request like the real ones. Latency, throttling (429), server errors (503)
+    and bandwidth caps can be injected, and `mutate` changes some projects and screens
+    between two scrapings so an update has work to do.
+
+    The scraper is pointed to it with:
+
+        INVISION_API_URL=http://127.0.0.1:5055
+        INVISION_LOGIN_URL=http://127.0.0.1:5055
+        INVISION_ASSET_MARKER=127.0.0.1:5055/assets
+    """
+
+    def __init__(
+        self,
+        project_count=20,
+        screen_count=20,
+        archived_ratio=0.1,
+        tag_count=10,
+        share_count=2,
+        hotspot_count=10,
+        inspect_size=20000,
+        history_versions=3,
+        asset_size=50000,
+        latency=0.0,
+        jitter=0.0,
+        throttle_rate=0.0,
+        error_rate=0.0,
+        retry_after=1,
+        bandwidth=None,
+        connection_bandwidth=None,
+        etag=True,
+        seed=0,
+    ):
+        self.screen_count = screen_count
+        self.archived_ratio = archived_ratio
+        self.share_count = share_count
+        self.hotspot_count = hotspot_count
+        self.inspect_size = inspect_size
+        self.history_versions = history_versions
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.bandwidth = Bandwidth(bandwidth) if bandwidth else None
+        self.connection_bandwidth = connection_bandwidth
+        self.etag = etag
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.asset_content = random.Random(seed).randbytes(asset_size)
+        self.base_url = ""
+
+        self.stats = {
+            "requests": 0,
+            "notModified": 0,
+            "throttled": 0,
+            "errors": 0,
+            "bytes": 0,
+            "mutations": 0,
+        }
+
+        self.generate(project_count, tag_count)
+
+    def generate(self, project_count, tag_count):
+        rng = random.Random(self.seed)
+        project_ids = list(range(1, project_count + 1))
+
+        self.tags = build_tags(rng, tag_count, project_ids)
+        self.projects = {}
+        self.screens = {}
+        self.screen_projects = {}
+
+        for project_id in project_ids:
+            project_rng = random.Random(f"{self.seed}-{project_id}")
+            project = build_project(project_rng, project_id, self.screen_count, [])
+            del project["data"]["tags"]
+
+            screens = {"screens": [], "archivedscreens": []}
+            for position in range(self.screen_count):
+                is_archived = project_rng.random() < self.archived_ratio
+                screen = build_screen_summary(
+                    project_rng,
+                    project_id,
+                    project_id * 10000 + position,
+                    position,
+                    is_archived,
+                )
+
+                screens["archivedscreens" if is_archived else "screens"].append(screen)
+                self.screen_projects[screen["id"]] = project_id
+
+            self.projects[project_id] = project
+            self.screens[project_id] = screens
+
+    def get_asset_url(self, path):
+        return f"{self.base_url}/assets/{path}"
+
+    def with_asset_urls(self, screen):
+        return {
+            **screen,
+            "imageUrl": self.get_asset_url(f"screens/files/{screen['id']}.png"),
+            "thumbnailUrl": self.get_asset_url(
+                f"screens/thumbnails/{screen['id']}.png"
+            ),
+        }
+
+    def get_screen_rng(self, screen, file_name):
+        # The payloads of a screen only change with its version, like the real ones
+        return random.Random(
+            f"{self.seed}-{screen['id']}-{screen['imageVersion']}-{file_name}"
+        )
+
+    def get_screen(self, screen_id):
+        project_id = self.screen_projects.get(screen_id)
+
+        if project_id is None:
+            return None, None
+
+        screens = self.screens[project_id]
+        screen = next(
+            screen
+            for screen in screens["screens"] + screens["archivedscreens"]
+            if screen["id"] == screen_id
+        )
+
+        return self.projects[project_id], self.with_asset_urls(screen)
+
+    def get_projects(self, is_archived):
+        with self.lock:
+            return [
+                {
+                    **project,
+                    "data": {
+                        **project["data"],
+                        "thumbnailUrl": self.get_asset_url(
+                            f"projects/thumbs/{project['id']}.png"
+                        ),
+                    },
+                }
+                for project in self.projects.values()
+                if project["data"]["isArchived"] == is_archived
+            ]
+
+    def get_project_screens(self, project_id):
+        with self.lock:
+            screens = self.screens.get(project_id)
+
+            if screens is None:
+                return None
+
+            return {
+                "screens": [
+                    self.with_asset_urls(screen) for screen in screens["screens"]
+                ],
+                "groups": [],
+                "archivedScreensCount": len(screens["archivedscreens"]),
+            }
+
+    def get_project_archived_screens(self, project_id):
+        with self.lock:
+            screens = self.screens.get(project_id)
+
+            if screens is None:
+                return None
+
+            return {
+                "archivedscreens": [
+                    self.with_asset_urls(screen)
+                    for screen in screens["archivedscreens"]
+                ]
+            }
+
+    def get_shares(self, project_id):
+        rng = random.Random(f"{self.seed}-{project_id}-shares")
+
+        return {
+            "shares": [
+                {
+                    "id": project_id * 100 + index,
+                    "key": f"{project_id:x}{rng.randrange(16**6):06x}{index}",
+                    "url": f"https://invis.io/{project_id}{index}",
+                    "password": "",
+                }
+                for index in range(self.share_count)
+            ]
+        }
+
+    def get_screen_details(self, screen_id, is_archived):
+        with self.lock:
+            project, screen = self.get_screen(screen_id)
+
+        if screen is None or screen["isArchived"] != is_archived:
+            return None
+
+        if is_archived:
+            return build_archived_screen_details(project, screen)
+
+        rng = self.get_screen_rng(screen, "screen.json")
+        details = build_screen_details(rng, project, screen, self.hotspot_count)
+        details["avatar"] = self.get_asset_url(
+            f"avatars/{project['data']['userID']}.png"
+        )
+
+        return details
+
+    def get_inspect(self, screen_id):
+        with self.lock:
+            project, screen = self.get_screen(screen_id)
+
+        if screen is None:
+            return None
+
+        rng = self.get_screen_rng(screen, "inspect.json")
+        inspect = build_inspect(rng, project, screen, self.inspect_size)
+
+        for layer in inspect["layers"]:
+            if layer["type"] == "image":
+                layer["exportUrl"] = self.get_asset_url(
+                    f"inspect/icons/{rng.randrange(SHARED_ASSET_COUNT)}.png"
+                )
+
+        return inspect
+
+    def get_history(self, screen_id):
+        with self.lock:
+            _, screen = self.get_screen(screen_id)
+
+        if screen is None:
+            return None
+
+        rng = self.get_screen_rng(screen, "history.json")
+        history = build_history(rng, screen, self.history_versions)
+
+        for version in history["versions"]:
+            version["imageUrl"] = self.get_asset_url(
+                f"versions/files/{screen['id']}_{version['version']}.png"
+            )
+
+        return history
+
+    def get_asset(self, path):
+        # Each asset has its own pixels, the same on every request
+        header = hashlib.sha256(path.encode()).digest()
+
+        return build_png(header + self.asset_content[len(header) :], ASSET_WIDTH)
+
+    def mutate(self, ratio):
+        """
+        Changes a part of the projects, as if they were edited since the last scraping.
+
+        In each changed project, some screens get a new image version, some a new
+        conversation and some a new name, and a screen is added.
+
+        Args:
+            ratio (float): Part of the projects, and of their screens, which change.
+
+        Returns:
+            dict: The number of projects and screens changed.
+        """
+        changed_projects = 0
+        changed_screens = 0
+
+        with self.lock:
+            rng = random.Random(f"{self.seed}-mutation-{self.stats['mutations']}")
+            self.stats["mutations"] += 1
+            updated_at = REFERENCE_TIME + self.stats["mutations"] * 60000
+
+            project_ids = [
+                project_id
+                for project_id, project in self.projects.items()
+                if not project["data"]["isArchived"]
+            ]
+            changed_project_ids = rng.sample(
+                project_ids,
+                k=min(len(project_ids), max(1, round(len(project_ids) * ratio))),
+            )
+
+            for project_id in sorted(changed_project_ids):
+                project = self.projects[project_id]
+                screens = self.screens[project_id]["screens"]
+
+                for screen in screens:
+                    draw = rng.random()
+
+                    if draw < ratio / 2:
+                        screen["imageVersion"] += 1
+                        screen["updatedAt"] = updated_at
+                    elif draw < ratio:
+                        screen["conversationCount"] += 1
+                    elif draw < ratio * 1.5:
+                        screen["name"] = get_name(rng, 2)
+                        screen["updatedAt"] = updated_at
+                    else:
+                        continue
+
+                    changed_screens += 1
+
+                position = len(screens) + len(
+                    self.screens[project_id]["archivedscreens"]
+                )
+                new_screen = build_screen_summary(
+                    rng, project_id, project_id * 10000 + position, position, False
+                )
+                screens.append(new_screen)
+                self.screen_projects[new_screen["id"]] = project_id
+
+                project["data"]["updatedAt"] = updated_at
+                project["data"]["itemCount"] += 1
+                changed_projects += 1
+                changed_screens += 1
+
+        return {"projects": changed_projects, "screens": changed_screens}
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.stats[name] += value
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def inject_faults(self):
+        """
+        Delays the request and fails it at the configured rates.
+
+        Returns:
+            Response or None: The error response, None to serve the request.
+        """
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        with self.lock:
+            draw = self.rng.random()
+
+        if draw < self.throttle_rate:
+            self.count("throttled")
+
+            return Response(
+                "Too many requests",
+                429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        if draw < self.throttle_rate + self.error_rate:
+            self.count("errors")
+
+            return Response("Service unavailable", 503)
+
+        return None
+
+    def send(self, body: bytes, mimetype):
+        """
+        Sends a body in chunks, within the bandwidth caps, answering the conditional requests.
+        """
+        etag = hashlib.sha1(body).hexdigest() if self.etag else None
+
+        if etag and etag in request.if_none_match:
+            self.count("notModified")
+
+            return Response(status=304, headers={"ETag": f'"{etag}"'})
+
+        def generate():
+            for start in range(0, len(body), CHUNK_SIZE):
+                chunk = body[start : start + CHUNK_SIZE]
+                started = time.monotonic()
+
+                if self.bandwidth:
+                    self.bandwidth.consume(len(chunk))
+
+                if self.connection_bandwidth:
+                    delay = len(chunk) / self.connection_bandwidth - (
+                        time.monotonic() - started
+                    )
+                    if delay > 0:
+                        time.sleep(delay)
+
+                self.count("bytes", len(chunk))
+                yield chunk
+
+        headers = {"Content-Length": str(len(body))}
+        if etag:
+            headers["ETag"] = f'"{etag}"'
+
+        return Response(generate(), mimetype=mimetype, headers=headers)
+
+    def send_json(self, data):
+        if data is None:
+            return Response("Not found", 404)
+
+        return self.send(
+            json.dumps(data, separators=(",", ":")).encode(), "application/json"
+        )
+
+
+def create_fake_app(fake: FakeInVision):
+    """
+    Creates the app serving the InVision endpoints used by the scraper.
+
+    The login, API and asset hosts are served by the same app. The `/_fake` endpoints
+    control it from a benchmark: `POST /_fake/mutate?ratio=0.1` and `GET /_fake/stats`.
+    """
+    app = Flask(__name__)
+
+    @app.before_request
+    def before_request():
+        if request.path.startswith("/_fake/"):
+            return None
+
+        fake.count("requests")
+
+        response = fake.inject_faults()
+        if response is not None:
+            return response
+
+        # The assets are public, like on the CDN
+        is_public = request.path.startswith("/assets/") or request.path in [
+            "/login-api/api/v2/login",
+            "/api/account/login",
+        ]
+        if not is_public and SESSION_COOKIE not in request.cookies:
+            return Response("Unauthorized", 401)
+
+        return None
+
+    @app.post("/login-api/api/v2/login")
+    def login_classic():
+        credentials = request.get_json(silent=True) or {}
+
+        if not credentials.get("email") or not credentials.get("password"):
+            return Response("Invalid credentials", 401)
+
+        response = fake.send_json({"success": True})
+        response.set_cookie("XSRF-TOKEN", hashlib.sha1(b"xsrf").hexdigest())
+        response.set_cookie(SESSION_COOKIE, "1", httponly=True)
+
+        return response
+
+    @app.post("/api/account/login")
+    def login_api():
+        if not request.headers.get("x-xsrf-token"):
+            return Response("Missing XSRF token", 403)
+
+        return fake.send_json({"success": True})
+
+    @app.get("/api:unifiedprojects.getProjects")
+    def get_projects():
+        is_archived = request.args.get("isArchived") == "True"
+
+        return fake.send_json(
+            {"results": fake.get_projects(is_archived), "account.id": 1}
+        )
+
+    @app.get("/api:unifiedprojects.getTags")
+    def get_tags():
+        return fake.send_json({"tags": fake.tags})
+
+    @app.get("/api:project_shares_tab_partials.getView")
+    def get_shares():
+        return fake.send_json(
+            fake.get_shares(request.args.get("prototypeID", type=int))
+        )
+
+    @app.get("/api:desktop_partials.projectScreens2Grouped")
+    def get_project_screens():
+        return fake.send_json(
+            fake.get_project_screens(request.args.get("id", type=int))
+        )
+
+    @app.get("/api:desktop_partials.projectScreens2Archived")
+    def get_project_archived_screens():
+        return fake.send_json(
+            fake.get_project_archived_screens(request.args.get("id", type=int))
+        )
+
+    @app.get("/api:desktop_partials.consoleScreen")
+    def get_screen():
+        return fake.send_json(
+            fake.get_screen_details(request.args.get("screenID", type=int), False)
+        )
+
+    @app.get("/api:desktop_partials/screenQuickView")
+    def get_archived_screen():
+        return fake.send_json(
+            fake.get_screen_details(request.args.get("screenID", type=int), True)
+        )
+
+    @app.get("/api:inspect.getExtractionJSON")
+    def get_inspect():
+        return fake.send_json(fake.get_inspect(request.args.get("id", type=int)))
+
+    @app.get("/api:desktop_partials/screenHistory")
+    def get_history():
+        return fake.send_json(fake.get_history(request.args.get("screenID", type=int)))
+
+    @app.get("/assets/<path:path>")
+    def get_asset(path):
+        return fake.send(fake.get_asset(path), "image/png")
+
+    @app.post("/_fake/mutate")
+    def mutate():
+        return fake.mutate(request.args.get("ratio", 0.1, type=float))
+
+    @app.get("/_fake/stats")
+    def get_stats():
+        return fake.get_stats()
+
+    return app
+
+
+def start_fake_server(fake: FakeInVision, host="127.0.0.1", port=0):
+    """
+    Serves a fake InVision from a thread of this process.
+
+    Args:
+        port (int): Port to listen on, a free one if 0.
+
+    Returns:
+        werkzeug.serving.BaseWSGIServer: The server, stopped with `shutdown()`.
+    """
+    server = make_server(host, port, create_fake_app(fake), threaded=True)
+    fake.base_url = f"http://{host}:{server.port}"
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve a fake InVision to scrape offline."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=5055, help="port to listen on")
+    parser.add_argument("--projects", type=int, default=20, help="number of projects")
+    parser.add_argument(
+        "--screens", type=int, default=20, help="number of screens per project"
+    )
+    parser.add_argument(
+        "--archived-ratio",
+        type=float,
+        default=0.1,
+        help="part of the screens which are archived",
+    )
+    parser.add_argument("--tags", type=int, default=10, help="number of tags")
+    parser.add_argument(
+        "--shares", type=int, default=2, help="number of share links per project"
+    )
+    parser.add_argument(
+        "--hotspots", type=int, default=10, help="number of hotspots per screen"
+    )
+    parser.add_argument(
+        "--inspect-size",
+        type=int,
+        default=20000,
+        help="approximate size in bytes of the inspect payloads",
+    )
+    parser.add_argument(
+        "--history-versions",
+        type=int,
+        default=3,
+        help="number of versions in the screen histories",
+    )
+    parser.add_argument(
+        "--asset-size", type=int, default=50000, help="size in bytes of each asset"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each request"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="random seconds added to the latency, up to this value",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="part of the requests answered with a 429",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="part of the requests answered with a 503",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=int,
+        default=1,
+        help="Retry-After seconds of the 429 responses",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        help="bytes per second sent by the server, all responses together",
+    )
+    parser.add_argument(
+        "--connection-bandwidth",
+        type=float,
+        help="bytes per second sent for each response",
+    )
+    parser.add_argument(
+        "--no-etag",
+        action="store_true",
+        help="don't answer the conditional requests with a 304",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    args = parser.parse_args()
+
+    fake = FakeInVision(
+        project_count=args.projects,
+        screen_count=args.screens,
+        archived_ratio=args.archived_ratio,
+        tag_count=args.tags,
+        share_count=args.shares,
+        hotspot_count=args.hotspots,
+        inspect_size=args.inspect_size,
+        history_versions=args.history_versions,
+        asset_size=args.asset_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        bandwidth=args.bandwidth,
+        connection_bandwidth=args.connection_bandwidth,
+        etag=not args.no_etag,
+        seed=args.seed,
+    )
+    fake.base_url = f"http://{args.host}:{args.port}"
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    print(f"Fake InVision serving {len(fake.projects)} projects on {fake.base_url}")
+    print(
+        f"Scrape it with INVISION_API_URL={fake.base_url} INVISION_LOGIN_URL={fake.base_url} "
+        f"INVISION_ASSET_MARKER={args.host}:{args.port}/assets"
+    )
+
+    make_server(
+        args.host, args.port, create_fake_app(fake), threaded=True
+    ).serve_forever()
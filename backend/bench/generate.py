@@ -0,0 +1,498 @@
+import sys
+import time
+import random
+import shutil
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.scraper.src.api_requests import save_json_data
+from src.scraper.src.catalog_db import CatalogDatabase, CATALOG_DB_FILE_NAME
+from src.scraper.src.generation import bump_generation
+from src.scraper.src.utils import color_print
+
+# Words the project and screen names are made of, some accented like the real ones
+WORDS = [
+    "Checkout",
+    "Onboarding",
+    "Dashboard",
+    "Settings",
+    "Profile",
+    "Search",
+    "Payment",
+    "Écran",
+    "Paramètres",
+    "Accueil",
+    "Récapitulatif",
+    "Mobile",
+    "Desktop",
+    "Tablet",
+    "Login",
+    "Signup",
+    "Cart",
+    "Catalogue",
+    "Notifications",
+    "Messagerie",
+    "Agenda",
+    "Facturation",
+    "Export",
+    "Wireframe",
+]
+
+# Smallest valid PNG (1x1 transparent pixel), written as the placeholder images
+PLACEHOLDER_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)
+
+# Timestamp (ms) the dates are generated before, so a seed always builds the same docs
+REFERENCE_TIME = 1700000000000
+
+# Approximate size in bytes of an inspect layer once minified
+INSPECT_LAYER_SIZE = 320
+
+
+def get_name(rng, word_count):
+    return " ".join(rng.choice(WORDS) for _ in range(word_count))
+
+
+def get_color(rng):
+    return f"#{rng.randrange(0x1000000):06x}"
+
+
+def build_tags(rng, tag_count, project_ids):
+    """
+    Returns:
+        list: The tags, each one on a random subset of the projects.
+    """
+    return [
+        {
+            "id": tag_id,
+            "name": f"{get_name(rng, 1)} {tag_id}",
+            "color": get_color(rng),
+            "backgroundColor": get_color(rng),
+            "prototypeIDs": sorted(
+                rng.sample(project_ids, k=rng.randint(0, len(project_ids) // 4 or 1))
+            ),
+        }
+        for tag_id in range(1, tag_count + 1)
+    ]
+
+
+def build_project(rng, project_id, screen_count, tags):
+    project_type = "board" if rng.random() < 0.1 else "prototype"
+
+    return {
+        "id": project_id,
+        "type": project_type,
+        "data": {
+            "id": project_id,
+            "type": project_type,
+            "name": get_name(rng, rng.randint(1, 4)),
+            "tags": [tag for tag in tags if project_id in tag["prototypeIDs"]],
+            "itemCount": screen_count,
+            "thumbnailUrl": f"/projects/{project_id}/assets/projects/thumbs/{project_id}.png",
+            "isArchived": rng.random() < 0.2,
+            "updatedAt": REFERENCE_TIME - rng.randrange(3 * 365 * 86400000),
+            "url": f"/projects/{project_id}",
+            "spaceID": rng.randint(1, 50),
+            "userID": rng.randint(1, 500),
+            "isFavorite": rng.random() < 0.1,
+            "isOverQuota": False,
+            "isSpaceMember": True,
+            "isProcessed": True,
+            "isInSpace": True,
+            "members": [],
+            "companyID": 1,
+            "isMobile": rng.random() < 0.3,
+            "canJoinSpace": False,
+            "backgroundColor": get_color(rng),
+            "spaceName": get_name(rng, 2),
+            "isCollaborator": False,
+            "isSample": False,
+        },
+    }
+
+
+def build_screen_summary(rng, project_id, screen_id, position, is_archived):
+    screen_folder = f"/projects/{project_id}/screens/{screen_id}"
+
+    return {
+        "id": screen_id,
+        "sort": position,
+        "name": get_name(rng, rng.randint(1, 3)),
+        "isArchived": is_archived,
+        "thumbnailUrl": f"{screen_folder}/thumbnail.png",
+        "imageUrl": f"{screen_folder}/image.png",
+        "isPlaceholder": False,
+        "backgroundColor": get_color(rng),
+        "screenGroupId": 0,
+        "updatedAt": REFERENCE_TIME - rng.randrange(365 * 86400000),
+        "createdAt": REFERENCE_TIME - rng.randrange(3 * 365 * 86400000),
+        "conversationCount": rng.randint(0, 5),
+        "hotspotCount": rng.randint(0, 20),
+        "imageVersion": rng.randint(1, 5),
+        "projectID": project_id,
+        "width": 1440,
+        "height": rng.choice([900, 1800, 3200]),
+    }
+
+
+def build_screen_details(rng, project, screen, hotspot_count):
+    return {
+        "screenID": screen["id"],
+        "v": 1,
+        "project": {
+            "id": project["id"],
+            "name": project["data"]["name"],
+            "userID": project["data"]["userID"],
+            "homeScreenID": screen["id"],
+            "isMobile": project["data"]["isMobile"],
+        },
+        "activeScreens": [screen],
+        "dividers": [],
+        "hotspots": [
+            {
+                "id": screen["id"] * 1000 + index,
+                "screenID": screen["id"],
+                "targetScreenID": screen["id"],
+                "x": rng.randint(0, 1440),
+                "y": rng.randint(0, screen["height"]),
+                "width": rng.randint(20, 400),
+                "height": rng.randint(20, 200),
+                "eventTypeID": 1,
+                "transitionTypeID": 1,
+            }
+            for index in range(hotspot_count)
+        ],
+        "allHotspots": [],
+        "conversations": [],
+        "projectMembers": [],
+        "projectStatuses": [],
+        "templates": [],
+    }
+
+
+def build_archived_screen_details(project, screen):
+    return {
+        "project": {"id": project["id"], "name": project["data"]["name"]},
+        "screen": {
+            key: screen[key]
+            for key in ["id", "name", "imageUrl", "width", "height", "sort"]
+        },
+    }
+
+
+def build_inspect(rng, project, screen, inspect_size):
+    layer_count = max(1, inspect_size // INSPECT_LAYER_SIZE)
+
+    return {
+        "id": screen["id"],
+        "project_id": project["id"],
+        "name": screen["name"],
+        "width": screen["width"],
+        "height": screen["height"],
+        "screen": {
+            "imageUrl": screen["imageUrl"],
+            "thumbnailUrl": screen["thumbnailUrl"],
+            "width": screen["width"],
+            "height": screen["height"],
+        },
+        "layers": [
+            {
+                "objectid": f"{screen['id']}-{index}",
+                "name": get_name(rng, 2),
+                "type": rng.choice(["text", "shape", "group", "image"]),
+                "rect": {
+                    "x": rng.randint(0, 1440),
+                    "y": rng.randint(0, screen["height"]),
+                    "width": rng.randint(1, 1440),
+                    "height": rng.randint(1, 400),
+                },
+                "opacity": 1,
+                "fills": [{"color": [rng.randrange(256) for _ in range(3)] + [1]}],
+                "text": get_name(rng, rng.randint(3, 12)),
+                "font": {"family": "Inter", "size": rng.choice([12, 14, 16, 24])},
+                "path": f"Page 1/{get_name(rng, 1)}/{get_name(rng, 1)}",
+            }
+            for index in range(layer_count)
+        ],
+        "screen_colors": [],
+        "documentColors": [],
+        "typefaces": [],
+    }
+
+
+def build_history(rng, screen, version_count):
+    screen_folder = screen["imageUrl"].rsplit("/", 1)[0]
+
+    return {
+        "versions": [
+            {
+                "screenID": screen["id"],
+                "version": version,
+                "imageUrl": f"{screen_folder}/versions/{screen['id']}_{version}.png",
+                "userID": rng.randint(1, 500),
+                "userName": get_name(rng, 2),
+                "createdAt": REFERENCE_TIME - rng.randrange(365 * 86400000),
+            }
+            for version in range(version_count)
+        ],
+        "comments": {},
+    }
+
+
+def write_placeholder(file_path: Path):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(PLACEHOLDER_PNG)
+
+
+def generate_project(
+    docs_root: Path,
+    project_id,
+    tags,
+    screen_count,
+    archived_ratio,
+    share_count,
+    hotspot_count,
+    inspect_size,
+    history_versions,
+    images,
+    seed,
+):
+    """
+    Writes the files of a project, run by the processes of the generator pool.
+
+    Returns:
+        Path: The folder of the project.
+    """
+    # Seeded per project, so the docs don't depend on the order the projects are generated in
+    rng = random.Random(f"{seed}-{project_id}")
+    project_folder = docs_root / "projects" / str(project_id)
+    project = build_project(rng, project_id, screen_count, tags)
+
+    screens = {"screens": [], "archivedscreens": []}
+    for position in range(screen_count):
+        is_archived = rng.random() < archived_ratio
+        screen = build_screen_summary(
+            rng, project_id, project_id * 10000 + position, position, is_archived
+        )
+        screen_folder = project_folder / "screens" / str(screen["id"])
+
+        if is_archived:
+            screens["archivedscreens"].append(screen)
+            save_json_data(
+                build_archived_screen_details(project, screen),
+                screen_folder,
+                "screen.json",
+            )
+        else:
+            screens["screens"].append(screen)
+            save_json_data(
+                build_screen_details(rng, project, screen, hotspot_count),
+                screen_folder,
+                "screen.json",
+            )
+            save_json_data(
+                build_inspect(rng, project, screen, inspect_size),
+                screen_folder,
+                "inspect.json",
+            )
+            save_json_data(
+                build_history(rng, screen, history_versions),
+                screen_folder,
+                "history.json",
+            )
+
+        if images:
+            write_placeholder(screen_folder / "image.png")
+            write_placeholder(screen_folder / "thumbnail.png")
+
+            for version in range(history_versions if not is_archived else 0):
+                write_placeholder(
+                    screen_folder / "versions" / f"{screen['id']}_{version}.png"
+                )
+
+    screens["groups"] = []
+    screens["archivedScreensCount"] = len(screens["archivedscreens"])
+
+    shares = {
+        "shares": [
+            {
+                "id": project_id * 100 + index,
+                "key": f"{project_id:x}{rng.randrange(16**6):06x}{index}",
+                "url": f"/share/{project_id}{index}",
+            }
+            for index in range(share_count)
+        ]
+    }
+
+    save_json_data(project, project_folder, "project.json")
+    save_json_data(screens, project_folder, "screens.json")
+    save_json_data(shares, project_folder, "shares.json")
+
+    if images:
+        write_placeholder(
+            project_folder / "assets" / "projects" / "thumbs" / f"{project_id}.png"
+        )
+
+    return project_folder
+
+
+def generate_docs(
+    docs_root: Path,
+    project_count=200,
+    screen_count=20,
+    archived_ratio=0.1,
+    tag_count=20,
+    share_count=2,
+    hotspot_count=10,
+    inspect_size=20000,
+    history_versions=3,
+    images=True,
+    catalog_db=True,
+    seed=0,
+    workers=None,
+):
+    """
+    Builds a docs folder laid out like the one written by the scraper.
+
+    The projects are written by a pool of processes (the compressed variants of the JSON
+    files take most of the time), and indexed in the SQLite catalog by this one.
+
+    Args:
+        docs_root (Path): The docs folder, created if needed.
+        project_count (int): Number of projects.
+        screen_count (int): Number of screens per project.
+        archived_ratio (float): Part of the screens which are archived.
+        tag_count (int): Number of tags.
+        share_count (int): Number of share links per project.
+        hotspot_count (int): Number of hotspots in each screen.json.
+        inspect_size (int): Approximate size in bytes of each inspect.json.
+        history_versions (int): Number of versions in each history.json.
+        images (bool): Write placeholder images for the thumbnails, screens and versions.
+        catalog_db (bool): Index the projects in the SQLite catalog, like the scraper does.
+        seed (int): Seed of the random generator, the same seed builds the same docs.
+        workers (int): Number of processes, the number of CPUs by default.
+    """
+    rng = random.Random(seed)
+    project_ids = list(range(1, project_count + 1))
+    tags = build_tags(rng, tag_count, project_ids)
+
+    save_json_data(tags, docs_root / "common", "tags.json")
+
+    database = CatalogDatabase(docs_root / CATALOG_DB_FILE_NAME, enabled=catalog_db)
+    database.index_tags(tags)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                generate_project,
+                docs_root,
+                project_id,
+                tags,
+                screen_count,
+                archived_ratio,
+                share_count,
+                hotspot_count,
+                inspect_size,
+                history_versions,
+                images,
+                seed,
+            )
+            for project_id in project_ids
+        ]
+
+        for count, future in enumerate(as_completed(futures), start=1):
+            database.index_project(future.result())
+
+            if count % 100 == 0:
+                color_print(f" • {count}/{project_count} projects generated", "white")
+
+    database.finalize()
+    bump_generation(docs_root)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a docs folder of synthetic projects, to benchmark the API."
+    )
+    parser.add_argument("docs_root", help="folder to generate, replaced if it exists")
+    parser.add_argument("--projects", type=int, default=200, help="number of projects")
+    parser.add_argument(
+        "--screens", type=int, default=20, help="number of screens per project"
+    )
+    parser.add_argument(
+        "--archived-ratio",
+        type=float,
+        default=0.1,
+        help="part of the screens which are archived",
+    )
+    parser.add_argument("--tags", type=int, default=20, help="number of tags")
+    parser.add_argument(
+        "--shares", type=int, default=2, help="number of share links per project"
+    )
+    parser.add_argument(
+        "--hotspots", type=int, default=10, help="number of hotspots per screen"
+    )
+    parser.add_argument(
+        "--inspect-size",
+        type=int,
+        default=20000,
+        help="approximate size in bytes of each inspect.json",
+    )
+    parser.add_argument(
+        "--history-versions",
+        type=int,
+        default=3,
+        help="number of versions in each history.json",
+    )
+    parser.add_argument(
+        "--no-images", action="store_true", help="don't write the placeholder images"
+    )
+    parser.add_argument(
+        "--no-catalog-db",
+        action="store_true",
+        help="don't index the projects in the SQLite catalog",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of processes writing the projects (defaults to the number of CPUs)",
+    )
+    args = parser.parse_args()
+
+    docs_root = Path(args.docs_root)
+
+    if docs_root.exists():
+        if not (docs_root / "projects").is_dir():
+            color_print(f"{docs_root} exists and isn't a docs folder.", "red")
+            sys.exit(1)
+
+        shutil.rmtree(docs_root)
+
+    started = time.monotonic()
+
+    generate_docs(
+        docs_root,
+        project_count=args.projects,
+        screen_count=args.screens,
+        archived_ratio=args.archived_ratio,
+        tag_count=args.tags,
+        share_count=args.shares,
+        hotspot_count=args.hotspots,
+        inspect_size=args.inspect_size,
+        history_versions=args.history_versions,
+        images=not args.no_images,
+        catalog_db=not args.no_catalog_db,
+        seed=args.seed,
+        workers=args.workers,
+    )
+
+    color_print(
+        f"\n{args.projects} projects of {args.screens} screens generated in "
+        f"{docs_root} ({time.monotonic() - started:.1f}s)",
+        "green",
+    )
@@ -0,0 +1,329 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from bench.fake_invision import FakeInVision, start_fake_server
+from src.scraper.src.metrics import read_metrics
+from src.scraper.src.utils import color_print
+
+# Runs of each engine: a full scraping, an update without changes, an update once the projects changed
+RUNS = ["full", "update", "update_changed"]
+
+
+def get_metric_total(snapshot, name, **labels):
+    """
+    Returns:
+        float: The sum of the samples of a metric matching the labels.
+    """
+    samples = snapshot["metrics"].get(name, {}).get("samples", [])
+
+    return sum(
+        sample["value"]
+        for sample in samples
+        if all(sample["labels"].get(key) == value for key, value in labels.items())
+    )
+
+
+class ScrapeBenchmark:
+    """
+    Times the scraper against a fake InVision served by this process.
+
+    Each engine scrapes a new docs folder (full), scrapes it again without changes
+    (update), then once a part of the projects changed (update_changed). The scraper
+    runs in its own process, like in production, and its throughput comes from the
+    metrics it writes to the docs folder.
+    """
+
+    def __init__(self, fake_options, work_dir: Path, scraper_args=None):
+        self.fake_options = fake_options
+        self.work_dir = work_dir
+        self.scraper_args = scraper_args or []
+
+    def run_scraper(self, fake, engine, docs_root: Path, option, log_path: Path):
+        """
+        Runs the scraper on the fake InVision until it exits.
+
+        Returns:
+            dict: The runtime, throughput and exit code of the scraping.
+        """
+        host, port = fake.base_url.removeprefix("http://").split(":")
+        env = {
+            **os.environ,
+            "DOCS_ROOT": str(docs_root),
+            "INVISION_API_URL": fake.base_url,
+            "INVISION_LOGIN_URL": fake.base_url,
+            "INVISION_ASSET_MARKER": f"{host}:{port}/assets",
+            "INVISION_EMAIL": "bench@example.com",
+            "INVISION_PASSWORD": "bench",
+            "TEST_MODE": "0",
+        }
+        command = [sys.executable, "-m", "src.scraper.main"]
+        command += ([option] if option else []) + ["--engine", engine]
+        command += self.scraper_args
+
+        server_stats = fake.get_stats()
+        started = time.perf_counter()
+
+        with log_path.open("w") as log_file:
+            returncode = subprocess.run(
+                command,
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                cwd=Path(__file__).resolve().parent.parent,
+            ).returncode
+
+        runtime = time.perf_counter() - started
+        snapshot = read_metrics(docs_root) or {"metrics": {}, "endpoints": {}}
+        endpoints = snapshot["endpoints"].values()
+
+        screens = get_metric_total(snapshot, "scraper_tasks_done_total", unit="screens")
+        response_bytes = sum(endpoint["bytes"] for endpoint in endpoints)
+        server_stats = {
+            name: value - server_stats[name] for name, value in fake.get_stats().items()
+        }
+
+        return {
+            "returncode": returncode,
+            "runtime": runtime,
+            "screens": screens,
+            "requests": sum(endpoint["requests"] for endpoint in endpoints),
+            "retries": sum(endpoint["retries"] for endpoint in endpoints),
+            "bytes": response_bytes,
+            "screensPerSecond": screens / runtime,
+            "megabytesPerSecond": response_bytes / 1024 / 1024 / runtime,
+            "notModified": server_stats["notModified"],
+            "throttled": server_stats["throttled"],
+            "serverErrors": server_stats["errors"],
+        }
+
+    def run_engine(self, engine, mutation_ratio):
+        """
+        Runs the full and update scrapings of an engine, on a fake InVision of its own.
+
+        Returns:
+            dict: The results of each run.
+        """
+        # The same seed serves the same projects to each engine
+        fake = FakeInVision(**self.fake_options)
+        server = start_fake_server(fake)
+
+        docs_root = self.work_dir / engine / "docs"
+        shutil.rmtree(docs_root, ignore_errors=True)
+        docs_root.parent.mkdir(parents=True, exist_ok=True)
+
+        results = {}
+
+        try:
+            for run in RUNS:
+                if run == "update_changed":
+                    if not mutation_ratio:
+                        continue
+
+                    fake.mutate(mutation_ratio)
+
+                results[run] = self.run_scraper(
+                    fake,
+                    engine,
+                    docs_root,
+                    None if run == "full" else "update",
+                    self.work_dir / engine / f"{run}.log",
+                )
+                print_result(f"{engine} {run}", results[run])
+        finally:
+            server.shutdown()
+
+        return results
+
+
+def print_result(name, result):
+    color_print(
+        f"{name:<24} {result['runtime']:>9.2f} {result['screens']:>8.0f} "
+        f"{result['screensPerSecond']:>9.1f} {result['megabytesPerSecond']:>8.2f} "
+        f"{result['requests']:>9} {result['notModified']:>6} {result['retries']:>8}",
+        "white" if result["returncode"] == 0 else "red",
+    )
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compares the runtime of each run with a baseline.
+
+    Args:
+        results (dict): The results of each engine and run.
+        baseline (dict): The results of the baseline benchmark.
+        threshold (float): Ratio of the baseline runtime above which a run regressed.
+
+    Returns:
+        list: The names of the runs which regressed.
+    """
+    regressions = []
+
+    color_print(
+        f"\nCompared with the baseline (runtime, threshold x{threshold}):", "yellow"
+    )
+
+    for engine, engine_results in results.items():
+        for run, result in engine_results.items():
+            baseline_result = baseline.get(engine, {}).get(run)
+
+            if not baseline_result:
+                continue
+
+            ratio = result["runtime"] / baseline_result["runtime"]
+            regressed = ratio > threshold
+
+            if regressed:
+                regressions.append(f"{engine} {run}")
+
+            color_print(
+                f" • {engine} {run}: {baseline_result['runtime']:.2f}s → {result['runtime']:.2f}s (x{ratio:.2f})",
+                "red" if regressed else "green",
+            )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scraper against a fake InVision. "
+        "Unknown arguments are passed to the scraper, e.g. --concurrency-max 32."
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        dest="engines",
+        choices=["threads", "async"],
+        help="engine to benchmark, can be repeated (both by default)",
+    )
+    parser.add_argument("--projects", type=int, default=20, help="number of projects")
+    parser.add_argument(
+        "--screens", type=int, default=20, help="number of screens per project"
+    )
+    parser.add_argument(
+        "--asset-size", type=int, default=50000, help="size in bytes of each asset"
+    )
+    parser.add_argument(
+        "--inspect-size",
+        type=int,
+        default=20000,
+        help="approximate size in bytes of the inspect payloads",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each request"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="random seconds added to the latency, up to this value",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="part of the requests answered with a 429",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="part of the requests answered with a 503",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        help="bytes per second sent by the server, all responses together",
+    )
+    parser.add_argument(
+        "--connection-bandwidth",
+        type=float,
+        help="bytes per second sent for each response",
+    )
+    parser.add_argument(
+        "--mutation-ratio",
+        type=float,
+        default=0.1,
+        help="part of the projects changed before the last update (0 to skip it)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    parser.add_argument(
+        "--work-dir",
+        help="folder of the docs and logs of the scrapings (a temporary one by default)",
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the docs folders once done"
+    )
+    parser.add_argument("--output", help="file to save the results to, as JSON")
+    parser.add_argument(
+        "--baseline", help="results saved by a previous run, to detect regressions"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="runtime ratio to the baseline above which a run regressed",
+    )
+    args, scraper_args = parser.parse_known_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="bench-scrape-"))
+    benchmark = ScrapeBenchmark(
+        {
+            "project_count": args.projects,
+            "screen_count": args.screens,
+            "asset_size": args.asset_size,
+            "inspect_size": args.inspect_size,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "throttle_rate": args.throttle_rate,
+            "error_rate": args.error_rate,
+            "bandwidth": args.bandwidth,
+            "connection_bandwidth": args.connection_bandwidth,
+            "seed": args.seed,
+        },
+        work_dir,
+        scraper_args,
+    )
+
+    color_print(
+        f"{args.projects} projects of {args.screens} screens, logs in {work_dir}\n",
+        "yellow",
+    )
+    color_print(
+        f"{'run':<24} {'runtime s':>9} {'screens':>8} {'screens/s':>9} {'MB/s':>8} "
+        f"{'requests':>9} {'304':>6} {'retries':>8}",
+        "yellow",
+    )
+
+    results = {}
+    for engine in args.engines or ["threads", "async"]:
+        results[engine] = benchmark.run_engine(engine, args.mutation_ratio)
+
+        if not args.keep:
+            shutil.rmtree(work_dir / engine / "docs", ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=4))
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+        if compare_results(results, baseline, args.threshold):
+            sys.exit(1)
+
+    if any(
+        result["returncode"]
+        for engine_results in results.values()
+        for result in engine_results.values()
+    ):
+        sys.exit(1)
@@ -0,0 +1,74 @@
+import gc
+import os
+import time
+import signal
+import threading
+import multiprocessing
+
+from src.catalog import ProjectCatalog
+from src.scraper.src.lock import is_scrape_running
+
+# Production server, started by the Dockerfile with `gunicorn` from the backend folder
+wsgi_app = "src.wsgi:app"
+bind = f"0.0.0.0:{os.getenv('PORT', 8080)}"
+
+# Worker processes, each serving requests with a pool of threads
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = "gthread"
+
+# The app and its catalog are loaded once in the master, then shared by the forked workers
+preload_app = True
+
+# Seconds a worker can be silent before being restarted, the scrape jobs run apart from the requests
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 60))
+
+accesslog = "-"
+
+# Seconds between two checks of the scrape generation by the master
+CATALOG_RELOAD_DELAY = float(os.getenv("CATALOG_RELOAD_DELAY", 10))
+
+
+def watch_generation(server, catalog):
+    """
+    Reloads the workers once a scraping is over.
+
+    The workers refresh their own copy of the catalog while the scraper runs. Once the
+    generation changed and the scraper released the lock of the docs folder, the catalog
+    of the master is refreshed and the workers are gracefully replaced (HUP) by new ones
+    forked with it, so they share it again. A worker running a scrape job is never
+    replaced, since the job holds the lock.
+    """
+    while True:
+        time.sleep(CATALOG_RELOAD_DELAY)
+
+        if catalog.get_generation() != catalog.generation and not is_scrape_running(
+            catalog.root
+        ):
+            server.log.info("Docs changed, reloading the catalog and the workers")
+            catalog.refresh(force=True)
+            os.kill(server.pid, signal.SIGHUP)
+
+
+def when_ready(server):
+    catalog = server.app.wsgi().extensions["catalog"]
+
+    if not isinstance(catalog, ProjectCatalog):
+        return
+
+    # A worker forked while the master refreshes the catalog would inherit its lock held
+    os.register_at_fork(
+        before=catalog.lock.acquire,
+        after_in_parent=catalog.lock.release,
+        after_in_child=catalog.lock.release,
+    )
+
+    threading.Thread(
+        target=watch_generation, args=(server, catalog), daemon=True
+    ).start()
+
+
+def pre_fork(server, worker):
+    # Objects loaded before the fork aren't tracked by the collector, their pages stay shared
+    gc.freeze()
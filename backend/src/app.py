@@ -4,11 +4,13 @@ import os
 from pathlib import Path
 
 from src import routes
+from src.catalog import create_catalog
+from src.jobs import ScrapeJobs
+from src.responses import send_static_file
+from src.timing import init_timing
 
 load_dotenv()
 
-docs_root = os.getenv("DOCS_ROOT", "static")
-
 # Setup the CA if needed
 if os.getenv("CUSTOM_CA_FILE"):
     ca_file = Path("/usr/local/share/ca-certificates") / os.getenv("CUSTOM_CA_FILE")
@@ -17,10 +19,41 @@ if os.getenv("CUSTOM_CA_FILE"):
         os.environ["CURL_CA_BUNDLE"] = str(ca_file)
         os.environ["REQUESTS_CA_BUNDLE"] = str(ca_file)
 
-app = Flask(__name__, static_url_path="/static", static_folder=docs_root)
 
-app.register_blueprint(routes.screens)
-app.register_blueprint(routes.projects)
-app.register_blueprint(routes.tags)
-app.register_blueprint(routes.scrape)
-app.register_blueprint(routes.shares)
+def create_app(docs_root=None):
+    """
+    Creates the Flask app serving a docs folder, with its catalog loaded.
+
+    Used by `flask run` in development, and by `src.wsgi` which gunicorn loads once in
+    its master process before forking the workers.
+
+    Args:
+        docs_root (str): The docs folder, DOCS_ROOT by default.
+
+    Returns:
+        Flask: The app.
+    """
+    docs_root = docs_root or os.getenv("DOCS_ROOT", "static")
+
+    app = Flask(__name__, static_url_path="/static", static_folder=docs_root)
+
+    # The JSON files are sent precompressed to the clients accepting it
+    app.view_functions["static"] = send_static_file
+
+    app.register_blueprint(routes.screens)
+    app.register_blueprint(routes.projects)
+    app.register_blueprint(routes.tags)
+    app.register_blueprint(routes.scrape)
+    app.register_blueprint(routes.shares)
+    app.register_blueprint(routes.stats)
+
+    # Latency of the routes split by phase, exposed at /stats, and opt-in profiling
+    init_timing(app)
+
+    # Catalog of the projects, built once at startup and refreshed when the docs change
+    app.extensions["catalog"] = create_catalog(Path(app.static_folder))
+
+    # Scrapings started from /scrape, run in the background of the worker receiving them
+    app.extensions["scrape_jobs"] = ScrapeJobs(Path(app.static_folder))
+
+    return app
@@ -0,0 +1,941 @@
+import os
+import json
+import time
+import base64
+import sqlite3
+import threading
+from pathlib import Path
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from flask import current_app
+
+from src.search import NgramIndex, NGRAM_SIZE, normalize
+from src.timing import phase, load_json_file
+from src.scraper.src.generation import GENERATION_FILE_NAME
+from src.scraper.src.catalog_db import CATALOG_DB_FILE_NAME, has_fts
+
+# "memory" to load the JSON files, "sqlite" to query the database written by the scraper
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "memory")
+
+# Seconds between two checks of the project files when the scrape generation didn't change
+CATALOG_RESCAN_INTERVAL = float(os.getenv("CATALOG_RESCAN_INTERVAL", 30))
+
+# Number of projects whose screens are kept in memory, with their search index
+CATALOG_SCREENS_CACHE_SIZE = int(os.getenv("CATALOG_SCREENS_CACHE_SIZE", 128))
+
+# Position of a project in each sort order, the id breaks the ties
+SORT_KEYS = {
+    "updatedAt": lambda record: (-(record["updatedAt"] or 0), record["id"]),
+    "name": lambda record: (record["name"], record["id"]),
+    "id": lambda record: (record["id"],),
+}
+
+# Types of the values saved in a cursor, for each sort order
+CURSOR_TYPES = {"updatedAt": [(int, float), int], "name": [str, int], "id": [int]}
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def get_sort_order(sort_by):
+    return sort_by if sort_by in SORT_KEYS else "id"
+
+
+def encode_cursor(sort_by, record):
+    """
+    Builds the cursor of the page following a project.
+
+    Args:
+        sort_by (str): The sort order of the page.
+        record (dict): The summary of the last project of the page.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    sort_order = get_sort_order(sort_by)
+    position = {
+        "updatedAt": [record["updatedAt"] or 0, record["id"]],
+        "name": [record["name"], record["id"]],
+        "id": [record["id"]],
+    }[sort_order]
+
+    return base64.urlsafe_b64encode(
+        json.dumps([sort_order] + position).encode()
+    ).decode()
+
+
+def decode_cursor(sort_by, cursor):
+    """
+    Reads the position of the last project of the previous page from a cursor.
+
+    Args:
+        sort_by (str): The sort order of the requested page.
+        cursor (str): The cursor returned with the previous page.
+
+    Returns:
+        tuple: The position of the project, as built by `SORT_KEYS`.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was built for another sort order.
+    """
+    sort_order = get_sort_order(sort_by)
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+
+    types = CURSOR_TYPES[sort_order]
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types) + 1
+        or values[0] != sort_order
+        or not all(map(isinstance, values[1:], types))
+    ):
+        raise InvalidCursorError("Invalid cursor")
+
+    position = values[1:]
+
+    if sort_order == "updatedAt":
+        return (-position[0], position[1])
+
+    return tuple(position)
+
+
+class ProjectCatalog:
+    """
+    In-memory catalog of the projects of a docs folder.
+
+    Each project is kept as a compact summary (id, name, type, archiving, tags, update date)
+    next to its project.json, so listing the projects doesn't read any file. The lowercase
+    keys of the shares are indexed to find the project of a share link.
+
+    The catalog is refreshed when the scraper bumps the generation counter of the docs
+    folder, or every `CATALOG_RESCAN_INTERVAL` seconds for folders changed by other means.
+    A refresh only reloads the project.json and shares.json files whose modification time
+    changed.
+
+    The names of the projects, and of the screens of the recently viewed projects, are
+    normalized once and indexed by trigrams for the searches. The summaries are kept sorted
+    by update date, name and id, so a page is sliced from its sort order, or from the
+    position of a cursor, without sorting the projects on each request. A refresh only
+    moves the changed projects in the index and the sort orders.
+    """
+
+    def __init__(self, root: Path, rescan_interval=CATALOG_RESCAN_INTERVAL):
+        self.root = root
+        self.rescan_interval = rescan_interval
+
+        self.lock = threading.Lock()
+        self.records = {}
+        self.mtimes = {}
+        self.share_keys = {}
+        self.share_mtimes = {}
+        self.share_index = {}
+        self.project_index = NgramIndex({})
+        self.filter_index = {}
+        self.sort_indexes = {}
+        self.screens_lock = threading.Lock()
+        self.screens_cache = OrderedDict()
+        self.generation = None
+        self.last_scan = 0.0
+        self.is_available = False
+
+    @property
+    def projects_dir(self):
+        return self.root / "projects"
+
+    def get_generation(self):
+        try:
+            stat = (self.root / GENERATION_FILE_NAME).stat()
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def build_record(project):
+        """
+        Builds the summary of a project.
+
+        Args:
+            project (dict): The content of project.json.
+
+        Returns:
+            dict: The summary, with the project itself under "project".
+        """
+        project_data = project.get("data", {})
+
+        return {
+            "id": project_data.get("id", project.get("id")),
+            "name": project_data.get("name", ""),
+            "type": project_data.get("type"),
+            "isArchived": bool(project_data.get("isArchived")),
+            "tags": [str(tag.get("id")) for tag in project_data.get("tags", [])],
+            "updatedAt": project_data.get("updatedAt"),
+            "project": project,
+        }
+
+    def load_record(self, project_json_path: Path):
+        try:
+            return self.build_record(load_json_file(project_json_path))
+        except (OSError, json.JSONDecodeError):
+            # Missing or being written by the scraper, picked up by the next scan
+            return None
+
+    @staticmethod
+    def load_share_keys(shares_json_path: Path):
+        try:
+            shares_data = load_json_file(shares_json_path)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        return [
+            str(share.get("key", "")).lower() for share in shares_data.get("shares", [])
+        ]
+
+    @staticmethod
+    def build_sort_indexes(records):
+        """
+        Sorts the summaries in each sort order.
+
+        Returns:
+            dict: The sorted summaries and their positions, by sort order.
+        """
+        sort_indexes = {}
+
+        for sort_order, sort_key in SORT_KEYS.items():
+            sorted_records = sorted(records, key=sort_key)
+            sort_indexes[sort_order] = (
+                [sort_key(record) for record in sorted_records],
+                sorted_records,
+            )
+
+        return sort_indexes
+
+    @staticmethod
+    def get_filter_keys(record):
+        """
+        Lists the filters matching a project, as (filter, value) keys.
+        """
+        keys = {("type", record["type"])}
+
+        # The archived filter matches the archived projects of every type
+        if record["isArchived"]:
+            keys.add(("type", "archived"))
+
+        return keys | {("tag", tag) for tag in record["tags"]}
+
+    @classmethod
+    def build_filter_index(cls, records):
+        """
+        Groups the ids of the projects by filter.
+
+        Returns:
+            dict: The ids of the matching projects, by (filter, value) key.
+        """
+        filter_index = {}
+
+        for record in records:
+            for key in cls.get_filter_keys(record):
+                filter_index.setdefault(key, set()).add(str(record["id"]))
+
+        return filter_index
+
+    def update_indexes(self, records):
+        """
+        Moves the projects added, changed or removed since the last scan in the search index,
+        the filter index and the sort orders. Must be called with the lock held.
+
+        Args:
+            records (dict): The new summaries, the unchanged ones being the previous objects.
+        """
+        removed_records = [
+            record
+            for key, record in self.records.items()
+            if records.get(key) is not record
+        ]
+        added_records = [
+            record
+            for key, record in records.items()
+            if self.records.get(key) is not record
+        ]
+
+        # Rebuilt when a large part of the projects changed, e.g. on the first scan
+        if (
+            not self.sort_indexes
+            or len(removed_records) + len(added_records) > len(records) // 4
+        ):
+            self.project_index = NgramIndex(
+                {str(record["id"]): record["name"] for record in records.values()}
+            )
+            self.filter_index = self.build_filter_index(records.values())
+            self.sort_indexes = self.build_sort_indexes(records.values())
+            return
+
+        for record in removed_records:
+            self.project_index.remove(str(record["id"]))
+
+        for record in added_records:
+            self.project_index.add(str(record["id"]), record["name"])
+
+        # The sets are replaced rather than modified, like the postings of the search index
+        filter_index = dict(self.filter_index)
+
+        for record in removed_records:
+            for key in self.get_filter_keys(record):
+                project_ids = filter_index.get(key, set()) - {str(record["id"])}
+
+                if project_ids:
+                    filter_index[key] = project_ids
+                else:
+                    filter_index.pop(key, None)
+
+        for record in added_records:
+            for key in self.get_filter_keys(record):
+                filter_index[key] = filter_index.get(key, set()) | {str(record["id"])}
+
+        self.filter_index = filter_index
+
+        sort_indexes = {}
+
+        for sort_order, sort_key in SORT_KEYS.items():
+            # Copied, the requests in progress keep slicing the previous ones
+            sort_keys, sorted_records = map(list, self.sort_indexes[sort_order])
+
+            for record in removed_records:
+                position = bisect_left(sort_keys, sort_key(record))
+
+                while sorted_records[position] is not record:
+                    position += 1
+
+                del sort_keys[position]
+                del sorted_records[position]
+
+            for record in added_records:
+                position = bisect_right(sort_keys, sort_key(record))
+                sort_keys.insert(position, sort_key(record))
+                sorted_records.insert(position, record)
+
+            sort_indexes[sort_order] = (sort_keys, sorted_records)
+
+        self.sort_indexes = sort_indexes
+
+    def scan(self):
+        """
+        Reloads the projects whose project.json or shares.json changed. Must be called with the lock held.
+        """
+        if not self.projects_dir.is_dir():
+            self.records, self.mtimes = {}, {}
+            self.share_keys, self.share_mtimes, self.share_index = {}, {}, {}
+            self.project_index = NgramIndex({})
+            self.filter_index = {}
+            self.sort_indexes = {}
+            self.is_available = False
+            return
+
+        records = {}
+        mtimes = {}
+        share_keys = {}
+        share_mtimes = {}
+
+        for project_dir in self.projects_dir.iterdir():
+            key = project_dir.name
+
+            # The shares are indexed even if the project.json is missing
+            try:
+                share_mtime = (project_dir / "shares.json").stat().st_mtime_ns
+            except OSError:
+                share_mtime = None
+
+            if share_mtime is not None:
+                if self.share_mtimes.get(key) == share_mtime and key in self.share_keys:
+                    share_keys[key] = self.share_keys[key]
+                    share_mtimes[key] = share_mtime
+                else:
+                    keys = self.load_share_keys(project_dir / "shares.json")
+
+                    if keys is not None:
+                        share_keys[key] = keys
+                        share_mtimes[key] = share_mtime
+
+            project_json_path = project_dir / "project.json"
+
+            try:
+                mtime = project_json_path.stat().st_mtime_ns
+            except OSError:
+                continue
+
+            if self.mtimes.get(key) == mtime and key in self.records:
+                record = self.records[key]
+            else:
+                record = self.load_record(project_json_path)
+
+                if record is None:
+                    continue
+
+            records[key] = record
+            mtimes[key] = mtime
+
+        if share_mtimes != self.share_mtimes:
+            self.share_index = {
+                share_key: key for key, keys in share_keys.items() for share_key in keys
+            }
+
+        if mtimes != self.mtimes:
+            self.update_indexes(records)
+
+        # Replaced at once, readers keep using the previous ones
+        self.records, self.mtimes = records, mtimes
+        self.share_keys, self.share_mtimes = share_keys, share_mtimes
+        self.is_available = True
+
+    def is_fresh(self, generation):
+        return (
+            generation == self.generation
+            and time.monotonic() - self.last_scan < self.rescan_interval
+        )
+
+    def refresh(self, force=False):
+        """
+        Scans the projects if the scrape generation changed or the rescan interval elapsed.
+
+        Args:
+            force (bool): Scan even if nothing seems to have changed.
+        """
+        if not force and self.is_fresh(self.get_generation()):
+            return
+
+        with self.lock:
+            generation = self.get_generation()
+
+            # The threads queued behind a scan don't scan again
+            if not force and self.is_fresh(generation):
+                return
+
+            self.scan()
+            self.generation = generation
+            self.last_scan = time.monotonic()
+
+    def get_projects(self):
+        """
+        Returns the summaries of the projects, refreshed if needed.
+
+        Returns:
+            list: The project summaries.
+        """
+        self.refresh()
+
+        return list(self.records.values())
+
+    def search_projects(self, query):
+        """
+        Finds the projects whose name contains the query.
+
+        Args:
+            query (str): The query, accents and case are ignored.
+
+        Returns:
+            set: The ids of the matching projects, as strings.
+        """
+        self.refresh()
+
+        return self.project_index.search(query)
+
+    def get_screens(self, project_id):
+        """
+        Returns the screens.json of a project with the search index of its screen names.
+
+        The screens are cached until the file changes. Both must not be modified.
+
+        Args:
+            project_id (int): The id of the project.
+
+        Returns:
+            tuple or None: The screens data and its index, whose keys are ("screens" or
+                "archivedscreens", position) tuples. None if the project has no screens.json.
+        """
+        screens_json_path = self.projects_dir / str(project_id) / "screens.json"
+
+        try:
+            mtime = screens_json_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        with self.screens_lock:
+            cached = self.screens_cache.get(project_id)
+
+            if cached is not None and cached[0] == mtime:
+                self.screens_cache.move_to_end(project_id)
+                return cached[1], cached[2]
+
+        screens_data = load_json_file(screens_json_path)
+
+        screens_index = NgramIndex(
+            {
+                (list_name, position): screen.get("name", "")
+                for list_name in ["screens", "archivedscreens"]
+                for position, screen in enumerate(screens_data.get(list_name, []))
+            }
+        )
+
+        with self.screens_lock:
+            self.screens_cache[project_id] = (mtime, screens_data, screens_index)
+            self.screens_cache.move_to_end(project_id)
+
+            while len(self.screens_cache) > CATALOG_SCREENS_CACHE_SIZE:
+                self.screens_cache.popitem(last=False)
+
+        return screens_data, screens_index
+
+    def query_projects(
+        self,
+        project_type,
+        project_tag,
+        search_query,
+        project_ids,
+        sort_by,
+        offset,
+        limit,
+        cursor=None,
+    ):
+        """
+        Filters, sorts and pages the projects.
+
+        Args:
+            project_type (str): Type of the projects, "archived" for the archived ones, None for all.
+            project_tag (str): Id of a tag of the projects, None for all.
+            search_query (str): Part of the name of the projects, accents and case are ignored.
+            project_ids (set): Ids of the projects as strings, empty for all.
+            sort_by (str): "updatedAt" (most recent first), "name", or anything else for the ids.
+            offset (int): Number of projects skipped, after the cursor if any.
+            limit (int): Maximum number of projects returned.
+            cursor (str): Cursor returned with the previous page, None to start from the first project.
+
+        Returns:
+            tuple: The projects of the page, the total number of matching projects and the
+                cursor of the next page (None on the last page).
+
+        Raises:
+            InvalidCursorError: If the cursor is invalid.
+        """
+        self.refresh()
+
+        if not self.is_available:
+            raise FileNotFoundError("Projects directory not found")
+
+        with phase("filter"):
+            sort_order = get_sort_order(sort_by)
+            sort_keys, sorted_records = self.sort_indexes.get(sort_order, ([], []))
+
+            # Position of the first project after the cursor, stable when projects are added
+            start = (
+                bisect_right(sort_keys, decode_cursor(sort_by, cursor)) if cursor else 0
+            )
+
+            if (
+                project_type is None
+                and not project_tag
+                and not search_query
+                and not project_ids
+            ):
+                # Without filters the page is sliced from the sort order
+                first = start + offset
+                page = sorted_records[first : first + limit]
+                total = len(sorted_records)
+                has_next_page = first + limit < total
+            else:
+                # The smallest set of ids is checked against the others, every project first
+                filters = [self.project_index.names]
+
+                if project_type is not None:
+                    filters.append(self.filter_index.get(("type", project_type), set()))
+
+                if project_tag:
+                    filters.append(
+                        self.filter_index.get(("tag", str(project_tag)), set())
+                    )
+
+                if search_query:
+                    # Names are normalized and indexed by the catalog
+                    filters.append(self.search_projects(search_query))
+
+                if project_ids:
+                    filters.append(project_ids)
+
+                filters.sort(key=len)
+                matching_ids = {
+                    project_id
+                    for project_id in filters[0]
+                    if all(project_id in ids for ids in filters[1:])
+                }
+                total = len(matching_ids)
+
+                # The sort order is walked until the page and the project after it are found
+                page = []
+                skipped = 0
+                has_next_page = False
+
+                for position in range(start, len(sorted_records)):
+                    record = sorted_records[position]
+
+                    if str(record["id"]) not in matching_ids:
+                        continue
+
+                    if skipped < offset:
+                        skipped += 1
+                    elif len(page) < limit:
+                        page.append(record)
+                    else:
+                        has_next_page = True
+                        break
+
+            next_cursor = (
+                encode_cursor(sort_by, page[-1]) if page and has_next_page else None
+            )
+
+            return [record["project"] for record in page], total, next_cursor
+
+    def get_project(self, project_id, search_query=""):
+        """
+        Returns a project with its screens whose name contains the query.
+
+        Args:
+            project_id (int): The id of the project.
+            search_query (str): Part of the name of the screens, accents and case are ignored.
+
+        Returns:
+            dict: The project.json with the screens.json under "screens".
+
+        Raises:
+            FileNotFoundError: If the project doesn't exist.
+        """
+        project_json_path = self.projects_dir / str(project_id) / "project.json"
+
+        project_data = load_json_file(project_json_path)
+
+        screens = self.get_screens(project_id)
+
+        if screens is not None:
+            screens_data, screens_index = screens
+
+            with phase("filter"):
+                # The screen names are normalized and indexed by the catalog
+                matching_keys = screens_index.search(search_query)
+
+                # Filter the screens and the archived screens, the cached data is left as is
+                screens_data = dict(screens_data)
+
+                for list_name in ["screens", "archivedscreens"]:
+                    screens_data[list_name] = [
+                        screen
+                        for position, screen in enumerate(
+                            screens_data.get(list_name, [])
+                        )
+                        if (list_name, position) in matching_keys
+                    ]
+
+            # Add the screens_data to the project_data
+            project_data["screens"] = screens_data
+
+        return project_data
+
+    def get_tags(self):
+        """
+        Returns the tags.
+
+        Returns:
+            list: The content of common/tags.json.
+
+        Raises:
+            FileNotFoundError: If the tags were never scraped.
+        """
+        return load_json_file(self.root / "common" / "tags.json")
+
+    def get_share_project_id(self, share_key):
+        """
+        Finds the project of a share link, refreshed if needed.
+
+        Args:
+            share_key (str): The key of the share, case insensitive.
+
+        Returns:
+            str or None: The id of the project, None if no project has this share.
+
+        Raises:
+            FileNotFoundError: If the docs were never scraped.
+        """
+        self.refresh()
+
+        if not self.is_available:
+            raise FileNotFoundError("Projects directory not found")
+
+        return self.share_index.get(share_key.lower())
+
+
+class SqliteCatalog:
+    """
+    Catalog of the projects read from the SQLite database written by the scraper.
+
+    Filtering, sorting and paging are done by indexed queries, and names are searched
+    through the FTS5 trigram tables when SQLite supports them.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.local = threading.local()
+
+    @property
+    def is_available(self):
+        return self.path.exists()
+
+    def connect(self):
+        """
+        Opens a read-only connection per thread, opened again once an overwrite recreated
+        the database.
+
+        Raises:
+            FileNotFoundError: If the scraper didn't write the database.
+        """
+        connection = getattr(self.local, "connection", None)
+
+        try:
+            stat = self.path.stat()
+        except OSError:
+            stat = None
+
+        file_id = (stat.st_dev, stat.st_ino) if stat is not None else None
+
+        if connection is not None and file_id != self.local.file_id:
+            # Still reading the removed file
+            connection.close()
+            connection = self.local.connection = None
+
+        if connection is None:
+            if file_id is None:
+                raise FileNotFoundError("Catalog database not found")
+
+            connection = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True)
+            self.local.connection = connection
+            self.local.file_id = file_id
+            self.local.fts = has_fts(connection)
+
+        return connection
+
+    def get_name_filter(self, table, search_query):
+        """
+        Builds the condition matching the rows whose normalized name contains the query.
+
+        Returns:
+            tuple: The SQL condition and its parameters.
+        """
+        query = normalize(search_query)
+
+        # Trigrams need 3 characters, the substring check keeps the exact semantics
+        if self.local.fts and len(query) >= NGRAM_SIZE:
+            phrase = '"' + query.replace('"', '""') + '"'
+
+            return (
+                f"rowid IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?) "
+                "AND instr(normalized_name, ?) > 0",
+                [phrase, query],
+            )
+
+        return "instr(normalized_name, ?) > 0", [query]
+
+    def query_projects(
+        self,
+        project_type,
+        project_tag,
+        search_query,
+        project_ids,
+        sort_by,
+        offset,
+        limit,
+        cursor=None,
+    ):
+        """
+        Filters, sorts and pages the projects, see ProjectCatalog.query_projects.
+        """
+        connection = self.connect()
+
+        conditions = []
+        parameters = []
+
+        if project_type is not None:
+            conditions.append("(type = ? OR (? = 'archived' AND is_archived))")
+            parameters += [project_type, project_type]
+
+        if project_tag:
+            conditions.append(
+                "id IN (SELECT project_id FROM project_tags WHERE tag_id = ?)"
+            )
+            parameters.append(str(project_tag))
+
+        if search_query:
+            condition, condition_parameters = self.get_name_filter(
+                "projects", search_query
+            )
+            conditions.append(condition)
+            parameters += condition_parameters
+
+        if project_ids:
+            conditions.append(
+                f"CAST(id AS TEXT) IN ({', '.join('?' * len(project_ids))})"
+            )
+            parameters += list(project_ids)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sort_order = get_sort_order(sort_by)
+        order_by = {
+            "updatedAt": "updated_at DESC, id",
+            "name": "name, id",
+            "id": "id",
+        }[sort_order]
+
+        with phase("query"):
+            total = connection.execute(
+                f"SELECT COUNT(*) FROM projects {where}", parameters
+            ).fetchone()[0]
+
+        # Keyset condition, the page starts right after the cursor in the index of the sort
+        if cursor:
+            position = decode_cursor(sort_by, cursor)
+            conditions.append(
+                {
+                    "updatedAt": "(updated_at < ? OR (updated_at = ? AND id > ?))",
+                    "name": "(name > ? OR (name = ? AND id > ?))",
+                    "id": "id > ?",
+                }[sort_order]
+            )
+
+            if sort_order == "updatedAt":
+                parameters += [-position[0], -position[0], position[1]]
+            elif sort_order == "name":
+                parameters += [position[0], position[0], position[1]]
+            else:
+                parameters += [position[0]]
+
+            where = f"WHERE {' AND '.join(conditions)}"
+
+        # One more row tells if there is a next page
+        with phase("query"):
+            rows = connection.execute(
+                f"SELECT id, name, updated_at, document FROM projects {where} "
+                f"ORDER BY {order_by} LIMIT ? OFFSET ?",
+                parameters + [limit + 1, offset],
+            ).fetchall()
+
+        next_cursor = None
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            project_id, name, updated_at, _ = rows[-1]
+            next_cursor = encode_cursor(
+                sort_by, {"id": project_id, "name": name, "updatedAt": updated_at}
+            )
+
+        with phase("decode"):
+            return [json.loads(row[3]) for row in rows], total, next_cursor
+
+    def get_project(self, project_id, search_query=""):
+        """
+        Returns a project with its screens whose name contains the query, see ProjectCatalog.get_project.
+        """
+        connection = self.connect()
+
+        with phase("query"):
+            row = connection.execute(
+                "SELECT document, screens_document FROM projects WHERE id = ?",
+                (project_id,),
+            ).fetchone()
+
+        if row is None:
+            raise FileNotFoundError("Project not found")
+
+        document, screens_document = row
+
+        with phase("decode"):
+            project_data = json.loads(document)
+
+        if screens_document is not None:
+            with phase("decode"):
+                screens_data = json.loads(screens_document)
+
+            screens_data["screens"] = []
+            screens_data["archivedscreens"] = []
+
+            condition, parameters = "1", []
+
+            if search_query:
+                condition, parameters = self.get_name_filter("screens", search_query)
+
+            with phase("query"):
+                rows = connection.execute(
+                    f"SELECT list_name, document FROM screens "
+                    f"WHERE project_id = ? AND {condition} ORDER BY position",
+                    [project_id] + parameters,
+                ).fetchall()
+
+            with phase("decode"):
+                for list_name, document in rows:
+                    screens_data[list_name].append(json.loads(document))
+
+            project_data["screens"] = screens_data
+
+        return project_data
+
+    def get_share_project_id(self, share_key):
+        with phase("query"):
+            row = (
+                self.connect()
+                .execute(
+                    "SELECT project_id FROM shares WHERE key = ?", (share_key.lower(),)
+                )
+                .fetchone()
+            )
+
+        return str(row[0]) if row else None
+
+    def get_tags(self):
+        with phase("query"):
+            rows = (
+                self.connect()
+                .execute("SELECT document FROM tags ORDER BY position")
+                .fetchall()
+            )
+
+        with phase("decode"):
+            return [json.loads(document) for (document,) in rows]
+
+
+def create_catalog(root: Path):
+    """
+    Creates the catalog of a docs folder, of the CATALOG_BACKEND kind.
+
+    Args:
+        root (Path): The docs folder.
+
+    Returns:
+        ProjectCatalog or SqliteCatalog: The catalog.
+    """
+    if CATALOG_BACKEND == "sqlite":
+        return SqliteCatalog(root / CATALOG_DB_FILE_NAME)
+
+    catalog = ProjectCatalog(root)
+    catalog.refresh(force=True)
+
+    return catalog
+
+
+def get_catalog():
+    """
+    Returns the catalog of the docs folder served by the current app.
+
+    Returns:
+        ProjectCatalog or SqliteCatalog: The catalog.
+    """
+    return current_app.extensions["catalog"]
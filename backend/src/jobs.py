@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from src.scraper.main import run_scraper
+from src.scraper.src.progress import progress, ScrapeCancelled, PROGRESS_UNITS
+from src.scraper.src.lock import (
+    SCRAPE_JOBS_DIR_NAME,
+    SCRAPE_JOB_LOCK_FILE_NAME,
+    ScraperAlreadyRunning,
+    is_scrape_running,
+    scrape_lock,
+)
+
+# Seconds between two saves of the progress of the running job, and checks of its cancellation
+SCRAPE_JOB_UPDATE_INTERVAL = float(os.getenv("SCRAPE_JOB_UPDATE_INTERVAL", 1))
+
+# Number of finished jobs kept
+SCRAPE_JOBS_KEPT = int(os.getenv("SCRAPE_JOBS_KEPT", 20))
+
+# A job not saved for this many seconds was interrupted with the process running it
+SCRAPE_JOB_STALE_AFTER = 30
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+
+class ScrapeJobs:
+    """
+    Scrapings run in the background of the API, one at a time.
+
+    Each job is saved as a JSON file in the docs folder, with its status and the progress
+    of the scraping, so it can be polled and cancelled from any worker of the API. The
+    worker running it saves it every `SCRAPE_JOB_UPDATE_INTERVAL` seconds, and cancels the
+    scraping when the cancellation file of the job appears.
+
+    A job is accepted once its worker holds the job lock of the jobs folder, until the job
+    is finished, so the workers never start two jobs at once. The scraper lock of the docs
+    folder rejects the jobs while a command line scraping is running.
+    """
+
+    def __init__(self, docs_root: Path):
+        self.docs_root = docs_root
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrape")
+        self.active_job_id = None
+        self.job_lock = ExitStack()
+
+    @property
+    def jobs_dir(self):
+        return self.docs_root / SCRAPE_JOBS_DIR_NAME
+
+    def get_job_path(self, job_id):
+        return self.jobs_dir / f"{job_id}.json"
+
+    def get_cancel_path(self, job_id):
+        return self.jobs_dir / f"{job_id}.cancel"
+
+    def save(self, job):
+        job["updatedAt"] = time.time()
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        job_path = self.get_job_path(job["id"])
+        temp_path = job_path.with_name(f".{job_path.name}.{uuid.uuid4().hex}.part")
+        temp_path.write_text(json.dumps(job))
+        os.replace(temp_path, job_path)
+
+    def load(self, job_id):
+        try:
+            with self.get_job_path(job_id).open("r") as f:
+                job = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        # The worker running the job stopped without finishing it
+        if (
+            job["status"] in ACTIVE_STATUSES
+            and time.time() - job["updatedAt"] > SCRAPE_JOB_STALE_AFTER
+        ):
+            job["status"] = "interrupted"
+
+        return job
+
+    def submit(self, option=None, engine=None):
+        """
+        Queues a scraping.
+
+        Args:
+            option (str): 'update' or 'overwrite' when the docs folder already exists.
+            engine (str): 'threads' or 'async', SCRAPER_ENGINE by default.
+
+        Returns:
+            dict: The job.
+
+        Raises:
+            ScraperAlreadyRunning: If a scraping is already running on the docs folder.
+        """
+        with self.lock:
+            if self.active_job_id is not None or is_scrape_running(self.docs_root):
+                raise ScraperAlreadyRunning("Scraping is already running")
+
+            # Held until the job is finished, another worker may be accepting a job
+            self.job_lock.enter_context(
+                scrape_lock(self.jobs_dir, SCRAPE_JOB_LOCK_FILE_NAME)
+            )
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "option": option,
+                "engine": engine,
+                "status": "queued",
+                "error": None,
+                "progress": {unit: {"done": 0, "total": 0} for unit in PROGRESS_UNITS},
+                "createdAt": time.time(),
+                "startedAt": None,
+                "finishedAt": None,
+            }
+
+            try:
+                self.save(job)
+            except OSError:
+                self.job_lock.close()
+                raise
+
+            self.active_job_id = job["id"]
+
+        self.prune()
+        self.executor.submit(self.run, job)
+
+        return job
+
+    def run(self, job):
+        """
+        Runs a job in the background thread, saving its progress while the scraper runs.
+        """
+        stopped = threading.Event()
+
+        def monitor():
+            while not stopped.wait(SCRAPE_JOB_UPDATE_INTERVAL):
+                if self.get_cancel_path(job["id"]).exists():
+                    progress.cancel()
+
+                job["progress"] = progress.snapshot()
+                self.save(job)
+
+        monitor_thread = threading.Thread(target=monitor, daemon=True)
+
+        try:
+            if self.get_cancel_path(job["id"]).exists():
+                job["status"] = "cancelled"
+                return
+
+            job["status"] = "running"
+            job["startedAt"] = time.time()
+            self.save(job)
+            monitor_thread.start()
+
+            run_scraper(option=job["option"], engine=job["engine"])
+            job["status"] = "succeeded"
+        except ScrapeCancelled:
+            job["status"] = "cancelled"
+        except Exception as e:
+            # Log the error and keep it in the job
+            print(f"Error occurred: {e}")  # Ensure this shows in the container logs
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            stopped.set()
+
+            if monitor_thread.is_alive():
+                monitor_thread.join()
+
+            job["progress"] = progress.snapshot()
+            job["finishedAt"] = time.time()
+            self.save(job)
+
+            with self.lock:
+                self.active_job_id = None
+                self.job_lock.close()
+
+    def get(self, job_id):
+        """
+        Returns a job.
+
+        Args:
+            job_id (str): The id of the job.
+
+        Returns:
+            dict or None: The job, None if it doesn't exist.
+        """
+        if not is_job_id(job_id):
+            return None
+
+        return self.load(job_id)
+
+    def list_jobs(self):
+        """
+        Returns the jobs, the most recent first.
+
+        Returns:
+            list: The jobs.
+        """
+        if not self.jobs_dir.is_dir():
+            return []
+
+        jobs = [self.load(path.stem) for path in self.jobs_dir.glob("*.json")]
+
+        return sorted(
+            (job for job in jobs if job is not None),
+            key=lambda job: job["createdAt"],
+            reverse=True,
+        )
+
+    def cancel(self, job_id):
+        """
+        Requests the cancellation of a job. The scraping stops once the screens in progress are saved.
+
+        Args:
+            job_id (str): The id of the job.
+
+        Returns:
+            dict or None: The job, None if it doesn't exist.
+        """
+        job = self.get(job_id)
+
+        if job is not None and job["status"] in ACTIVE_STATUSES:
+            self.get_cancel_path(job_id).touch()
+
+        return job
+
+    def prune(self):
+        """
+        Removes the oldest finished jobs beyond `SCRAPE_JOBS_KEPT`.
+        """
+        finished_jobs = [
+            job for job in self.list_jobs() if job["status"] not in ACTIVE_STATUSES
+        ]
+
+        for job in finished_jobs[SCRAPE_JOBS_KEPT:]:
+            self.get_job_path(job["id"]).unlink(missing_ok=True)
+            self.get_cancel_path(job["id"]).unlink(missing_ok=True)
+
+
+def is_job_id(job_id):
+    return len(job_id) == 32 and all(c in "0123456789abcdef" for c in job_id)
+
+
+def get_scrape_jobs():
+    """
+    Returns the scrape jobs of the docs folder served by the current app.
+
+    Returns:
+        ScrapeJobs: The jobs.
+    """
+    return current_app.extensions["scrape_jobs"]
@@ -0,0 +1,133 @@
+import posixpath
+from pathlib import Path, PurePosixPath
+
+from flask import current_app, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+from src.scraper.src.blob_store import BLOB_STORE_FOLDER
+from src.scraper.src.compression import get_compressed_variant
+from src.scraper.src.derivatives import get_derivative, is_image
+
+
+def send_json_file(json_path: Path):
+    """
+    Sends a JSON file as it is stored, without parsing it.
+
+    When the client accepts it, the precompressed variant written by the scraper (brotli
+    or gzip) is sent instead, with its Content-Encoding. The response has a strong ETag
+    built from the modification time, size and path of the file sent, and is answered
+    with a 304 when the client already has it (If-None-Match).
+
+    Args:
+        json_path (Path): The JSON file.
+
+    Returns:
+        Response: The file response.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+    """
+    variant = get_compressed_variant(json_path, request.accept_encodings)
+
+    if variant is None:
+        response = send_file(json_path, mimetype="application/json", conditional=True)
+    else:
+        variant_path, encoding = variant
+        response = send_file(
+            variant_path, mimetype="application/json", conditional=True
+        )
+        response.headers["Content-Encoding"] = encoding
+
+    response.vary.add("Accept-Encoding")
+
+    return response
+
+
+def accepts_webp():
+    # Browsers send image/webp explicitly when they support it, */* isn't enough
+    return any(
+        mimetype == "image/webp" and quality > 0
+        for mimetype, quality in request.accept_mimetypes
+    )
+
+
+def send_image_file(image_path: Path, width):
+    """
+    Sends the narrowest WebP derivative of an image at least `width` pixels wide.
+
+    The image itself is sent when the client doesn't accept WebP, or when no derivative
+    is wide enough or up to date.
+
+    Args:
+        image_path (Path): The image.
+        width (int): The width the image is displayed at, in device pixels.
+
+    Returns:
+        Response: The file response.
+
+    Raises:
+        FileNotFoundError: If the image doesn't exist.
+    """
+    derivative_path = get_derivative(image_path, width) if accepts_webp() else None
+
+    if derivative_path is None:
+        response = send_file(image_path, conditional=True)
+    else:
+        response = send_file(derivative_path, mimetype="image/webp", conditional=True)
+
+    response.vary.add("Accept")
+
+    return response
+
+
+def is_private_file(filename):
+    # The scraper's own files: the blob store and its index of the downloaded URLs, and the
+    # hidden files (journal, jobs, catalog database, partial downloads)
+    path = PurePosixPath(posixpath.normpath(filename))
+
+    return path.is_relative_to(BLOB_STORE_FOLDER) or any(
+        part.startswith(".") for part in path.parts
+    )
+
+
+def send_static_file(filename):
+    """
+    Serves the docs folder, the JSON files through `send_json_file` and the images asked
+    with a `width` through `send_image_file`. The scraper's own files (blob store, hidden
+    files) aren't served.
+
+    Args:
+        filename (str): The path of the file in the docs folder.
+
+    Returns:
+        Response: The file response.
+    """
+    if is_private_file(filename):
+        raise NotFound()
+
+    width = request.args.get("width", type=int)
+
+    if width and is_image(Path(filename)):
+        image_path = safe_join(current_app.static_folder, filename)
+
+        if image_path is None:
+            raise NotFound()
+
+        try:
+            return send_image_file(Path(image_path), width)
+        except (FileNotFoundError, IsADirectoryError):
+            raise NotFound()
+
+    if not filename.endswith(".json"):
+        return current_app.send_static_file(filename)
+
+    json_path = safe_join(current_app.static_folder, filename)
+
+    if json_path is None:
+        raise NotFound()
+
+    try:
+        return send_json_file(Path(json_path))
+    except (FileNotFoundError, IsADirectoryError):
+        raise NotFound()
@@ -3,3 +3,4 @@ from .projects import blueprint as projects
 from .tags import blueprint as tags
 from .scrape import blueprint as scrape
 from .shares import blueprint as shares
+from .stats import blueprint as stats
@@ -1,21 +1,28 @@
+import os
 import re
 import json
 import math
 from pathlib import Path
-from unidecode import unidecode
-from concurrent.futures import ThreadPoolExecutor
 
 from flask import Blueprint, jsonify, current_app, request
 
+from src.catalog import get_catalog, InvalidCursorError
+
 blueprint = Blueprint("projects", __name__)
 
+# Maximum number of projects returned by a page of /projects
+PROJECTS_MAX_LIMIT = max(1, int(os.getenv("PROJECTS_MAX_LIMIT", 100)))
+
 
 @blueprint.route("/projects")
 def fetch_projects():
     # Get pagination parameters
-    limit = int(request.args.get("limit", 40))
+    limit = min(max(int(request.args.get("limit", 40)), 1), PROJECTS_MAX_LIMIT)
     page = int(request.args.get("page", 1))
 
+    # Cursor of the previous page, replaces the page offset if provided
+    cursor = request.args.get("cursor")
+
     # Get type, tag and search query if provided
     project_type = request.args.get("type", "all")
     project_tag = request.args.get("tag", "all")
@@ -31,71 +38,25 @@ def fetch_projects():
         project_tag = None
 
     # Get specific list of projects by their ids
-    project_ids = request.args.getlist("project_ids")
-
-    projects_dir = Path(current_app.static_folder) / "projects"
-    projects = []
-
-    def process_project(project_dir):
-        """Process a single project."""
-        project_json_path = project_dir / "project.json"
-        if project_json_path.exists():
-            with project_json_path.open("r") as file:
-                project = json.load(file)
-                project_data = project.get("data")
-
-                # Apply filters
-                include_project = (
-                    (
-                        project_type is None
-                        or project_data.get("type") == project_type
-                        or (
-                            project_type == "archived"
-                            and project_data.get("isArchived")
-                        )
-                    )
-                    and (
-                        not project_tag
-                        or any(
-                            str(tag.get("id")) == str(project_tag)
-                            for tag in project_data.get("tags", [])
-                        )
-                    )
-                    and (
-                        not search_query
-                        or unidecode(search_query.lower())
-                        in unidecode(project_data.get("name", "").lower())
-                    )
-                    and (
-                        not project_ids
-                        or str(project_data.get("id")) in map(str, project_ids)
-                    )
-                )
-
-                if include_project:
-                    return project
-        return None
+    project_ids = set(map(str, request.args.getlist("project_ids")))
 
     try:
-        # Multithreaded project processing
-        with ThreadPoolExecutor() as executor:
-            # Filter valid projects by removing `None` results
-            projects = list(
-                filter(None, executor.map(process_project, projects_dir.iterdir()))
-            )
-
-        # Sort projects based on the provided sort parameter
-        if sort_by == "updatedAt":
-            projects.sort(key=lambda x: x["data"]["updatedAt"], reverse=True)
-        elif sort_by == "name":
-            projects.sort(key=lambda x: x["data"]["name"])
+        # Filtered, sorted and paged by the catalog
+        paginated_projects, total_projects, next_cursor = get_catalog().query_projects(
+            project_type,
+            project_tag,
+            search_query,
+            project_ids,
+            sort_by,
+            offset=0 if cursor else (page - 1) * limit,
+            limit=limit,
+            cursor=cursor,
+        )
 
         # Pagination
-        total_projects = len(projects)
         total_pages = math.ceil(total_projects / limit)
         start_index = (page - 1) * limit
         end_index = start_index + limit
-        paginated_projects = projects[start_index:end_index]
 
         # Calculate next page number
         next_page = page + 1 if end_index < total_projects else 1
@@ -111,8 +72,11 @@ def fetch_projects():
                 "limit": limit,
                 "nextPage": next_page,
                 "previousPage": previous_page,
+                "nextCursor": next_cursor,
             }
         )
+    except InvalidCursorError:
+        return "Invalid cursor", 400
     except FileNotFoundError:
         return "Projects directory not found", 404
     except Exception as e:
@@ -123,36 +87,9 @@ def fetch_projects():
 def get_project(project_id):
     # Get search query if provided
     search_query = request.args.get("search", "")
-    project_dir = Path(current_app.static_folder) / "projects" / str(project_id)
-    project_json_path = project_dir / "project.json"
-    screens_json_path = project_dir / "screens.json"
 
     try:
-        with project_json_path.open("r") as project_file:
-            project_data = json.load(project_file)
-
-        if screens_json_path.exists():
-            with screens_json_path.open("r") as screens_file:
-                screens_data = json.load(screens_file)
-
-                # Filter the screens
-                filtered_screens = [
-                    screen
-                    for screen in screens_data.get("screens", [])
-                    if unidecode(search_query.lower())
-                    in unidecode(screen.get("name", "").lower())
-                ]
-                screens_data["screens"] = filtered_screens
-                # Filter the archived screens
-                filtered_archived_screens = [
-                    screen
-                    for screen in screens_data.get("archivedscreens", [])
-                    if unidecode(search_query.lower())
-                    in unidecode(screen.get("name", "").lower())
-                ]
-                screens_data["archivedscreens"] = filtered_archived_screens
-                # Add the screens_data to the project_data
-                project_data["screens"] = screens_data
+        project_data = get_catalog().get_project(project_id, search_query)
 
         return jsonify(project_data)
 
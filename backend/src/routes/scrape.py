@@ -1,10 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from enum import Enum
-from src.scraper.main import run_scraper
+from pathlib import Path
 
-blueprint = Blueprint("scrape", __name__)
+from src.jobs import get_scrape_jobs
+from src.scraper.src.lock import ScraperAlreadyRunning
+from src.scraper.src.metrics import get_metrics_text
 
-is_already_running = False
+blueprint = Blueprint("scrape", __name__)
 
 
 class Option(Enum):
@@ -12,14 +14,9 @@ class Option(Enum):
     OVERWRITE = "overwrite"
 
 
-@blueprint.route("/scrape", methods=["GET"])
-@blueprint.route("/scrape/<string:option>", methods=["GET"])
+@blueprint.route("/scrape", methods=["GET", "POST"])
+@blueprint.route("/scrape/<string:option>", methods=["GET", "POST"])
 def scrape(option=None):
-    global is_already_running
-
-    if is_already_running:
-        return jsonify({"error": "Scraping is already running"}), 200
-
     # Determine option from URL parameter if not provided as a path segment
     query_option = request.args.get("option")
 
@@ -45,12 +42,44 @@ def scrape(option=None):
         option = None
 
     try:
-        is_already_running = True
-        run_scraper(option=option)
-        return jsonify({"message": "Docs processed successfully"}), 200
+        # The scraping runs in the background, its progress is polled from /scrape/jobs/<id>
+        job = get_scrape_jobs().submit(option=option)
+        return jsonify(job), 202
+    except ScraperAlreadyRunning:
+        return jsonify({"error": "Scraping is already running"}), 409
     except Exception as e:
-        # Log the error and return it in the response
-        print(f"Error occurred: {e}")  # Ensure this shows in the container logs
         return jsonify({"error": str(e)}), 500
-    finally:
-        is_already_running = False
+
+
+@blueprint.route("/scrape/jobs")
+def fetch_scrape_jobs():
+    return jsonify(get_scrape_jobs().list_jobs())
+
+
+@blueprint.route("/scrape/jobs/<string:job_id>")
+def get_scrape_job(job_id):
+    job = get_scrape_jobs().get(job_id)
+
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(job)
+
+
+@blueprint.route("/scrape/jobs/<string:job_id>", methods=["DELETE"])
+def cancel_scrape_job(job_id):
+    job = get_scrape_jobs().cancel(job_id)
+
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(job), 202
+
+
+@blueprint.route("/metrics")
+def fetch_metrics():
+    # Metrics of the running or last scraping, in the Prometheus text format
+    return Response(
+        get_metrics_text(Path(current_app.static_folder)),
+        mimetype="text/plain; version=0.0.4",
+    )
@@ -1,7 +1,8 @@
-import json
 from pathlib import Path
 
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, current_app
+
+from src.responses import send_json_file
 
 blueprint = Blueprint("screens", __name__)
 
@@ -19,16 +20,8 @@ def get_screen(project_id, screen_id):
     screen_json_path = screen_dir / "screen.json"
 
     try:
-        if screen_json_path.exists():
-            with screen_json_path.open("r") as screen_file:
-                screen_data = json.load(screen_file)
-
-            return jsonify(screen_data)
-        else:
-            return (
-                "Screen not found",
-                404,
-            )
+        # The stored bytes are sent as they are, precompressed if accepted
+        return send_json_file(screen_json_path)
     except FileNotFoundError:
         return "Screen not found", 404
     except Exception as e:
@@ -48,16 +41,8 @@ def get_screen_inspect(project_id, screen_id):
     inspect_json_path = screen_dir / "inspect.json"
 
     try:
-        if inspect_json_path.exists():
-            with inspect_json_path.open("r") as inspect_file:
-                inspect_data = json.load(inspect_file)
-
-            return jsonify(inspect_data)
-        else:
-            return (
-                "Inspect data not found",
-                404,
-            )
+        # The stored bytes are sent as they are, precompressed if accepted
+        return send_json_file(inspect_json_path)
     except FileNotFoundError:
         return "Inspect data not found", 404
     except Exception as e:
@@ -77,16 +62,8 @@ def get_screen_history(project_id, screen_id):
     history_json_path = screen_dir / "history.json"
 
     try:
-        if history_json_path.exists():
-            with history_json_path.open("r") as history_file:
-                history_data = json.load(history_file)
-
-            return jsonify(history_data)
-        else:
-            return (
-                "History data not found",
-                404,
-            )
+        # The stored bytes are sent as they are, precompressed if accepted
+        return send_json_file(history_json_path)
     except FileNotFoundError:
         return "History data not found", 404
     except Exception as e:
@@ -0,0 +1,9 @@
+from flask import Blueprint, jsonify, current_app
+
+blueprint = Blueprint("stats", __name__)
+
+
+@blueprint.route("/stats")
+def fetch_stats():
+    # Latency of the routes served by all the processes of the API, with their phases
+    return jsonify(current_app.extensions["route_stats"].summary())
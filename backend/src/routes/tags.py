@@ -1,6 +1,6 @@
-import json
-from pathlib import Path
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify
+
+from src.catalog import get_catalog
 
 blueprint = Blueprint("tags", __name__)
 
@@ -8,15 +8,10 @@ blueprint = Blueprint("tags", __name__)
 @blueprint.route("/tags")
 def fetch_tags():
     try:
-        tags_json_path = Path(current_app.static_folder) / "common" / "tags.json"
-
-        if tags_json_path.exists():
-            # Read JSON file
-            with tags_json_path.open("r") as file:
-                tags = json.load(file)
+        tags = get_catalog().get_tags()
 
-                return jsonify(tags)
-        else:
-            return "Tags file not found", 404
+        return jsonify(tags)
+    except FileNotFoundError:
+        return "Tags file not found", 404
     except Exception as e:
         return f"Error fetching tags: {e}", 500
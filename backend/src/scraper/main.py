@@ -1,12 +1,26 @@
 import os
 import sys
 import shutil
-import requests
+import asyncio
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
 from .src.browse import browse_projects
+from .src.async_browse import browse_projects as browse_projects_async
 from .src.utils import color_print
+from .src.retry import retry_policy
+from .src.concurrency import concurrency
+from .src.session import create_session, get_pool_stats, pool_full_counter
+from .src.blob_store import blob_store
+from .src.http_cache import http_cache
+from .src.journal import journal
+from .src.generation import bump_generation
+from .src.catalog_db import catalog_db
+from .src.derivatives import image_derivatives
+from .src.progress import progress, ScrapeCancelled
+from .src.metrics import metrics
+from .src.lock import scrape_lock, ScraperAlreadyRunning, KEPT_ON_OVERWRITE
 from .src.api_requests import login_classic, login_api
 
 load_dotenv()
@@ -14,13 +28,35 @@ load_dotenv()
 # Constants for directories
 DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
 
+# Scraping engine, "threads" (requests) or "async" (asyncio)
+SCRAPER_ENGINE = os.getenv("SCRAPER_ENGINE", "threads")
+
+
+def run_scraper(option=None, engine=None):
+    """
+    Scrapes the projects in the docs folder, holding its lock.
+
+    Args:
+        option (str): 'update' or 'overwrite' when the docs folder already exists.
+        engine (str): 'threads' or 'async', SCRAPER_ENGINE by default.
+
+    Raises:
+        ScraperAlreadyRunning: If another scraper is writing the docs folder.
+        ScrapeCancelled: If the scraping was cancelled, once the work in progress is saved.
+    """
+    engine = engine or SCRAPER_ENGINE
+
+    if engine not in ["threads", "async"]:
+        color_print(f"Invalid engine '{engine}'. Expected 'threads' or 'async'.", "red")
+        raise ValueError(f"Invalid engine '{engine}'. Expected 'threads' or 'async'.")
 
-def run_scraper(option=None):
     # Validate if DOCS_ROOT exists, is not empty, and no valid option is provided
     if (
         Path(DOCS_ROOT).exists()
         and Path(DOCS_ROOT).is_dir()
-        and any(Path(DOCS_ROOT).iterdir())
+        and any(
+            path.name not in KEPT_ON_OVERWRITE for path in Path(DOCS_ROOT).iterdir()
+        )
         and (not option or option not in ["overwrite", "update"])
     ):
         color_print(
@@ -31,47 +67,162 @@ def run_scraper(option=None):
             f"Docs folder already exists. Expected 'overwrite' or 'update' option."
         )
 
+    with scrape_lock(Path(DOCS_ROOT)):
+        progress.reset()
+        # The retry budgets of a previous scraping of the process don't carry over
+        retry_policy.reset()
+
+        # The metrics are written to the docs folder while the scraper runs, and at its end
+        with metrics.recording(Path(DOCS_ROOT)):
+            scrape(option, engine)
+
+    if progress.is_cancelled():
+        color_print("\nScraping cancelled.", "yellow")
+        raise ScrapeCancelled("Scraping cancelled")
+
+
+def remove_docs():
+    """
+    Removes the content of the docs folder, except the lock and the scrape jobs.
+    """
+    for path in Path(DOCS_ROOT).iterdir():
+        if path.name in KEPT_ON_OVERWRITE:
+            continue
+
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+def scrape(option, engine):
+    """
+    Logs in and browses the projects with an engine, then saves the state of the scraping.
+    """
     # Email and password for scraping
     email = os.getenv("INVISION_EMAIL")
     password = os.getenv("INVISION_PASSWORD")
 
     # Setup session
-    with requests.Session() as session:
+    with create_session() as session:
         session.headers["x-client-type"] = "App"
         session.headers["calling-service"] = "auth-ui-browser"
         session.headers["User-Agent"] = (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
         )
 
-        # Authenticate
-        login_classic(email, password, session)
-        login_api(email, password, session)
-
-        # If the option is invalid
-        if option is not None and option not in ["update", "overwrite"]:
-            color_print(
-                f"Invalid option '{option}'. Expected 'overwrite' or 'update'.", "red"
-            )
-            raise ValueError(
-                f"Invalid option '{option}'. Expected 'overwrite' or 'update'."
-            )
-
-        # Handle 'overwrite' option
-        if option == "overwrite":
-            shutil.rmtree(DOCS_ROOT, ignore_errors=True)
-            color_print(
-                "Existing docs folder removed. Replaying the scraping.", "yellow"
-            )
-
-        # Handle 'update' option
-        elif option == "update":
-            color_print(
-                "Existing files in folders will be ignored. Replaying the scraping.",
-                "yellow",
-            )
-
-        # Start scraping
-        browse_projects(session, option)
+        # The state of the scraping is saved even when it fails, and the databases closed
+        try:
+            # Authenticate
+            login_classic(email, password, session)
+            login_api(email, password, session)
+
+            # If the option is invalid
+            if option is not None and option not in ["update", "overwrite"]:
+                color_print(
+                    f"Invalid option '{option}'. Expected 'overwrite' or 'update'.",
+                    "red",
+                )
+                raise ValueError(
+                    f"Invalid option '{option}'. Expected 'overwrite' or 'update'."
+                )
+
+            # Handle 'overwrite' option
+            if option == "overwrite":
+                remove_docs()
+                color_print(
+                    "Existing docs folder removed. Replaying the scraping.", "yellow"
+                )
+
+            # Handle 'update' option
+            elif option == "update":
+                color_print(
+                    "Existing files in folders will be ignored. Replaying the scraping.",
+                    "yellow",
+                )
+
+            # Start scraping
+            if engine == "async":
+                asyncio.run(browse_projects_async(session, option))
+            else:
+                browse_projects(session, option)
+
+            # Resized variants of the new and changed images, once they are all downloaded
+            image_derivatives.generate()
+
+            print_retry_summary()
+            print_concurrency_summary()
+            print_pool_summary(session)
+            print_metrics_summary()
+        finally:
+            blob_store.finalize()
+            http_cache.finalize()
+            journal.finalize()
+            catalog_db.finalize()
+
+        bump_generation()
+
+
+def print_retry_summary():
+    retry_summary = retry_policy.summary()
+
+    if not retry_summary:
+        return
+
+    color_print("\nRetries:", "yellow")
+
+    for host, host_stats in retry_summary.items():
+        color_print(
+            f" • {host}: {host_stats['retries']} retries, {host_stats['waited']:.1f}s waited",
+            "yellow",
+        )
+
+
+def print_concurrency_summary():
+    concurrency_summary = concurrency.summary()
+
+    color_print(
+        f"\nConcurrency window: {concurrency_summary['limit']} requests in flight "
+        f"({len(concurrency_summary['adjustments'])} adjustments, "
+        f"{concurrency_summary['minimum']}-{concurrency_summary['maximum']} allowed)",
+        "yellow",
+    )
+
+
+def print_pool_summary(session):
+    color_print("\nConnections:", "yellow")
+
+    for host, host_stats in get_pool_stats(session).items():
+        color_print(
+            f" • {host}: {host_stats['requests']} requests, {host_stats['connections']} connections opened, "
+            f"{host_stats['reused']} kept alive",
+            "yellow",
+        )
+
+    if pool_full_counter.count:
+        color_print(
+            f" • {pool_full_counter.count} connections discarded because their pool was full",
+            "yellow",
+        )
+
+
+def print_metrics_summary():
+    endpoints = metrics.snapshot()["endpoints"]
+
+    if not endpoints:
+        return
+
+    color_print("\nEndpoints:", "yellow")
+
+    for endpoint, endpoint_stats in sorted(
+        endpoints.items(), key=lambda item: item[1]["seconds"], reverse=True
+    ):
+        color_print(
+            f" • {endpoint}: {endpoint_stats['requests']} requests ({endpoint_stats['requestsPerSecond']}/s), "
+            f"{endpoint_stats['averageSeconds']:.3f}s on average, {endpoint_stats['bytes'] / 1024 / 1024:.1f} MB, "
+            f"{endpoint_stats['retries']} retries",
+            "yellow",
+        )
 
 
 if __name__ == "__main__":
@@ -83,6 +234,105 @@ if __name__ == "__main__":
             os.environ["CURL_CA_BUNDLE"] = str(ca_file)
             os.environ["REQUESTS_CA_BUNDLE"] = str(ca_file)
 
-    # Get the option from CLI arguments or None if not provided
-    option = sys.argv[1] if len(sys.argv) > 1 else None
-    run_scraper(option)
+    parser = argparse.ArgumentParser(description="Scrape the InVision projects.")
+    parser.add_argument(
+        "option",
+        nargs="?",
+        default=None,
+        help="'update' or 'overwrite' when the docs folder already exists",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "async"],
+        default=None,
+        help="scraping engine (defaults to the SCRAPER_ENGINE env variable or 'threads')",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="maximum number of retries per request (SCRAPER_MAX_RETRIES)",
+    )
+    parser.add_argument(
+        "--backoff-base",
+        type=float,
+        help="base delay in seconds of the exponential backoff (SCRAPER_BACKOFF_BASE)",
+    )
+    parser.add_argument(
+        "--backoff-max",
+        type=float,
+        help="maximum delay in seconds of the exponential backoff (SCRAPER_BACKOFF_MAX)",
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=float,
+        help="number of retries a host can use before failing fast (SCRAPER_RETRY_BUDGET)",
+    )
+    parser.add_argument(
+        "--concurrency-initial",
+        type=int,
+        help="initial number of requests in flight (SCRAPER_CONCURRENCY_INITIAL)",
+    )
+    parser.add_argument(
+        "--concurrency-max",
+        type=int,
+        help="maximum number of requests in flight (SCRAPER_CONCURRENCY_MAX)",
+    )
+    parser.add_argument(
+        "--blob-store",
+        action="store_true",
+        help="store the assets once by content and link them in the projects (SCRAPER_BLOB_STORE)",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="don't revalidate the cached API responses (SCRAPER_HTTP_CACHE=0)",
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="don't skip the work completed by previous scrapings (SCRAPER_JOURNAL=0)",
+    )
+    parser.add_argument(
+        "--no-catalog-db",
+        action="store_true",
+        help="don't index the projects in the SQLite catalog (SCRAPER_CATALOG_DB=0)",
+    )
+    parser.add_argument(
+        "--no-derivatives",
+        action="store_true",
+        help="don't generate the resized variants of the images (SCRAPER_DERIVATIVES=0)",
+    )
+    args = parser.parse_args()
+
+    if args.no_derivatives:
+        image_derivatives.enabled = False
+
+    if args.no_http_cache:
+        http_cache.enabled = False
+
+    if args.no_catalog_db:
+        catalog_db.enabled = False
+
+    if args.no_journal:
+        journal.enabled = False
+
+    if args.blob_store:
+        blob_store.enabled = True
+
+    retry_policy.configure(
+        max_retries=args.max_retries,
+        backoff_base=args.backoff_base,
+        backoff_max=args.backoff_max,
+        budget=args.retry_budget,
+    )
+
+    concurrency.configure(
+        window=args.concurrency_initial,
+        maximum=args.concurrency_max,
+    )
+
+    try:
+        run_scraper(args.option, engine=args.engine)
+    except ScraperAlreadyRunning as e:
+        color_print(f"{e} on {DOCS_ROOT}.", "red")
+        sys.exit(1)
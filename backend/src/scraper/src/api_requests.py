@@ -6,69 +6,162 @@ from requests.exceptions import HTTPError, RequestException
 
 import time
 import json
+import hashlib
+import tempfile
+import threading
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils import color_print, is_link
-
-max_retries = 10
-cooldown = 120
+from .retry import retry_policy, RETRY_STATUSES
+from .concurrency import concurrency
+from .blob_store import blob_store
+from .http_cache import http_cache
+from .journal import journal
+from .progress import progress
+from .metrics import metrics, get_endpoint
+from .compression import write_compressed_variants
 
 # Constants for directories
 DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
 
+# Base URLs of InVision, which can point to a local server (bench.fake_invision)
+INVISION_API_URL = os.getenv(
+    "INVISION_API_URL", "https://projects.invisionapp.com"
+).rstrip("/")
+INVISION_LOGIN_URL = os.getenv(
+    "INVISION_LOGIN_URL", "https://login.invisionapp.com"
+).rstrip("/")
+
+# Part of the asset links preceding the path their files are saved under, without trailing slash
+INVISION_ASSET_MARKER = os.getenv("INVISION_ASSET_MARKER", "invisionapp.com")
+
+# Threads downloading assets, defaults to the maximum number of requests in flight
+SCRAPER_ASSET_WORKERS = os.getenv("SCRAPER_ASSET_WORKERS")
+
+asset_executor = None
+asset_executor_lock = threading.Lock()
+
+# Size of the chunks written while streaming a download
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Downloaded files get the permissions a regular open() would give them
+UMASK = os.umask(0)
+os.umask(UMASK)
+FILE_MODE = 0o666 & ~UMASK
 
-def request(session: Session, method, *args, **kwargs):
-    retries = 0
 
-    while retries < max_retries:
+def request(session: Session, method, *args, read_response=None, **kwargs):
+    """
+    Sends a request, retrying the failed ones.
+
+    Args:
+        session (requests.Session): Session object for making HTTP requests.
+        method (str): The HTTP method.
+        read_response (callable): Consumes the successful response, streamed, while its
+            slot of the concurrency window is held. Errors raised while reading it are retried.
+
+    Returns:
+        Response or None: The response (or the result of read_response) if successful, None otherwise.
+    """
+    url = kwargs.get("url") or args[0]
+    host = urlparse(url).netloc
+    endpoint = get_endpoint(url)
+    attempt = 0
+
+    # Revalidate the cached API responses instead of downloading them again
+    cache_key = cache_entry = None
+    if read_response:
+        kwargs["stream"] = True
+    elif http_cache.enabled and method == "GET" and not kwargs.get("stream"):
+        cache_key = http_cache.get_key(url, kwargs.get("params"))
+        cache_entry = http_cache.get(cache_key)
+
+        if cache_entry:
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                **http_cache.get_conditional_headers(cache_entry),
+            }
+
+    while True:
+        retry_after = None
+
         try:
-            if method == "GET":
-                response = session.get(*args, **kwargs)
-            elif method == "POST":
-                response = session.post(*args, **kwargs)
-            elif method == "PUT":
-                response = session.put(*args, **kwargs)
-            else:
-                raise ValueError(f"Unsupported HTTP method ({response.url}): {method}")
+            with concurrency.slot() as slot, metrics.time_request(
+                endpoint, host
+            ) as sample:
+                if method == "GET":
+                    response = session.get(*args, **kwargs)
+                elif method == "POST":
+                    response = session.post(*args, **kwargs)
+                elif method == "PUT":
+                    response = session.put(*args, **kwargs)
+                else:
+                    raise ValueError(f"Unsupported HTTP method ({url}): {method}")
+
+                slot["status"] = sample["status"] = response.status_code
 
-            if response and response.status_code == 200:
-                if response.cookies:
-                    session.cookies.update(response.cookies)
+                # The streamed downloads count their bytes while writing them
+                if read_response:
+                    # Read in the slot, the window caps the transfers and not only the requests
+                    if response.status_code == 200:
+                        with response:
+                            body = read_response(response)
+                elif not kwargs.get("stream"):
+                    sample["bytes"] = len(response.content)
+
+            if response.status_code == 200:
+                retry_policy.record_success(host)
+
+                if read_response:
+                    return body
+
+                if cache_key:
+                    http_cache.store(cache_key, url, response.headers, response.content)
+
+                # The session already stored the cookies of the response in its jar
                 return response
-            elif not response or response.status_code in {
-                500,
-                502,
-                503,
-                504,
-                429,  # Rate limit exceeded
-            }:
-                time.sleep(cooldown)  # Wait before restart
-                retries += 1
-                color_print(
-                    f"Server error {response.status_code} ({response.url}), retrying ({retries}/{max_retries})...",
-                    "yellow",
-                )
+            elif response.status_code == 304 and cache_entry:
+                retry_policy.record_success(host)
+
+                return http_cache.build_response(cache_entry, response)
+            elif response.status_code in RETRY_STATUSES:
+                retry_after = response.headers.get("Retry-After")
+                error_message = f"Server error {response.status_code} ({response.url})"
+
+                # The body of a streamed response isn't read, its connection is released
+                response.close()
             else:
                 color_print(
-                    f"Request failed: {response.text if response else 'Unknown error'}",
+                    f"Request failed {response.status_code} ({response.url}): {response.text}",
                     "red",
                 )
+                response.close()
                 return None
         except (HTTPError, RequestException) as e:
-            color_print(f"HTTP error occurred: {str(e)}", "red")
-            time.sleep(cooldown)
-            retries += 1
+            error_message = f"HTTP error occurred: {str(e)}"
 
         except Exception as e:
-            color_print(f"Unexpected error: {str(e)}", "red")
-            time.sleep(cooldown)
-            retries += 1
+            error_message = f"Unexpected error: {str(e)}"
 
-    color_print("Maximum number of retries reached. Aborting.", "red")
-    return None
+        delay = retry_policy.get_retry_delay(host, attempt, retry_after)
+
+        if delay is None:
+            color_print(
+                f"{error_message}, maximum number of retries reached. Aborting.", "red"
+            )
+            return None
+
+        attempt += 1
+        metrics.record_retry(endpoint, host, delay)
+        color_print(
+            f"{error_message}, retrying in {delay:.1f}s ({attempt}/{retry_policy.max_retries})...",
+            "yellow",
+        )
+        time.sleep(delay)  # Wait before restart
 
 
 def login_classic(email, password, session: Session):
-    url = "https://login.invisionapp.com/login-api/api/v2/login"
+    url = f"{INVISION_LOGIN_URL}/login-api/api/v2/login"
     data = {"deviceID": "App", "email": email, "password": password}
 
     response = request(session, "POST", url=url, json=data)
@@ -86,7 +179,7 @@ def login_classic(email, password, session: Session):
 
 
 def login_api(email, password, session: Session):
-    url = "https://projects.invisionapp.com/api/account/login"
+    url = f"{INVISION_API_URL}/api/account/login"
     data = {"email": email, "password": password, "webview": "false"}
     headers = {"x-xsrf-token": session.cookies.get("XSRF-TOKEN")}
 
@@ -105,7 +198,7 @@ def login_api(email, password, session: Session):
 
 
 def get_user_id(session: Session):
-    url = "https://projects.invisionapp.com/api:unifiedprojects.getProjects"
+    url = f"{INVISION_API_URL}/api:unifiedprojects.getProjects"
     headers = {"x-xsrf-token": session.cookies.get("XSRF-TOKEN")}
 
     response = request(session, "GET", url=url, headers=headers)
@@ -127,7 +220,7 @@ def get_user_id(session: Session):
 
 
 def fetch_tags(session: Session):
-    url = "https://projects.invisionapp.com/api:unifiedprojects.getTags"
+    url = f"{INVISION_API_URL}/api:unifiedprojects.getTags"
     headers = {"x-xsrf-token": session.cookies.get("XSRF-TOKEN")}
 
     response = request(session, "GET", url=url, headers=headers)
@@ -147,7 +240,7 @@ def fetch_tags(session: Session):
 
 
 def fetch_projects(isArchived, isCollaborator, session: Session):
-    url = "https://projects.invisionapp.com/api:unifiedprojects.getProjects"
+    url = f"{INVISION_API_URL}/api:unifiedprojects.getProjects"
     params = {"isArchived": isArchived, "isCollaborator": isCollaborator}
     headers = {"x-xsrf-token": session.cookies.get("XSRF-TOKEN")}
 
@@ -169,9 +262,9 @@ def fetch_projects(isArchived, isCollaborator, session: Session):
 def export_project(project, user_id, session: Session):
     try:
         if project["type"] == "prototype":
-            url = f'https://projects.invisionapp.com/d/zipexport/generate/debugProjectID/{project["id"]}/debugUserID/{user_id}'
+            url = f'{INVISION_API_URL}/d/zipexport/generate/debugProjectID/{project["id"]}/debugUserID/{user_id}'
         elif project["type"] == "board":
-            url = "https://projects.invisionapp.com/d/board_offline_zip_export/generate"
+            url = f"{INVISION_API_URL}/d/board_offline_zip_export/generate"
         else:
             color_print(f"Unknown project type: {project['type']}", "red")
             return None
@@ -211,7 +304,7 @@ def export_project(project, user_id, session: Session):
 
 
 def fetch_project_shares(project, session: Session):
-    url = "https://projects.invisionapp.com/api:project_shares_tab_partials.getView"
+    url = f"{INVISION_API_URL}/api:project_shares_tab_partials.getView"
     params = {
         "prototypeID": project["id"],
     }
@@ -235,9 +328,7 @@ def fetch_project_shares(project, session: Session):
 
 
 def get_project_archived_screens(project, session: Session):
-    url = (
-        "https://projects.invisionapp.com/api:desktop_partials.projectScreens2Archived"
-    )
+    url = f"{INVISION_API_URL}/api:desktop_partials.projectScreens2Archived"
     params = {
         "id": project["id"],
     }
@@ -263,7 +354,7 @@ def get_project_archived_screens(project, session: Session):
 
 
 def get_project_screens(project, session: Session):
-    url = "https://projects.invisionapp.com/api:desktop_partials.projectScreens2Grouped"
+    url = f"{INVISION_API_URL}/api:desktop_partials.projectScreens2Grouped"
     params = {
         "id": project["id"],
     }
@@ -289,9 +380,9 @@ def get_project_screens(project, session: Session):
 def get_screen_details(screen, session: Session):
 
     url = (
-        "https://projects.invisionapp.com/api:desktop_partials/screenQuickView"
+        f"{INVISION_API_URL}/api:desktop_partials/screenQuickView"
         if screen["isArchived"]
-        else "https://projects.invisionapp.com/api:desktop_partials.consoleScreen"
+        else f"{INVISION_API_URL}/api:desktop_partials.consoleScreen"
     )
     params = {
         "screenID": screen["id"],
@@ -317,7 +408,7 @@ def get_screen_details(screen, session: Session):
 
 
 def get_project_assets(project, session: Session):
-    url = "https://projects.invisionapp.com/api:inspect.getProjectAssets"
+    url = f"{INVISION_API_URL}/api:inspect.getProjectAssets"
     params = {
         "projectID": project["id"],
     }
@@ -340,7 +431,7 @@ def get_project_assets(project, session: Session):
 
 
 def get_screen_inspect_details(screen, session: Session):
-    url = "https://projects.invisionapp.com/api:inspect.getExtractionJSON"
+    url = f"{INVISION_API_URL}/api:inspect.getExtractionJSON"
     params = {
         "id": screen["id"],
     }
@@ -364,7 +455,7 @@ def get_screen_inspect_details(screen, session: Session):
 
 
 def get_screen_history(screen, session: Session):
-    url = "https://projects.invisionapp.com/api:desktop_partials/screenHistory"
+    url = f"{INVISION_API_URL}/api:desktop_partials/screenHistory"
     params = {
         "screenID": screen["id"],
     }
@@ -386,10 +477,75 @@ def get_screen_history(screen, session: Session):
         return None
 
 
+def create_temp_file(destination: Path):
+    """
+    Creates a hidden temporary file next to the destination, to be renamed once complete.
+
+    Args:
+        destination (Path): The path where the file will be saved.
+
+    Returns:
+        tuple: The opened binary file and its path.
+    """
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=destination.parent, prefix=f".{destination.name}.", suffix=".part"
+    )
+    os.fchmod(file_descriptor, FILE_MODE)
+
+    return os.fdopen(file_descriptor, "wb"), Path(temp_path)
+
+
+def download_to_temp_file(url, destination: Path, session: Session):
+    """
+    Streams a file to a temporary file next to its destination.
+
+    Args:
+        url (str): The URL of the file to download.
+        destination (Path): The path where the file will be saved.
+        session (requests.Session: Session): Session object for making HTTP requests.
+
+    Returns:
+        tuple or None: The temporary file path and the SHA-256 hex digest of its content, None if the download failed.
+    """
+    headers = {"x-xsrf-token": session.cookies.get("XSRF-TOKEN")}
+
+    def stream_to_temp_file(response):
+        digest = hashlib.sha256()
+        size = 0
+        temp_file, temp_path = create_temp_file(destination)
+
+        try:
+            with temp_file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    temp_file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            metrics.add_bytes(get_endpoint(url), urlparse(url).netloc, size)
+
+        return temp_path, digest.hexdigest()
+
+    result = request(
+        session, "GET", url=url, headers=headers, read_response=stream_to_temp_file
+    )
+
+    if result is None:
+        color_print(f"   ✘  Failed to download file: {url}", "red")
+
+    return result
+
+
 def download_file(url, destination: Path, session: Session):
     """
     Downloads a file from the given URL to the specified destination.
 
+    The file is streamed to a temporary file which is renamed once complete, so the
+    destination never holds a partial file and the memory used doesn't depend on its size.
+    With the blob store enabled, the file is linked from the store instead.
+
     Args:
         url (str): The URL of the file to download.
         destination (str): The path where the file will be saved.
@@ -398,23 +554,37 @@ def download_file(url, destination: Path, session: Session):
     Returns:
         bool: True if the file was downloaded successfully, False otherwise.
     """
+    # Completed downloads are known without looking at the file
+    if journal.is_done(destination):
+        return True
+
     if destination.exists():
+        journal.record(destination)
         return True
 
+    temp_path = None
+
     try:
         destination.parent.mkdir(parents=True, exist_ok=True)
 
-        headers = {"x-xsrf-token": session.cookies.get("XSRF-TOKEN")}
-
-        response = request(session, "GET", url=url, headers=headers)
-        if response and response.status_code == 200:
-            # Attempt to save the file content
-            with destination.open("wb") as f:
-                f.write(response.content)
-            return True
+        if blob_store.enabled:
+            if not blob_store.fetch(
+                url,
+                destination,
+                lambda: download_to_temp_file(url, destination, session),
+            ):
+                return False
         else:
-            color_print(f"   ✘  Failed to download file: {url}", "red")
-            return False
+            result = download_to_temp_file(url, destination, session)
+
+            if result is None:
+                return False
+
+            temp_path, _ = result
+            os.replace(temp_path, destination)
+
+        journal.record(destination)
+        return True
 
     except OSError as e:
         color_print(
@@ -425,19 +595,62 @@ def download_file(url, destination: Path, session: Session):
     except Exception as e:
         color_print(f"Unexpected error during download of {url}: {e}", "red")
         return False
+    finally:
+        if temp_path and temp_path.exists():
+            temp_path.unlink(missing_ok=True)
 
 
-def json_patch_to_local_assets(json_data, project_id, screen_id, session: Session):
+def get_local_asset_path(url, project_id, screen_id):
     """
-    Downloads files from URLs in the JSON data and updates the JSON with local file paths.
+    Computes the local path where the file behind an InVision asset URL is saved.
 
     Args:
-        json_data (dict): JSON data containing URLs of files to be downloaded.
+        url (str): The URL of the asset.
         project_id (str): ID of the project.
-        session (requests.Session: Session): Session object for making HTTP requests.
+        screen_id (str): ID of the screen, None for project level assets.
 
     Returns:
-        dict: Updated JSON data with local file paths.
+        Path: The local path of the asset.
+    """
+    project_dir = Path(DOCS_ROOT) / "projects" / str(project_id)
+    avatars_dir = Path(DOCS_ROOT) / "common" / "avatars"
+
+    # Clean the URL to remove query parameters
+    url_without_params = urlparse(url)._replace(query="").geturl()
+
+    dir_name, file_name = os.path.split(
+        url_without_params.split(f"{INVISION_ASSET_MARKER}/")[-1]
+    )
+
+    # Custom case for common assets
+    if "avatars" in dir_name:
+        return avatars_dir / file_name
+
+    # Screen versions (we save them in the screen dir under a versions dir)
+    if "versions/files" in dir_name and screen_id:
+        return project_dir / "screens" / str(screen_id) / "versions" / file_name
+
+    # Screens and thumbnails
+    if "screens/thumbnails" in dir_name or "screens/files" in dir_name:
+        file_screen_id, file_extension = os.path.splitext(file_name)
+
+        if file_screen_id:
+            file_name = f"{'thumbnail' if 'thumbnails' in dir_name else 'image'}{file_extension}"
+            dir_name = f"screens/{file_screen_id}"
+
+        return project_dir / dir_name / file_name
+
+    # Project assets
+    return project_dir / "assets" / dir_name / file_name
+
+
+def prepare_asset_folders(project_id, screen_id):
+    """
+    Creates the folders expected to exist once the assets of a payload are patched.
+
+    Args:
+        project_id (str): ID of the project.
+        screen_id (str): ID of the screen, None for project level payloads.
     """
     project_dir = Path(DOCS_ROOT) / "projects" / str(project_id)
     project_dir.mkdir(parents=True, exist_ok=True)
@@ -446,79 +659,157 @@ def json_patch_to_local_assets(json_data, project_id, screen_id, session: Sessio
     avatars_dir.mkdir(parents=True, exist_ok=True)
 
     if screen_id:
-        screen_dir = (
-            Path(DOCS_ROOT) / "projects" / str(project_id) / "screens" / str(screen_id)
-        )
-        screen_dir.mkdir(parents=True, exist_ok=True)
-
-        versions_dir = screen_dir / "versions"
+        versions_dir = project_dir / "screens" / str(screen_id) / "versions"
         versions_dir.mkdir(parents=True, exist_ok=True)
 
-    def download_and_patch(data):
-        """
-        Recursively traverses the JSON data, downloads files from URLs, and updates the data with local file paths.
-
-        Args:
-            data (dict or list): JSON data to be processed.
-        """
-        if isinstance(data, dict):
-            for key, value in list(data.items()):
-                if (
-                    isinstance(value, str)
-                    and "invisionapp.com" in value
-                    and is_link(value)
-                ):
-                    # Clean the URL to remove query parameters
-                    url_without_params = urlparse(value)._replace(query="").geturl()
-
-                    dir_name, file_name = os.path.split(
-                        url_without_params.split("invisionapp.com/")[-1]
-                    )
-
-                    # Custom case for common assets
-                    if "avatars" in dir_name:
-                        file_path = avatars_dir / file_name
-
-                    # Screen versions (we save them in the screen dir under a versions dir)
-                    elif "versions/files" in dir_name:
-                        file_path = versions_dir / file_name
-
-                    # Screens and thumbnails
-                    elif (
-                        "screens/thumbnails" in dir_name or "screens/files" in dir_name
-                    ):
-                        screen_id, file_extension = os.path.splitext(file_name)
-
-                        if screen_id:
-                            file_name = f"{'thumbnail' if 'thumbnails' in dir_name else 'image'}{file_extension}"
-                            dir_name = f"screens/{screen_id}"
-
-                        file_path = project_dir / dir_name / file_name
-
-                    # Project assets
-                    else:
-                        file_path = project_dir / "assets" / dir_name / file_name
-
-                    if download_file(value, file_path, session):
-                        data[key] = "/" + os.path.relpath(
-                            file_path,
-                            start=DOCS_ROOT,
-                        )
-                else:
-                    download_and_patch(value)
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                download_and_patch(item)
+
+def find_asset_links(data):
+    """
+    Recursively traverses the JSON data and yields every InVision asset link found.
+
+    Args:
+        data (dict or list): JSON data to be processed.
+
+    Yields:
+        tuple: The (container, key, url) of each link, so it can be patched in place.
+    """
+    if isinstance(data, dict):
+        for key, value in list(data.items()):
+            if (
+                isinstance(value, str)
+                and INVISION_ASSET_MARKER in value
+                and is_link(value)
+            ):
+                yield data, key, value
+            else:
+                yield from find_asset_links(value)
+    elif isinstance(data, list):
+        for item in data:
+            yield from find_asset_links(item)
+
+
+def has_asset_links(data):
+    """
+    Checks if the JSON data still has InVision asset links, i.e. some downloads failed once patched.
+
+    Args:
+        data (dict or list): JSON data to be checked.
+
+    Returns:
+        bool: True if an asset link remains, False otherwise.
+    """
+    return next(find_asset_links(data), None) is not None
+
+
+def collect_asset_links(json_data, project_id, screen_id):
+    """
+    Lists the asset links of the JSON data with their local path, and the files to download.
+
+    Args:
+        json_data (dict): JSON data containing URLs of files to be downloaded.
+        project_id (str): ID of the project.
+        screen_id (str): ID of the screen, None for project level payloads.
+
+    Returns:
+        tuple: The (container, key, file_path) of each link, and the URL to download per file path.
+    """
+    links = []
+    downloads = {}
+
+    for container, key, url in find_asset_links(json_data):
+        file_path = get_local_asset_path(url, project_id, screen_id)
+        links.append((container, key, file_path))
+
+        # Each file is downloaded once even if it is referenced several times
+        downloads.setdefault(file_path, url)
+
+    return links, downloads
+
+
+def patch_asset_links(links, downloaded_file_paths):
+    """
+    Replaces the asset links with the local paths of the downloaded files.
+
+    Args:
+        links (list): The (container, key, file_path) of each link.
+        downloaded_file_paths (set): The file paths which were downloaded successfully.
+    """
+    for container, key, file_path in links:
+        if file_path in downloaded_file_paths:
+            container[key] = "/" + os.path.relpath(
+                file_path,
+                start=DOCS_ROOT,
+            )
+
+
+def get_asset_executor():
+    """
+    Returns the thread pool shared by all the asset downloads, created on first use.
+
+    Returns:
+        ThreadPoolExecutor: The executor.
+    """
+    global asset_executor
+
+    with asset_executor_lock:
+        if asset_executor is None:
+            asset_executor = ThreadPoolExecutor(
+                max_workers=int(SCRAPER_ASSET_WORKERS or concurrency.maximum),
+                thread_name_prefix="asset",
+            )
+
+        return asset_executor
+
+
+def json_patch_to_local_assets(json_data, project_id, screen_id, session: Session):
+    """
+    Downloads files from URLs in the JSON data and updates the JSON with local file paths.
+
+    All the links are collected first, then the files are downloaded concurrently by the
+    shared asset pool, and finally the JSON is patched.
+
+    Args:
+        json_data (dict): JSON data containing URLs of files to be downloaded.
+        project_id (str): ID of the project.
+        session (requests.Session: Session): Session object for making HTTP requests.
+
+    Returns:
+        dict: Updated JSON data with local file paths.
+    """
+    prepare_asset_folders(project_id, screen_id)
 
     updated_json_data = json_data.copy()
-    download_and_patch(updated_json_data)
+
+    links, downloads = collect_asset_links(updated_json_data, project_id, screen_id)
+
+    progress.add_total("assets", len(downloads))
+
+    def download(url, file_path):
+        with metrics.track_active("assets"):
+            return download_file(url, file_path, session)
+
+    executor = get_asset_executor()
+    future_to_file_path = {
+        executor.submit(download, url, file_path): file_path
+        for file_path, url in downloads.items()
+    }
+
+    downloaded_file_paths = set()
+
+    for future in as_completed(future_to_file_path):
+        progress.add_done("assets")
+
+        if future.result():
+            downloaded_file_paths.add(future_to_file_path[future])
+
+    patch_asset_links(links, downloaded_file_paths)
 
     return updated_json_data
 
 
 def save_json_data(data, folder_path: Path, file_name: str):
     """
-    Saves JSON data to a file.
+    Saves JSON data to a minified file, with its precompressed variants.
 
     Args:
         data (dict): The JSON data to be saved.
@@ -533,8 +824,21 @@ def save_json_data(data, folder_path: Path, file_name: str):
     try:
         folder_path.mkdir(parents=True, exist_ok=True)
 
-        with file_path.open("w") as json_file:
-            json.dump(data, json_file, indent=4)
+        content = json.dumps(data, separators=(",", ":")).encode()
+
+        # Replaced at once, the API never reads a partial file
+        temp_file, temp_path = create_temp_file(file_path)
+
+        try:
+            with temp_file:
+                temp_file.write(content)
+
+            os.replace(temp_path, file_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        # Sent by the API to the clients accepting them
+        write_compressed_variants(file_path, content)
 
         return True
     except Exception as e:
@@ -0,0 +1,497 @@
+import os
+import json
+import asyncio
+import hashlib
+import aiohttp
+import ipaddress
+from pathlib import Path
+from yarl import URL
+from http.cookies import Morsel
+from requests import Session
+from urllib.parse import urlparse
+
+from .utils import color_print
+from .retry import retry_policy, RETRY_STATUSES
+from .concurrency import concurrency
+from .blob_store import blob_store
+from .http_cache import http_cache
+from .journal import journal
+from .progress import progress
+from .metrics import metrics, get_endpoint
+from .api_requests import (
+    INVISION_API_URL,
+    DOWNLOAD_CHUNK_SIZE,
+    create_temp_file,
+    patch_asset_links,
+    collect_asset_links,
+    prepare_asset_folders,
+)
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# Concurrency limits of the asyncio engine
+ASYNC_MAX_REQUESTS = int(os.getenv("ASYNC_MAX_REQUESTS", 1000))
+ASYNC_MAX_REQUESTS_PER_HOST = int(os.getenv("ASYNC_MAX_REQUESTS_PER_HOST", 500))
+ASYNC_REQUEST_TIMEOUT = int(os.getenv("ASYNC_REQUEST_TIMEOUT", 300))
+
+# Bytes of a download buffered before a thread writes them, the loop never waits for the disk
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Downloads in progress by destination, the payloads of a screen can share an asset
+downloads_in_flight = {}
+
+
+def is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+
+    return True
+
+
+def create_client_session(session: Session):
+    """
+    Creates an aiohttp client session sharing the headers and cookies of an authenticated session.
+
+    Args:
+        session (requests.Session): Authenticated session.
+
+    Returns:
+        aiohttp.ClientSession: The client session, to be closed by the caller.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=ASYNC_MAX_REQUESTS,
+        limit_per_host=ASYNC_MAX_REQUESTS_PER_HOST,
+    )
+    # The cookies of IP addresses (a local InVision server) are dropped by default
+    cookie_jar = aiohttp.CookieJar(
+        unsafe=is_ip_address(urlparse(INVISION_API_URL).hostname or "")
+    )
+
+    for cookie in session.cookies:
+        morsel = Morsel()
+        morsel.set(cookie.name, cookie.value, cookie.value)
+        morsel["domain"] = cookie.domain
+        morsel["path"] = cookie.path
+
+        cookie_jar.update_cookies(
+            {cookie.name: morsel},
+            response_url=URL(f"https://{cookie.domain.lstrip('.')}"),
+        )
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        cookie_jar=cookie_jar,
+        headers=dict(session.headers),
+        timeout=aiohttp.ClientTimeout(total=ASYNC_REQUEST_TIMEOUT),
+    )
+
+
+def get_xsrf_headers(client: aiohttp.ClientSession):
+    for cookie in client.cookie_jar:
+        if cookie.key == "XSRF-TOKEN":
+            return {"x-xsrf-token": cookie.value}
+
+    return {}
+
+
+async def request(
+    client: aiohttp.ClientSession, method, url, read_response=None, **kwargs
+):
+    """
+    Sends a request and returns the body of the response.
+
+    Args:
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+        method (str): The HTTP method.
+        url (str): The URL to request.
+        read_response (coroutine function): Consumes the successful response instead of
+            reading its whole body, errors raised while reading it are retried.
+
+    Returns:
+        bytes or None: The body of the response (or the result of read_response) if successful, None otherwise.
+    """
+    host = urlparse(url).netloc
+    endpoint = get_endpoint(url)
+    attempt = 0
+
+    # Revalidate the cached API responses instead of downloading them again
+    cache_key = cache_entry = None
+    if http_cache.enabled and method == "GET" and not read_response:
+        cache_key = http_cache.get_key(url, kwargs.get("params"))
+        cache_entry = http_cache.get(cache_key)
+
+        if cache_entry:
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                **http_cache.get_conditional_headers(cache_entry),
+            }
+
+    while True:
+        retry_after = None
+
+        try:
+            async with concurrency.async_slot() as slot, metrics.time_request(
+                endpoint, host
+            ) as sample:
+                async with client.request(method, url, **kwargs) as response:
+                    slot["status"] = sample["status"] = response.status
+
+                    if response.status == 200:
+                        # The streamed downloads count their bytes while writing them
+                        if read_response:
+                            body = await read_response(response)
+                        else:
+                            body = await response.read()
+                            sample["bytes"] = len(body)
+
+                        retry_policy.record_success(host)
+                    elif response.status == 304 and cache_entry:
+                        http_cache.record_revalidation()
+                        retry_policy.record_success(host)
+
+                        return cache_entry["body"]
+                    elif response.status in RETRY_STATUSES:
+                        retry_after = response.headers.get("Retry-After")
+                        error_message = (
+                            f"Server error {response.status} ({response.url})"
+                        )
+                    else:
+                        color_print(
+                            f"Request failed {response.status} ({response.url}): {await response.text()}",
+                            "red",
+                        )
+                        return None
+
+            if response.status == 200:
+                # Stored once the slot is released, the SQLite writes wait for each other
+                if cache_key:
+                    await asyncio.to_thread(
+                        http_cache.store, cache_key, url, response.headers, body
+                    )
+
+                return body
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error_message = f"HTTP error occurred: {str(e)}"
+
+        delay = retry_policy.get_retry_delay(host, attempt, retry_after)
+
+        if delay is None:
+            color_print(
+                f"{error_message}, maximum number of retries reached. Aborting.", "red"
+            )
+            return None
+
+        attempt += 1
+        metrics.record_retry(endpoint, host, delay)
+        color_print(
+            f"{error_message}, retrying in {delay:.1f}s ({attempt}/{retry_policy.max_retries})...",
+            "yellow",
+        )
+        await asyncio.sleep(delay)  # Wait before restart
+
+
+async def fetch_json(client: aiohttp.ClientSession, url, params=None, label="data"):
+    """
+    Fetches a JSON payload from the InVision API.
+
+    Args:
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+        url (str): The URL of the endpoint.
+        params (dict): Query parameters.
+        label (str): What is being fetched, used in error messages.
+
+    Returns:
+        dict or None: The decoded payload if successful, None otherwise.
+    """
+    body = await request(
+        client, "GET", url, params=params, headers=get_xsrf_headers(client)
+    )
+
+    if body is None:
+        color_print(f"Failed to fetch {label}", "red")
+        return None
+
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as e:
+        color_print(f"Failed to decode {label}: {e}", "red")
+        return None
+
+
+async def fetch_tags(client: aiohttp.ClientSession):
+    tags = await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:unifiedprojects.getTags",
+        label="tags",
+    )
+
+    return tags.get("tags") if tags else None
+
+
+async def fetch_projects(isArchived, isCollaborator, client: aiohttp.ClientSession):
+    projects = await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:unifiedprojects.getProjects",
+        params={
+            "isArchived": str(isArchived),
+            "isCollaborator": str(isCollaborator),
+        },
+        label="projects",
+    )
+
+    return projects.get("results") if projects else None
+
+
+async def fetch_project_shares(project, client: aiohttp.ClientSession):
+    return await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:project_shares_tab_partials.getView",
+        params={"prototypeID": project["id"]},
+        label="projects shares",
+    )
+
+
+async def get_project_archived_screens(project, client: aiohttp.ClientSession):
+    return await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:desktop_partials.projectScreens2Archived",
+        params={"id": project["id"]},
+        label="projects archived screens",
+    )
+
+
+async def get_project_screens(project, client: aiohttp.ClientSession):
+    return await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:desktop_partials.projectScreens2Grouped",
+        params={"id": project["id"]},
+        label="projects screens",
+    )
+
+
+async def get_screen_details(screen, client: aiohttp.ClientSession):
+    return await fetch_json(
+        client,
+        (
+            f"{INVISION_API_URL}/api:desktop_partials/screenQuickView"
+            if screen["isArchived"]
+            else f"{INVISION_API_URL}/api:desktop_partials.consoleScreen"
+        ),
+        params={"screenID": screen["id"], "trigger": "initial-load"},
+        label="screen details",
+    )
+
+
+async def get_screen_inspect_details(screen, client: aiohttp.ClientSession):
+    return await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:inspect.getExtractionJSON",
+        params={"id": screen["id"]},
+        label="screen inspect details",
+    )
+
+
+async def get_screen_history(screen, client: aiohttp.ClientSession):
+    return await fetch_json(
+        client,
+        f"{INVISION_API_URL}/api:desktop_partials/screenHistory",
+        params={"screenID": screen["id"]},
+        label="screen history",
+    )
+
+
+def write_chunks(temp_file, digest, chunks):
+    for chunk in chunks:
+        temp_file.write(chunk)
+        digest.update(chunk)
+
+
+async def download_to_temp_file(url, destination: Path, client: aiohttp.ClientSession):
+    """
+    Streams a file to a temporary file next to its destination.
+
+    Args:
+        url (str): The URL of the file to download.
+        destination (Path): The path where the file will be saved.
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+
+    Returns:
+        tuple or None: The temporary file path and the SHA-256 hex digest of its content, None if the download failed.
+    """
+
+    async def stream_to_temp_file(response):
+        digest = hashlib.sha256()
+        size = 0
+        chunks = []
+        buffered_size = 0
+        temp_file, temp_path = await asyncio.to_thread(create_temp_file, destination)
+
+        try:
+            with temp_file:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    buffered_size += len(chunk)
+
+                    if buffered_size >= WRITE_BUFFER_SIZE:
+                        await asyncio.to_thread(write_chunks, temp_file, digest, chunks)
+                        chunks = []
+                        buffered_size = 0
+
+                await asyncio.to_thread(write_chunks, temp_file, digest, chunks)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            metrics.add_bytes(get_endpoint(url), urlparse(url).netloc, size)
+
+        return temp_path, digest.hexdigest()
+
+    result = await request(
+        client,
+        "GET",
+        url,
+        read_response=stream_to_temp_file,
+        headers=get_xsrf_headers(client),
+    )
+
+    if result is None:
+        color_print(f"   ✘  Failed to download file: {url}", "red")
+
+    return result
+
+
+async def download_file(url, destination: Path, client: aiohttp.ClientSession):
+    """
+    Downloads a file from the given URL to the specified destination, once when several
+    payloads link it at the same time.
+
+    Args:
+        url (str): The URL of the file to download.
+        destination (Path): The path where the file will be saved.
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+
+    Returns:
+        bool: True if the file was downloaded successfully, False otherwise.
+    """
+    download = downloads_in_flight.get(destination)
+
+    if download is None:
+        download = asyncio.ensure_future(fetch_file(url, destination, client))
+        downloads_in_flight[destination] = download
+        download.add_done_callback(lambda _: downloads_in_flight.pop(destination, None))
+
+    # A cancelled payload doesn't cancel the download of the others
+    return await asyncio.shield(download)
+
+
+async def fetch_file(url, destination: Path, client: aiohttp.ClientSession):
+    """
+    Downloads a file, see download_file.
+
+    The file is streamed to a temporary file which is renamed once complete, so the
+    destination never holds a partial file and the memory used doesn't depend on its size.
+    With the blob store enabled, the file is linked from the store instead.
+
+    Args:
+        url (str): The URL of the file to download.
+        destination (Path): The path where the file will be saved.
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+
+    Returns:
+        bool: True if the file was downloaded successfully, False otherwise.
+    """
+    # Completed downloads are known without looking at the file
+    if journal.is_done(destination):
+        return True
+
+    if destination.exists():
+        await asyncio.to_thread(journal.record, destination)
+        return True
+
+    temp_path = None
+
+    try:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        if blob_store.enabled:
+            if not await blob_store.async_fetch(
+                url,
+                destination,
+                lambda: download_to_temp_file(url, destination, client),
+            ):
+                return False
+        else:
+            result = await download_to_temp_file(url, destination, client)
+
+            if result is None:
+                return False
+
+            temp_path, _ = result
+            await asyncio.to_thread(os.replace, temp_path, destination)
+
+        await asyncio.to_thread(journal.record, destination)
+        return True
+
+    except OSError as e:
+        color_print(
+            f"Error creating the file {destination}: {e}",
+            "red",
+        )
+        return False
+    except Exception as e:
+        color_print(f"Unexpected error during download of {url}: {e}", "red")
+        return False
+    finally:
+        if temp_path and temp_path.exists():
+            temp_path.unlink(missing_ok=True)
+
+
+async def json_patch_to_local_assets(
+    json_data, project_id, screen_id, client: aiohttp.ClientSession
+):
+    """
+    Downloads files from URLs in the JSON data concurrently and updates the JSON with local file paths.
+
+    Args:
+        json_data (dict): JSON data containing URLs of files to be downloaded.
+        project_id (str): ID of the project.
+        screen_id (str): ID of the screen, None for project level payloads.
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+
+    Returns:
+        dict: Updated JSON data with local file paths.
+    """
+    prepare_asset_folders(project_id, screen_id)
+
+    updated_json_data = json_data.copy()
+
+    links, downloads = collect_asset_links(updated_json_data, project_id, screen_id)
+
+    progress.add_total("assets", len(downloads))
+
+    async def download(url, file_path):
+        try:
+            with metrics.track_active("assets"):
+                return await download_file(url, file_path, client)
+        finally:
+            progress.add_done("assets")
+
+    results = await asyncio.gather(
+        *(download(url, file_path) for file_path, url in downloads.items())
+    )
+
+    patch_asset_links(
+        links,
+        {
+            file_path
+            for file_path, downloaded in zip(downloads.keys(), results)
+            if downloaded
+        },
+    )
+
+    return updated_json_data
@@ -0,0 +1,406 @@
+import os
+import asyncio
+from pathlib import Path
+from requests import Session
+from .utils import color_print
+from .api_requests import save_json_data, has_asset_links
+from .concurrency import concurrency
+from .journal import journal
+from .generation import bump_generation
+from .catalog_db import catalog_db
+from .progress import progress
+from .metrics import metrics
+from .diff import apply_screen_changes, print_screen_changes, get_screen_file_version
+from .browse import (
+    IGNORE_ARCHIVED_PROJECTS,
+    record_screen,
+    get_project_version,
+    is_screen_journaled,
+    get_screen_file_names,
+    print_summary,
+    select_projects,
+    have_shares_changed,
+    check_project_folder,
+    is_screen_up_to_date,
+)
+from .async_api_requests import (
+    fetch_tags,
+    fetch_projects,
+    fetch_project_shares,
+    get_screen_history,
+    get_screen_details,
+    get_project_screens,
+    get_screen_inspect_details,
+    get_project_archived_screens,
+    json_patch_to_local_assets,
+    create_client_session,
+    ASYNC_MAX_REQUESTS,
+)
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# Number of projects and screens browsed at the same time
+ASYNC_MAX_PROJECTS = int(os.getenv("ASYNC_MAX_PROJECTS", 16))
+ASYNC_MAX_SCREENS = int(os.getenv("ASYNC_MAX_SCREENS", 256))
+
+
+async def browse_screen(screen, project, client, screens_semaphore):
+    """
+    Browse a screen, download its assets, and save JSON data locally.
+
+    Args:
+        screen (dict): Screen data.
+        project (dict): Project data.
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+        screens_semaphore (asyncio.Semaphore): Limits the screens browsed at the same time.
+
+    Returns:
+        bool: True if the screen was successfully browsed or if the data already existed, False otherwise.
+            None if the scraping was cancelled before the screen.
+    """
+    project_folder = Path(DOCS_ROOT) / "projects" / str(project["id"])
+    screen_folder = project_folder / "screens" / str(screen["id"])
+
+    async with screens_semaphore:
+        if progress.is_cancelled():
+            return None
+
+        metrics.inc("scraper_tasks_active", unit="screens")
+
+        try:
+            # The journal answers without touching the files, the files are checked for older trees
+            if is_screen_journaled(screen, screen_folder):
+                color_print(
+                    f"   ⮑  Screen {screen['id']} already completed. Skipping.",
+                    "yellow",
+                )
+
+                return True
+
+            screen_folder.mkdir(parents=True, exist_ok=True)
+
+            if await asyncio.to_thread(is_screen_up_to_date, screen, screen_folder):
+                await asyncio.to_thread(record_screen, screen, screen_folder)
+                color_print(
+                    f"   ⮑  Screen {screen['id']} data already exists locally. Skipping.",
+                    "yellow",
+                )
+
+                return True
+
+            # The file name, how to fetch its data, its label, and if the screen fails without it
+            screen_files = {
+                "screen.json": (get_screen_details, "screen details", True),
+                "inspect.json": (get_screen_inspect_details, "inspect data", False),
+                "history.json": (get_screen_history, "history data", True),
+            }
+
+            # Files completed by an interrupted scraping are skipped
+            file_names = [
+                file_name
+                for file_name in get_screen_file_names(screen)
+                if not journal.is_done(
+                    screen_folder / file_name,
+                    get_screen_file_version(screen, file_name),
+                )
+            ]
+
+            # The details, inspect and history don't depend on each other
+            results = await asyncio.gather(
+                *(
+                    screen_files[file_name][0](screen, client)
+                    for file_name in file_names
+                )
+            )
+
+            payloads = []
+
+            for file_name, data in zip(file_names, results):
+                if data:
+                    payloads.append((file_name, data))
+                elif screen_files[file_name][2]:
+                    color_print(
+                        f"   ✘  Failed to browse the screen {screen['id']}", "red"
+                    )
+                    return False
+
+            patched_payloads = await asyncio.gather(
+                *(
+                    json_patch_to_local_assets(
+                        payload, project["id"], screen["id"], client
+                    )
+                    for _, payload in payloads
+                )
+            )
+
+            for (file_name, _), patched_payload in zip(payloads, patched_payloads):
+                if not await asyncio.to_thread(
+                    save_json_data, patched_payload, screen_folder, file_name
+                ):
+                    color_print(
+                        f"   ✘  Failed to save {screen_files[file_name][1]} for {screen['id']}",
+                        "red",
+                    )
+
+                    return False
+
+                # Files with missing assets are downloaded again by the next scraping
+                if not await asyncio.to_thread(has_asset_links, patched_payload):
+                    await asyncio.to_thread(
+                        journal.record,
+                        screen_folder / file_name,
+                        get_screen_file_version(screen, file_name),
+                    )
+
+            if screen["isArchived"]:
+                color_print(
+                    f"   ⮑  Archived screen {screen['id']} (details) gathered", "green"
+                )
+            else:
+                color_print(
+                    f"   ⮑  Screen {screen['id']} (details, inspect, history) gathered",
+                    "green",
+                )
+
+            return True
+
+        except Exception as e:
+            color_print(f"   ✘  Failed to browse the screen {screen['id']}: {e}", "red")
+
+            return False
+
+        finally:
+            metrics.inc("scraper_tasks_active", -1, unit="screens")
+            progress.add_done("screens")
+
+
+async def browse_project(project, option, client, screens_semaphore):
+    """
+    Browse a project, download its assets, and save JSON data locally.
+
+    Args:
+        project (dict): Project data.
+        option (str): The scraping option ('update', 'overwrite' or None).
+        client (aiohttp.ClientSession): Client session for making HTTP requests.
+        screens_semaphore (asyncio.Semaphore): Limits the screens browsed at the same time.
+
+    Returns:
+        bool: True if the project was successfully browsed, False otherwise.
+    """
+    project_folder = Path(DOCS_ROOT) / "projects" / str(project["id"])
+
+    project_folder.mkdir(parents=True, exist_ok=True)
+
+    project_json_path = project_folder / "project.json"
+    project_version = get_project_version(project)
+    is_project_done = journal.is_done(project_json_path, project_version)
+
+    patched_project, shares, screens = await asyncio.gather(
+        (
+            asyncio.sleep(0, result=None)
+            if is_project_done
+            else json_patch_to_local_assets(project, project["id"], None, client)
+        ),
+        fetch_project_shares(project, client),
+        get_project_screens(project, client),
+    )
+
+    if not is_project_done:
+        if not await asyncio.to_thread(
+            save_json_data, patched_project, project_folder, "project.json"
+        ):
+            color_print(f"   ✘  Failed to save project data", "red")
+
+            return False
+
+        if not await asyncio.to_thread(has_asset_links, patched_project):
+            await asyncio.to_thread(journal.record, project_json_path, project_version)
+
+    if shares:
+        if await asyncio.to_thread(have_shares_changed, shares, project_folder):
+            # Save the new shares to shares.json
+            if not await asyncio.to_thread(
+                save_json_data, shares, project_folder, "shares.json"
+            ):
+                color_print(f"   ✘  Failed to save shares data", "red")
+            else:
+                color_print(f"   ⮑  Shares data updated", "green")
+    else:
+        color_print(
+            f"   ✘  Failed to fetch shares for {project['data']['name']}", "red"
+        )
+
+    if not screens:
+        color_print(f"   ✘  Failed to browse the project", "red")
+
+        return False
+
+    archived_screens_count = screens.get("archivedScreensCount")
+
+    if archived_screens_count != 0:
+        screens["archivedscreens"] = (
+            await get_project_archived_screens(project, client) or {}
+        ).get("archivedscreens", [])
+
+    screens_count = len(screens["screens"])
+    color_print(
+        f"   ⮑  Project {project['id']} browsed ({screens_count} screens, {archived_screens_count} archived)",
+        "green",
+    )
+
+    # Only the screens which changed are scraped again
+    if option == "update":
+        changes = await asyncio.to_thread(apply_screen_changes, screens, project_folder)
+
+        if changes is not None:
+            print_screen_changes(changes)
+
+    screens_patched = await json_patch_to_local_assets(
+        screens, project["id"], None, client
+    )
+    if not await asyncio.to_thread(
+        save_json_data, screens_patched, project_folder, "screens.json"
+    ):
+        color_print(f"   ✘  Failed to save screens data", "red")
+
+        return False
+
+    if project["data"].get("isArchived", False):
+        color_print(
+            f"   ⮑  ⚠️ Screens details can't be gathered on archived projects",
+            "red",
+        )
+        return True
+
+    all_screens = screens.get("screens", []) + screens.get("archivedscreens", [])
+    progress.add_total("screens", len(all_screens))
+
+    results = await asyncio.gather(
+        *(
+            browse_screen(screen, project, client, screens_semaphore)
+            for screen in all_screens
+        ),
+        return_exceptions=True,
+    )
+
+    browsed_screen_ids = set()
+
+    for screen, result in zip(all_screens, results):
+        if isinstance(result, Exception):
+            color_print(
+                f"   ✘  Screen {screen['id']} generated an exception: {result}", "red"
+            )
+        elif result:
+            browsed_screen_ids.add(screen["id"])
+
+    if len(browsed_screen_ids) == screens_count + archived_screens_count:
+        color_print(f"   ⮑  All screens of {project['id']} browsed properly", "green")
+
+        return True
+    else:
+        color_print(f"   ✘  Failed to browse some screens of {project['id']}", "red")
+
+        return False
+
+
+async def browse_projects(session: Session, option=None):
+    """
+    Browse all the projects with the asyncio engine, producing the same files as the threaded one.
+
+    Args:
+        session (requests.Session): Authenticated session, its headers and cookies are reused.
+        option (str): The scraping option ('update', 'overwrite' or None).
+
+    Returns:
+        bool: False if the scraping failed, None otherwise.
+    """
+    # The adaptive window may grow up to the connections of the client
+    # Restored once done, a threaded scraping of the process sizes its pools from it
+    with concurrency.configured(maximum=ASYNC_MAX_REQUESTS):
+        async with create_client_session(session) as client:
+            projects, archivedProjects = await asyncio.gather(
+                fetch_projects(isArchived=False, isCollaborator=True, client=client),
+                (
+                    fetch_projects(isArchived=True, isCollaborator=True, client=client)
+                    if not IGNORE_ARCHIVED_PROJECTS
+                    else asyncio.sleep(0, result=[])
+                ),
+            )
+
+            allProjects = (projects or []) + (archivedProjects or [])
+
+            if not allProjects:
+                color_print("\nNo projects were found.", "red")
+
+                return False
+
+            allProjects = select_projects(allProjects)
+
+            color_print(f"\nRetrieving {len(allProjects)} projects:", "green")
+            progress.add_total("projects", len(allProjects))
+
+            tags = await fetch_tags(client)
+            common_folder = Path(DOCS_ROOT) / "common"
+            if not await asyncio.to_thread(
+                save_json_data, tags, common_folder, "tags.json"
+            ):
+                color_print(f" ✘  Failed to save tags data", "red")
+
+                return False
+
+            await asyncio.to_thread(catalog_db.index_tags, tags)
+
+            successfully_exported_project_ids = set()
+            ignored_project_ids = set()
+
+            projects_semaphore = asyncio.Semaphore(ASYNC_MAX_PROJECTS)
+            screens_semaphore = asyncio.Semaphore(ASYNC_MAX_SCREENS)
+
+            async def process_project(project):
+                async with projects_semaphore:
+                    if progress.is_cancelled():
+                        return
+
+                    color_print(
+                        f" • {project['data']['name']} ({project['id']}):", "white"
+                    )
+
+                    # Ignore existing valid project folders
+                    if option == "update" and not await asyncio.to_thread(
+                        check_project_folder, project
+                    ):
+                        ignored_project_ids.add(project["id"])
+                        progress.add_done("projects")
+                        return
+
+                    if tags:
+                        project["data"]["tags"] = [
+                            tag for tag in tags if project["id"] in tag["prototypeIDs"]
+                        ]
+
+                    try:
+                        if await browse_project(
+                            project, option, client, screens_semaphore
+                        ):
+                            successfully_exported_project_ids.add(project["id"])
+                    except Exception as e:
+                        color_print(
+                            f"   ✘  Failed to browse the project {project['id']}: {e}",
+                            "red",
+                        )
+
+                    # Let the API pick up the project while the others are scraped
+                    await asyncio.to_thread(
+                        catalog_db.index_project,
+                        Path(DOCS_ROOT) / "projects" / str(project["id"]),
+                    )
+                    await asyncio.to_thread(bump_generation)
+                    progress.add_done("projects")
+
+            await asyncio.gather(*(process_project(project) for project in allProjects))
+
+            if not print_summary(
+                allProjects, successfully_exported_project_ids, ignored_project_ids
+            ):
+                return False
@@ -0,0 +1,350 @@
+import os
+import json
+import uuid
+import shutil
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from .utils import color_print
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+BLOB_STORE_FOLDER = "common/blobs"
+
+
+def is_blob_store_enabled():
+    return os.getenv("SCRAPER_BLOB_STORE", "").lower() in ["true", "1"]
+
+
+class BlobStore:
+    """
+    Content-addressed store of the downloaded assets.
+
+    Files are stored once under `common/blobs/<2 first hex>/<sha256>` and the per-project
+    paths are hard links to them (copies when the filesystem doesn't support links). The
+    digest of each downloaded URL is remembered in `common/blobs/index.json`, so an asset
+    shared between projects is downloaded once, and concurrent downloads of the same URL
+    are merged.
+
+    The store is inside the docs folder for the hard links, the API doesn't serve it.
+    """
+
+    def __init__(self, root: Path, enabled=False):
+        self.root = root
+        self.enabled = enabled
+
+        self.lock = threading.Lock()
+        self.index = None
+        self.inflight = {}
+        self.async_inflight = {}
+        self.has_copies = False
+        self.stats = {"downloaded": 0, "deduplicated": 0, "bytes_saved": 0}
+
+    @staticmethod
+    def get_url_key(url):
+        # Signed query parameters change between requests for the same file
+        return urlparse(url)._replace(query="").geturl()
+
+    def get_blob_path(self, digest):
+        return self.root / digest[:2] / digest
+
+    def load_index(self):
+        """
+        Loads the URL to digest index. Must be called with the lock held.
+        """
+        if self.index is not None:
+            return
+
+        index_path = self.root / "index.json"
+
+        try:
+            with index_path.open("r") as f:
+                self.index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.index = {}
+
+    def lookup(self, url):
+        with self.lock:
+            self.load_index()
+            return self.index.get(self.get_url_key(url))
+
+    def link(self, digest, destination: Path):
+        """
+        Places the blob at the destination.
+
+        Args:
+            digest (str): Digest of the blob.
+            destination (Path): Path of the file in the project.
+
+        Returns:
+            bool: True if the blob exists and was placed, False otherwise.
+        """
+        blob_path = self.get_blob_path(digest)
+
+        if not blob_path.exists():
+            return False
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = destination.with_name(
+            f".{destination.name}.{uuid.uuid4().hex}.part"
+        )
+
+        try:
+            try:
+                os.link(blob_path, temp_path)
+            except OSError:
+                shutil.copyfile(blob_path, temp_path)
+                self.has_copies = True
+
+            os.replace(temp_path, destination)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        return True
+
+    def add(self, url, temp_path: Path, digest):
+        """
+        Moves a downloaded file into the store.
+
+        Args:
+            url (str): The URL the file was downloaded from.
+            temp_path (Path): The downloaded file, consumed.
+            digest (str): Its SHA-256 hex digest.
+        """
+        blob_path = self.get_blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if blob_path.exists():
+            # Same content already downloaded from another URL
+            with self.lock:
+                self.stats["deduplicated"] += 1
+                self.stats["bytes_saved"] += blob_path.stat().st_size
+
+            temp_path.unlink(missing_ok=True)
+        else:
+            os.replace(temp_path, blob_path)
+
+        with self.lock:
+            self.load_index()
+            self.index[self.get_url_key(url)] = digest
+            self.stats["downloaded"] += 1
+
+    def forget(self, *file_paths: Path):
+        """
+        Drops the URLs of the content of files from the index, before the files are removed
+        because their URL serves a new version (the URLs are indexed without their query).
+
+        Args:
+            *file_paths (Path): The files of a project.
+        """
+        if not self.enabled:
+            return
+
+        digests = set()
+
+        for file_path in file_paths:
+            digest = hashlib.sha256()
+
+            try:
+                with file_path.open("rb") as f:
+                    while chunk := f.read(1024 * 1024):
+                        digest.update(chunk)
+            except OSError:
+                continue
+
+            digests.add(digest.hexdigest())
+
+        if not digests:
+            return
+
+        with self.lock:
+            self.load_index()
+            self.index = {
+                key: digest
+                for key, digest in self.index.items()
+                if digest not in digests
+            }
+
+    def forget_folder(self, folder: Path):
+        """
+        Same as forget, for all the files of a folder about to be removed.
+
+        Args:
+            folder (Path): The folder of a screen.
+        """
+        if not self.enabled:
+            return
+
+        self.forget(*(path for path in folder.rglob("*") if path.is_file()))
+
+    def link_known(self, url, destination: Path):
+        digest = self.lookup(url)
+
+        if digest and self.link(digest, destination):
+            with self.lock:
+                self.stats["deduplicated"] += 1
+                self.stats["bytes_saved"] += destination.stat().st_size
+
+            return True
+
+        return False
+
+    def fetch(self, url, destination: Path, download):
+        """
+        Places the file of a URL at the destination, downloading it only if the store doesn't have it.
+
+        Args:
+            url (str): The URL of the file.
+            destination (Path): The path where the file will be saved.
+            download (callable): Downloads the URL, returns a (temp_path, digest) tuple or None.
+
+        Returns:
+            bool: True if the file was placed successfully, False otherwise.
+        """
+        if self.link_known(url, destination):
+            return True
+
+        key = self.get_url_key(url)
+
+        with self.lock:
+            event = self.inflight.get(key)
+            is_leader = event is None
+
+            if is_leader:
+                event = self.inflight[key] = threading.Event()
+
+        if not is_leader:
+            # Another thread is downloading the same URL
+            event.wait()
+            return self.link_known(url, destination)
+
+        try:
+            result = download()
+
+            if result is None:
+                return False
+
+            temp_path, digest = result
+            self.add(url, temp_path, digest)
+
+            return self.link(digest, destination)
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+            event.set()
+
+    async def async_fetch(self, url, destination: Path, download):
+        """
+        Same as fetch, for the asyncio engine.
+
+        Args:
+            url (str): The URL of the file.
+            destination (Path): The path where the file will be saved.
+            download (coroutine function): Downloads the URL, returns a (temp_path, digest) tuple or None.
+
+        Returns:
+            bool: True if the file was placed successfully, False otherwise.
+        """
+        # The files are linked by threads, the loop doesn't wait for the disk
+        if await asyncio.to_thread(self.link_known, url, destination):
+            return True
+
+        key = self.get_url_key(url)
+        waiter = self.async_inflight.get(key)
+
+        if waiter is not None:
+            # Another task is downloading the same URL
+            await asyncio.shield(waiter)
+            return await asyncio.to_thread(self.link_known, url, destination)
+
+        waiter = self.async_inflight[key] = asyncio.get_running_loop().create_future()
+
+        try:
+            result = await download()
+
+            if result is None:
+                return False
+
+            temp_path, digest = result
+            await asyncio.to_thread(self.add, url, temp_path, digest)
+
+            return await asyncio.to_thread(self.link, digest, destination)
+        finally:
+            self.async_inflight.pop(key, None)
+            waiter.set_result(None)
+
+    def save(self):
+        """
+        Saves the URL to digest index.
+        """
+        with self.lock:
+            if self.index is None:
+                return
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            index_path = self.root / "index.json"
+            temp_path = index_path.with_name(f".index.json.{uuid.uuid4().hex}.part")
+
+            with temp_path.open("w") as f:
+                json.dump(self.index, f)
+
+            os.replace(temp_path, index_path)
+
+    def prune(self):
+        """
+        Removes the blobs no project file links to anymore.
+
+        Returns:
+            int: The number of removed blobs.
+        """
+        # Without hard links, the references to the blobs can't be counted
+        if self.has_copies or not self.root.exists():
+            return 0
+
+        removed_digests = set()
+
+        for blob_path in self.root.glob("??/*"):
+            if blob_path.name.startswith("."):
+                continue
+
+            # Only the store references the blob
+            if blob_path.stat().st_nlink == 1:
+                blob_path.unlink(missing_ok=True)
+                removed_digests.add(blob_path.name)
+
+        with self.lock:
+            self.load_index()
+            self.index = {
+                key: digest
+                for key, digest in self.index.items()
+                if digest not in removed_digests
+            }
+
+        return len(removed_digests)
+
+    def finalize(self):
+        """
+        Saves the index and prints what the store saved, at the end of a scraping.
+        """
+        if not self.enabled:
+            return
+
+        removed = self.prune()
+        self.save()
+
+        color_print(
+            f"\nBlob store: {self.stats['downloaded']} files downloaded, "
+            f"{self.stats['deduplicated']} deduplicated "
+            f"({self.stats['bytes_saved'] / (1024 * 1024):.1f} MB saved), "
+            f"{removed} unused blobs removed",
+            "yellow",
+        )
+
+
+blob_store = BlobStore(
+    Path(DOCS_ROOT) / BLOB_STORE_FOLDER, enabled=is_blob_store_enabled()
+)
@@ -1,11 +1,19 @@
 import json
 import os
-import shutil
 from pathlib import Path
+from contextlib import nullcontext
 from requests import Session
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils import color_print, is_test_mode
+from .concurrency import concurrency
+from .journal import journal
+from .generation import bump_generation
+from .catalog_db import catalog_db
+from .progress import progress
+from .metrics import metrics
+from .diff import apply_screen_changes, print_screen_changes, get_screen_file_version
 from .api_requests import (
+    has_asset_links,
     fetch_tags,
     fetch_projects,
     fetch_project_shares,
@@ -24,6 +32,9 @@ DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
 # Ignore Archived project
 IGNORE_ARCHIVED_PROJECTS = False
 
+# Number of projects browsed at the same time
+SCRAPER_MAX_PROJECTS = int(os.getenv("SCRAPER_MAX_PROJECTS", 4))
+
 
 def is_valid_response(response, expected_keys):
     if not response or not isinstance(response, dict):
@@ -31,21 +42,85 @@ def is_valid_response(response, expected_keys):
     return all(key in response for key in expected_keys)
 
 
-def browse_screen(screen, project, session: Session):
+def get_project_version(project):
     """
-    Browse a screen, download its assets, and save JSON data locally.
+    Builds the version stamp of the metadata of a project.
+
+    Args:
+        project (dict): Project data, with its tags.
+
+    Returns:
+        str: The version stamp.
+    """
+    tag_ids = sorted(str(tag.get("id")) for tag in project["data"].get("tags", []))
+
+    return (
+        f"{project['data'].get('updatedAt')}:{project['data'].get('itemCount')}:"
+        f"{','.join(tag_ids)}"
+    )
+
+
+def get_screen_file_names(screen):
+    """
+    Lists the JSON files saved for a screen.
 
     Args:
         screen (dict): Screen data.
-        project (dict): Project data.
-        session (requests.Session): Session object for making HTTP requests.
 
     Returns:
-        bool: True if the screen was successfully browsed or if the data already existed, False otherwise.
+        list: The file names, the details first.
     """
-    project_folder = Path(DOCS_ROOT) / "projects" / str(project["id"])
-    screen_folder = project_folder / "screens" / str(screen["id"])
+    # Inspect and history don't exist for archived screens
+    if screen.get("isArchived", False):
+        return ["screen.json"]
+
+    return ["screen.json", "inspect.json", "history.json"]
+
+
+def is_screen_journaled(screen, screen_folder: Path):
+    """
+    Check in the journal if all the files of a screen were completed with their current version.
+
+    Args:
+        screen (dict): Screen data.
+        screen_folder (Path): Local folder of the screen.
+
+    Returns:
+        bool: True if the screen can be skipped, False otherwise.
+    """
+    return all(
+        journal.is_done(
+            screen_folder / file_name, get_screen_file_version(screen, file_name)
+        )
+        for file_name in get_screen_file_names(screen)
+    )
+
+
+def record_screen(screen, screen_folder: Path):
+    """
+    Record in the journal the files of a screen found complete on disk (trees scraped without journal).
+
+    Args:
+        screen (dict): Screen data.
+        screen_folder (Path): Local folder of the screen.
+    """
+    for file_name in get_screen_file_names(screen):
+        journal.record(
+            screen_folder / file_name, get_screen_file_version(screen, file_name)
+        )
+
+
+def is_screen_up_to_date(screen, screen_folder: Path):
+    """
+    Check if the data of a screen already exists locally and is complete.
+
+    Args:
+        screen (dict): Screen data.
+        screen_folder (Path): Local folder of the screen.
 
+    Returns:
+        bool: True if the screen can be skipped, False otherwise.
+    """
     # Files we expect to see when the screen already exists
     file_names = [
         "inspect.json",  # Not existing for archived screen
@@ -53,121 +128,285 @@ def browse_screen(screen, project, session: Session):
         "screen.json",
     ]
 
-    try:
-        screen_folder.mkdir(parents=True, exist_ok=True)
+    # Remove inspect.json to expected files if the screen is archived
+    if screen.get("isArchived", False):
+        file_names.remove("history.json")
+        file_names.remove("inspect.json")
+
+    # Check if any image file exists (versions images doesn't exists everytime so we don't check here)
+    image_files = list(screen_folder.glob("image.*"))
+    thumbnail_files = list(screen_folder.glob("thumbnail.*"))
+
+    versions_folder = screen_folder / "versions"
+    history_json_path = screen_folder / "history.json"
+
+    version_count = 0
+    excepted_version_count = 0
+
+    if not screen.get("isArchived", False):
+        if versions_folder.exists():
+            # Hidden files are downloads interrupted before completion
+            version_count = (
+                len(
+                    [
+                        version_file
+                        for version_file in versions_folder.iterdir()
+                        if not version_file.name.startswith(".")
+                    ]
+                )
+                + 1
+            )
 
-        # Remove inspect.json to expected files if the screen is archived
-        if screen.get("isArchived", False):
-            file_names.remove("history.json")
-            file_names.remove("inspect.json")
+        if history_json_path.exists() and history_json_path.stat().st_size > 0:
+            with history_json_path.open("r") as f:
+                excepted_version_count = len(json.load(f).get("versions", []))
 
-        # Check if any image file exists (versions images doesn't exists everytime so we don't check here)
-        image_files = list(screen_folder.glob("image.*"))
-        thumbnail_files = list(screen_folder.glob("thumbnail.*"))
+    return (
+        len(image_files) >= 1
+        and len(thumbnail_files) >= 1
+        and (screen.get("isArchived") or version_count == excepted_version_count)
+        and all((Path(screen_folder / file_name).exists() for file_name in file_names))
+    )
 
-        versions_folder = screen_folder / "versions"
-        history_json_path = screen_folder / "history.json"
 
-        version_count = 0
-        excepted_version_count = 0
+def have_shares_changed(shares, project_folder: Path):
+    """
+    Compare freshly fetched shares with the local shares.json of a project.
 
-        if not screen.get("isArchived", False):
-            if versions_folder.exists():
-                version_count = len(list(versions_folder.iterdir())) + 1
+    Args:
+        shares (dict): Shares data.
+        project_folder (Path): Local folder of the project.
 
-            if history_json_path.exists() and history_json_path.stat().st_size > 0:
-                with history_json_path.open("r") as f:
-                    excepted_version_count = len(json.load(f).get("versions", []))
+    Returns:
+        bool: True if the shares must be saved again, False otherwise.
+    """
+    shares_json_path = project_folder / "shares.json"
 
-        if (
-            len(image_files) >= 1
-            and len(thumbnail_files) >= 1
-            and (screen.get("isArchived") or version_count == excepted_version_count)
-            and all(
-                (Path(screen_folder / file_name).exists() for file_name in file_names)
-            )
-        ):
+    # Load local shares.json if it exists
+    if shares_json_path.exists():
+        if shares_json_path.stat().st_size > 0:
+            try:
+                with shares_json_path.open("r") as f:
+                    local_shares_data = json.load(f)
+
+            except json.JSONDecodeError:
+                local_shares_data = {}
+        else:
+            local_shares_data = {}
+    else:
+        local_shares_data = {}
+
+    # Check if shares have changed
+    return len(shares.get("shares", [])) != len(
+        local_shares_data.get("shares", [])
+    ) or any(
+        share["id"] != local_share.get("id")
+        for share, local_share in zip(
+            shares.get("shares", []), local_shares_data.get("shares", [])
+        )
+    )
+
+
+def check_project_folder(project):
+    """
+    Check the local folder of a project before an update, removing it when outdated.
+
+    Args:
+        project (dict): Project data.
+
+    Returns:
+        bool: False if the project must be ignored, True otherwise.
+    """
+    project_folder = Path(DOCS_ROOT) / "projects" / str(project["id"])
+
+    if not project_folder.exists():
+        return True
+
+    required_files = ["project.json", "screens.json"]
+    if not all((project_folder / f).exists() for f in required_files):
+        return True
+
+    # Grab the project updated date from the project and project.json
+    # Grab the projet item count from the project and project.json
+    # If they don't match only the changed screens are scraped again, see apply_screen_changes
+    project_update_date = project["data"].get("updatedAt")
+    project_item_count = project["data"].get("itemCount")
+
+    project_json_path = project_folder / "project.json"
+
+    with project_json_path.open("r") as f:
+        local_project_data = json.load(f)
+
+    # Protect the local data if the response is invalid
+    if not is_valid_response(
+        local_project_data,
+        [
+            "id",
+            "data",
+            "type",
+        ],
+    ):
+        color_print(
+            f"   ⮑  Project skipped due to invalid response",
+            "yellow",
+        )
+
+        return False
+
+    local_project_update_date = local_project_data["data"].get("updatedAt")
+    local_project_item_count = local_project_data["data"].get("itemCount")
+
+    # Project outdated
+    if (
+        project_update_date != local_project_update_date
+        or project_item_count != local_project_item_count
+    ):
+        color_print(
+            f"   ⮑  Project outdated, updating the changed screens...",
+            "yellow",
+        )
+
+    return True
+
+
+def select_projects(all_projects):
+    """
+    Select the projects to be scraped.
+
+    Args:
+        all_projects (list): Projects data.
+
+    Returns:
+        list: The projects to be scraped.
+    """
+    # In test mode we process one project of each type
+    if is_test_mode():
+        color_print("╭───────────────────────────────────────────────╮", "yellow")
+        color_print("│ Test mode enabled: Fetching only one project! │", "yellow")
+        color_print("╰───────────────────────────────────────────────╯", "yellow")
+
+        all_projects = {project["type"]: project for project in all_projects}.values()
+
+    # WIP : Only manage prototypes
+    return [project for project in all_projects if project["type"] == "prototype"]
+
+
+def browse_screen(screen, project, session: Session):
+    """
+    Browse a screen, download its assets, and save JSON data locally.
+
+    Args:
+        screen (dict): Screen data.
+        project (dict): Project data.
+        session (requests.Session): Session object for making HTTP requests.
+
+    Returns:
+        bool: True if the screen was successfully browsed or if the data already existed, False otherwise.
+            None if the scraping was cancelled before the screen.
+    """
+    project_folder = Path(DOCS_ROOT) / "projects" / str(project["id"])
+    screen_folder = project_folder / "screens" / str(screen["id"])
+
+    if progress.is_cancelled():
+        return None
+
+    metrics.inc("scraper_tasks_active", unit="screens")
+
+    try:
+        # The journal answers without touching the files, the files are checked for older trees
+        if is_screen_journaled(screen, screen_folder):
             color_print(
-                f"   ⮑  Screen {screen['id']} data already exists locally. Skipping.",
+                f"   ⮑  Screen {screen['id']} already completed. Skipping.",
                 "yellow",
             )
 
             return True
 
-        screen_details = get_screen_details(screen, session)
+        screen_folder.mkdir(parents=True, exist_ok=True)
 
-        if screen_details:
-            screen_details_patched = json_patch_to_local_assets(
-                screen_details, project["id"], screen["id"], session
+        if is_screen_up_to_date(screen, screen_folder):
+            record_screen(screen, screen_folder)
+            color_print(
+                f"   ⮑  Screen {screen['id']} data already exists locally. Skipping.",
+                "yellow",
             )
 
-            if not save_json_data(screen_details_patched, screen_folder, "screen.json"):
-                color_print(
-                    f"   ✘  Failed to save screen details for {screen['id']}", "red"
-                )
+            return True
 
-                return False
+        # The file name, how to fetch its data, its label, and if the screen fails without it
+        screen_files = {
+            "screen.json": (get_screen_details, "screen details", True),
+            "inspect.json": (get_screen_inspect_details, "inspect data", False),
+            "history.json": (get_screen_history, "history data", True),
+        }
 
-            if screen["isArchived"]:
-                color_print(
-                    f"   ⮑  Archived screen {screen['id']} (details) gathered", "green"
-                )
-                return True
+        for file_name in get_screen_file_names(screen):
+            fetch, label, is_required = screen_files[file_name]
+            file_path = screen_folder / file_name
+            version = get_screen_file_version(screen, file_name)
 
-            screen_inspect_details = get_screen_inspect_details(screen, session)
+            # Completed by an interrupted scraping
+            if journal.is_done(file_path, version):
+                continue
 
-            if screen_inspect_details:
-                screen_inspect_details_patched = json_patch_to_local_assets(
-                    screen_inspect_details, project["id"], screen["id"], session
-                )
+            data = fetch(screen, session)
 
-                if not save_json_data(
-                    screen_inspect_details_patched, screen_folder, "inspect.json"
-                ):
+            if not data:
+                if is_required:
                     color_print(
-                        f"   ✘  Failed to save inspect data for {screen['id']}", "red"
+                        f"   ✘  Failed to browse the screen {screen['id']}", "red"
                     )
 
                     return False
 
-            screen_history = get_screen_history(screen, session)
+                continue
 
-            if screen_history:
-                screen_history_patched = json_patch_to_local_assets(
-                    screen_history, project["id"], screen["id"], session
-                )
+            data_patched = json_patch_to_local_assets(
+                data, project["id"], screen["id"], session
+            )
 
-                if not save_json_data(
-                    screen_history_patched, screen_folder, "history.json"
-                ):
-                    color_print(
-                        f"   ✘  Failed to save history data for {screen['id']}", "red"
-                    )
+            if not save_json_data(data_patched, screen_folder, file_name):
+                color_print(f"   ✘  Failed to save {label} for {screen['id']}", "red")
 
-                    return False
+                return False
 
-                color_print(
-                    f"   ⮑  Screen {screen['id']} (details, inspect, history) gathered",
-                    "green",
-                )
-                return True
+            # Files with missing assets are downloaded again by the next scraping
+            if not has_asset_links(data_patched):
+                journal.record(file_path, version)
+
+        if screen["isArchived"]:
+            color_print(
+                f"   ⮑  Archived screen {screen['id']} (details) gathered", "green"
+            )
+        else:
+            color_print(
+                f"   ⮑  Screen {screen['id']} (details, inspect, history) gathered",
+                "green",
+            )
+
+        return True
 
     except Exception as e:
         color_print(f"   ✘  Failed to browse the screen {screen['id']}: {e}", "red")
 
         return False
 
-    color_print(f"   ✘  Failed to browse the screen {screen['id']}", "red")
-    return False
+    finally:
+        metrics.inc("scraper_tasks_active", -1, unit="screens")
+        progress.add_done("screens")
 
 
-def browse_project(project, ignored_project_ids, option, session: Session):
+def browse_project(
+    project, ignored_project_ids, option, session: Session, screen_executor=None
+):
     """
     Browse a project, download its assets, and save JSON data locally.
 
     Args:
         project (dict): Project data.
         session (requests.Session: Session): Session object for making HTTP requests.
+        screen_executor (ThreadPoolExecutor): Pool shared by the screens of all the projects,
+            a pool dedicated to the project is used if not provided.
 
     Returns:
         dict or None: Updated project data if successful, None otherwise.
@@ -176,41 +415,24 @@ def browse_project(project, ignored_project_ids, option, session: Session):
 
     project_folder.mkdir(parents=True, exist_ok=True)
 
-    patched_project = json_patch_to_local_assets(project, project["id"], None, session)
-    if not save_json_data(patched_project, project_folder, "project.json"):
-        color_print(f"   ✘  Failed to save project data", "red")
-
-        return False
-
-    shares = fetch_project_shares(project, session)
-    if shares:
-        shares_json_path = project_folder / "shares.json"
+    project_json_path = project_folder / "project.json"
+    project_version = get_project_version(project)
 
-        # Load local shares.json if it exists
-        if shares_json_path.exists():
-            if shares_json_path.stat().st_size > 0:
-                try:
-                    with shares_json_path.open("r") as f:
-                        local_shares_data = json.load(f)
+    if not journal.is_done(project_json_path, project_version):
+        patched_project = json_patch_to_local_assets(
+            project, project["id"], None, session
+        )
+        if not save_json_data(patched_project, project_folder, "project.json"):
+            color_print(f"   ✘  Failed to save project data", "red")
 
-                except json.JSONDecodeError:
-                    local_shares_data = {}
-            else:
-                local_shares_data = {}
-        else:
-            local_shares_data = {}
+            return False
 
-        # Check if shares have changed
-        shares_changed = len(shares.get("shares", [])) != len(
-            local_shares_data.get("shares", [])
-        ) or any(
-            share["id"] != local_share.get("id")
-            for share, local_share in zip(
-                shares.get("shares", []), local_shares_data.get("shares", [])
-            )
-        )
+        if not has_asset_links(patched_project):
+            journal.record(project_json_path, project_version)
 
-        if shares_changed:
+    shares = fetch_project_shares(project, session)
+    if shares:
+        if have_shares_changed(shares, project_folder):
             # Save the new shares to shares.json
             if not save_json_data(shares, project_folder, "shares.json"):
                 color_print(f"   ✘  Failed to save shares data", "red")
@@ -236,49 +458,12 @@ def browse_project(project, ignored_project_ids, option, session: Session):
             "green",
         )
 
-        screens_json_path = project_folder / "screens.json"
+        # Only the screens which changed are scraped again
+        if option == "update":
+            changes = apply_screen_changes(screens, project_folder)
 
-        # Check if the screens are up to date
-        if option == "update" and screens_json_path.exists():
-            with screens_json_path.open("r") as f:
-                local_screens_data = json.load(f)
-
-            screens_to_delete = []
-
-            # Check each "updatedAt", "conversationCount", "imageVersion" and "unreadConversationCount" from screens.json
-            for screen, local_screen in zip(
-                screens.get("screens", []), local_screens_data.get("screens", [])
-            ):
-                if (
-                    screen["updatedAt"] != local_screen.get("updatedAt")
-                    or screen["imageVersion"] != local_screen.get("imageVersion")
-                    or screen.get("conversationCount", 0)
-                    != local_screen.get("conversationCount", 0)
-                    or screen.get("unreadConversationCount", 0)
-                    != local_screen.get("unreadConversationCount", 0)
-                ):
-                    # Add to list of screens to delete if data is not up to date
-                    screens_to_delete.append(screen)
-
-            for archived_screen, local_archived_screen in zip(
-                screens.get("archivedscreens", []),
-                local_screens_data.get("archivedscreens", []),
-            ):
-                if archived_screen.get("updatedAt") != local_archived_screen.get(
-                    "updatedAt"
-                ):
-                    screens_to_delete.append(archived_screen)
-
-            # Remove outdated screens folders
-            for screen in screens_to_delete:
-                screen_folder = project_folder / "screens" / str(screen["id"])
-
-                if screen_folder.exists():
-                    shutil.rmtree(screen_folder, ignore_errors=True)
-                    color_print(
-                        f"   ⮑  Screen {screen['id']} folder deleted for update",
-                        "yellow",
-                    )
+            if changes is not None:
+                print_screen_changes(changes)
 
         screens_patched = json_patch_to_local_assets(
             screens, project["id"], None, session
@@ -296,13 +481,18 @@ def browse_project(project, ignored_project_ids, option, session: Session):
             return True
 
         browsed_screen_ids = set()
-
-        with ThreadPoolExecutor() as executor:
+        all_screens = screens.get("screens", []) + screens.get("archivedscreens", [])
+        progress.add_total("screens", len(all_screens))
+
+        # Requests are throttled by the adaptive window, so there are enough threads to fill it
+        with (
+            nullcontext(screen_executor)
+            if screen_executor
+            else ThreadPoolExecutor(max_workers=concurrency.maximum)
+        ) as executor:
             future_to_screen_id = {
                 executor.submit(browse_screen, screen, project, session): screen["id"]
-                for screen in (
-                    screens.get("screens", []) + screens.get("archivedscreens", [])
-                )
+                for screen in all_screens
             }
 
             for future in as_completed(future_to_screen_id):
@@ -329,6 +519,66 @@ def browse_project(project, ignored_project_ids, option, session: Session):
         return False
 
 
+def print_summary(all_projects, successfully_exported_project_ids, ignored_project_ids):
+    """
+    Print the outcome of the scraping.
+
+    Args:
+        all_projects (list): Projects data.
+        successfully_exported_project_ids (set): IDs of the exported projects.
+        ignored_project_ids (set): IDs of the ignored projects.
+
+    Returns:
+        bool: False if some projects failed to export, True otherwise.
+    """
+    # Compare the success and ignored to global list to find failed ones
+    failed_project_ids = [
+        project["id"]
+        for project in all_projects
+        if project["id"] not in successfully_exported_project_ids
+        and project["id"] not in ignored_project_ids
+    ]
+
+    # Ignored projects
+    if len(ignored_project_ids) > 0:
+        if len(all_projects) == len(ignored_project_ids):
+            color_print(
+                f"\nAll {len(all_projects)} projects were already up-to-date and get ignored.",
+                "green",
+            )
+        else:
+            color_print(
+                f"\nIgnored {len(ignored_project_ids)} existing projects.", "yellow"
+            )
+
+    # Successfully exported projects
+    if len(successfully_exported_project_ids) > 0:
+        if len(all_projects) == len(successfully_exported_project_ids):
+            color_print(
+                f"\nAll {len(successfully_exported_project_ids)} projects were successfully exported.",
+                "green",
+            )
+        else:
+            color_print(
+                f"\nSuccessfully exported {len(successfully_exported_project_ids)} projects.",
+                "green",
+            )
+
+    if len(failed_project_ids) > 0:
+        if len(all_projects) == len(failed_project_ids):
+            color_print(
+                f"\nAll {len(failed_project_ids)} projects failed to export", "red"
+            )
+        else:
+            color_print(
+                f"\n{len(failed_project_ids)} projects failed to export.", "red"
+            )
+
+        return False
+
+    return True
+
+
 def browse_projects(session: Session, option=None):
     projects = fetch_projects(isArchived=False, isCollaborator=True, session=session)
 
@@ -341,20 +591,10 @@ def browse_projects(session: Session, option=None):
     allProjects = (projects or []) + (archivedProjects or [])
 
     if allProjects:
-        # In test mode we process one project of each type
-        if is_test_mode():
-            color_print("╭───────────────────────────────────────────────╮", "yellow")
-            color_print("│ Test mode enabled: Fetching only one project! │", "yellow")
-            color_print("╰───────────────────────────────────────────────╯", "yellow")
-
-            allProjects = {project["type"]: project for project in allProjects}.values()
-
-        # WIP : Only manage prototypes
-        allProjects = [
-            project for project in allProjects if project["type"] == "prototype"
-        ]
+        allProjects = select_projects(allProjects)
 
         color_print(f"\nRetrieving {len(allProjects)} projects:", "green")
+        progress.add_total("projects", len(allProjects))
 
         tags = fetch_tags(session)
         common_folder = Path(DOCS_ROOT) / "common"
@@ -363,115 +603,87 @@ def browse_projects(session: Session, option=None):
 
             return False
 
+        catalog_db.index_tags(tags)
+
         successfully_exported_project_ids = set()
         ignored_project_ids = set()
 
-        for project in allProjects:
-            color_print(f" • {project['data']['name']} ({project['id']}):", "white")
+        def process_project(project):
+            """
+            Browse a project, called from the projects pool.
 
-            project_folder = Path(DOCS_ROOT) / "projects" / str(project["id"])
+            Returns:
+                str: "exported", "ignored", "failed" or "cancelled".
+            """
+            if progress.is_cancelled():
+                return "cancelled"
 
-            # Ignore existing valid project folders
-            if option == "update" and project_folder.exists():
-                required_files = ["project.json", "screens.json"]
-                if all((project_folder / f).exists() for f in required_files):
-                    # Grab the project updated date from the project and project.json
-                    # Grab the projet item count from the project and project.json
-                    # If they match ignore the project, if they don't remove the project dir to scrap that again
-                    project_update_date = project["data"].get("updatedAt")
-                    project_item_count = project["data"].get("itemCount")
-
-                    project_json_path = project_folder / "project.json"
-
-                    with project_json_path.open("r") as f:
-                        local_project_data = json.load(f)
-
-                    # Protect the local data if the response is invalid
-                    if not is_valid_response(
-                        local_project_data,
-                        [
-                            "id",
-                            "data",
-                            "type",
-                        ],
-                    ):
-                        color_print(
-                            f"   ⮑  Project skipped due to invalid response",
-                            "yellow",
-                        )
-
-                        ignored_project_ids.add(project["id"])
-                        continue
-
-                    local_project_update_date = local_project_data["data"].get(
-                        "updatedAt"
-                    )
-                    local_project_item_count = local_project_data["data"].get(
-                        "itemCount"
-                    )
+            color_print(f" • {project['data']['name']} ({project['id']}):", "white")
 
-                    # Project outdated
-                    if (
-                        project_update_date != local_project_update_date
-                        or project_item_count != local_project_item_count
-                    ):
-                        color_print(
-                            f"   ⮑  Project outdated, replay the scraping...",
-                            "yellow",
-                        )
-                        shutil.rmtree(project_folder, ignore_errors=True)
+            # Ignore existing valid project folders
+            if option == "update" and not check_project_folder(project):
+                return "ignored"
 
             if tags:
                 project["data"]["tags"] = [
                     tag for tag in tags if project["id"] in tag["prototypeIDs"]
                 ]
 
-            if browse_project(project, ignored_project_ids, option, session):
-                successfully_exported_project_ids.add(project["id"])
-
-        # Compare the success and ignored to global list to find failed ones
-        failed_project_ids = [
-            project["id"]
-            for project in allProjects
-            if project["id"] not in successfully_exported_project_ids
-            and project["id"] not in ignored_project_ids
-        ]
-
-        # Ignored projects
-        if len(ignored_project_ids) > 0:
-            if len(allProjects) == len(ignored_project_ids):
-                color_print(
-                    f"\nAll {len(allProjects)} projects were already up-to-date and get ignored.",
-                    "green",
-                )
-            else:
-                color_print(
-                    f"\nIgnored {len(ignored_project_ids)} existing projects.", "yellow"
-                )
+            if browse_project(
+                project,
+                ignored_project_ids,
+                option,
+                session,
+                screen_executor=screen_executor,
+            ):
+                return "exported"
+
+            return "failed"
+
+        # Several projects are browsed at once. Their screens share one pool, and all
+        # their requests share the adaptive concurrency window as a global budget.
+        with ThreadPoolExecutor(
+            max_workers=concurrency.maximum, thread_name_prefix="screen"
+        ) as screen_executor, ThreadPoolExecutor(
+            max_workers=SCRAPER_MAX_PROJECTS, thread_name_prefix="project"
+        ) as project_executor:
+            future_to_project_id = {
+                project_executor.submit(process_project, project): project["id"]
+                for project in allProjects
+            }
 
-        # Successfully exported projects
-        if len(successfully_exported_project_ids) > 0:
-            if len(allProjects) == len(successfully_exported_project_ids):
-                color_print(
-                    f"\nAll {len(successfully_exported_project_ids)} projects were successfully exported.",
-                    "green",
-                )
-            else:
-                color_print(
-                    f"\nSuccessfully exported {len(successfully_exported_project_ids)} projects.",
-                    "green",
-                )
+            # The outcomes are gathered by this thread only, so the sets need no lock
+            for future in as_completed(future_to_project_id):
+                project_id = future_to_project_id[future]
 
-        if len(failed_project_ids) > 0:
-            if len(allProjects) == len(failed_project_ids):
-                color_print(
-                    f"\nAll {len(failed_project_ids)} projects failed to export", "red"
-                )
-            else:
-                color_print(
-                    f"\n{len(failed_project_ids)} projects failed to export.", "red"
-                )
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    color_print(
+                        f"   ✘  Project {project_id} generated an exception: {exc}",
+                        "red",
+                    )
+                    progress.add_done("projects")
+                    continue
+
+                if outcome == "cancelled":
+                    continue
+
+                progress.add_done("projects")
 
+                if outcome == "exported":
+                    successfully_exported_project_ids.add(project_id)
+                elif outcome == "ignored":
+                    ignored_project_ids.add(project_id)
+                    continue
+
+                # Let the API pick up the project while the others are scraped
+                catalog_db.index_project(Path(DOCS_ROOT) / "projects" / str(project_id))
+                bump_generation()
+
+        if not print_summary(
+            allProjects, successfully_exported_project_ids, ignored_project_ids
+        ):
             return False
 
     else:
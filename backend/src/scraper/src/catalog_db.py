@@ -0,0 +1,291 @@
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from src.search import normalize
+from .utils import color_print
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# Database read by the API with CATALOG_BACKEND=sqlite
+CATALOG_DB_FILE_NAME = ".catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    type TEXT,
+    is_archived INTEGER NOT NULL,
+    updated_at INTEGER,
+    document TEXT NOT NULL,
+    screens_document TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_updated_at ON projects (updated_at DESC, id);
+CREATE INDEX IF NOT EXISTS projects_name ON projects (name, id);
+CREATE INDEX IF NOT EXISTS projects_type ON projects (type);
+
+CREATE TABLE IF NOT EXISTS screens (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    list_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    document TEXT NOT NULL,
+    PRIMARY KEY (project_id, list_name, position)
+);
+
+CREATE TABLE IF NOT EXISTS tags (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    position INTEGER NOT NULL,
+    document TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS project_tags (
+    tag_id TEXT NOT NULL,
+    project_id INTEGER NOT NULL,
+    PRIMARY KEY (tag_id, project_id)
+);
+CREATE INDEX IF NOT EXISTS project_tags_project ON project_tags (project_id);
+
+CREATE TABLE IF NOT EXISTS shares (
+    key TEXT PRIMARY KEY,
+    project_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shares_project ON shares (project_id);
+"""
+
+# Substring search on the names, needs SQLite 3.34+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+    normalized_name, content='projects', content_rowid='id', tokenize='trigram'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS screens_fts USING fts5(
+    normalized_name, content='screens', tokenize='trigram'
+);
+"""
+
+
+def is_catalog_db_enabled():
+    return os.getenv("SCRAPER_CATALOG_DB", "1").lower() in ["true", "1"]
+
+
+def has_fts(connection):
+    return (
+        connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'projects_fts'"
+        ).fetchone()
+        is not None
+    )
+
+
+class CatalogDatabase:
+    """
+    SQLite catalog of the scraped projects, their screens, tags and shares.
+
+    The scraper indexes each project once its files are written, so the API can filter,
+    sort and page the projects with indexed queries instead of parsing the JSON files.
+    The names are stored normalized and indexed by FTS5 trigrams for substring searches.
+    """
+
+    def __init__(self, path: Path, enabled=True):
+        self.path = path
+        self.enabled = enabled
+
+        self.lock = threading.Lock()
+        self.connection = None
+        self.fts = False
+        self.stats = {"projects": 0}
+
+    def connect(self):
+        """
+        Opens the database on first use. Must be called with the lock held.
+        """
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+            try:
+                self.connection.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                color_print(f"Catalog names won't be indexed for search: {e}", "yellow")
+
+            self.fts = has_fts(self.connection)
+
+        return self.connection
+
+    @staticmethod
+    def load_json(path: Path):
+        try:
+            with path.open("r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def delete_project(self, connection, project_id):
+        """
+        Removes the rows of a project. Must be called in a transaction.
+        """
+        if self.fts:
+            connection.execute(
+                "INSERT INTO projects_fts (projects_fts, rowid, normalized_name) "
+                "SELECT 'delete', id, normalized_name FROM projects WHERE id = ?",
+                (project_id,),
+            )
+            connection.execute(
+                "INSERT INTO screens_fts (screens_fts, rowid, normalized_name) "
+                "SELECT 'delete', rowid, normalized_name FROM screens WHERE project_id = ?",
+                (project_id,),
+            )
+
+        for table in ["projects", "screens", "project_tags", "shares"]:
+            column = "id" if table == "projects" else "project_id"
+            connection.execute(f"DELETE FROM {table} WHERE {column} = ?", (project_id,))
+
+    def index_project(self, project_folder: Path):
+        """
+        Replaces the rows of a project with the content of its files.
+
+        Args:
+            project_folder (Path): Local folder of the project.
+        """
+        if not self.enabled:
+            return
+
+        project = self.load_json(project_folder / "project.json")
+
+        if not project or "data" not in project:
+            return
+
+        screens_data = self.load_json(project_folder / "screens.json")
+        shares_data = self.load_json(project_folder / "shares.json") or {}
+
+        project_data = project["data"]
+        project_id = int(project_data.get("id", project.get("id")))
+
+        screen_rows = []
+        screens_document = None
+
+        if screens_data is not None:
+            for list_name in ["screens", "archivedscreens"]:
+                for position, screen in enumerate(screens_data.get(list_name, [])):
+                    screen_rows.append(
+                        (
+                            screen.get("id"),
+                            project_id,
+                            list_name,
+                            position,
+                            screen.get("name", ""),
+                            normalize(screen.get("name", "")),
+                            json.dumps(screen),
+                        )
+                    )
+
+            # The other keys of screens.json (groups, counts...) are returned as they are
+            screens_document = json.dumps(
+                {
+                    key: value
+                    for key, value in screens_data.items()
+                    if key not in ["screens", "archivedscreens"]
+                }
+            )
+
+        with self.lock:
+            connection = self.connect()
+
+            with connection:
+                self.delete_project(connection, project_id)
+
+                connection.execute(
+                    "INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        project_id,
+                        project_data.get("name", ""),
+                        normalize(project_data.get("name", "")),
+                        project_data.get("type"),
+                        int(bool(project_data.get("isArchived"))),
+                        project_data.get("updatedAt") or 0,
+                        json.dumps(project),
+                        screens_document,
+                    ),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO screens VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    screen_rows,
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO project_tags VALUES (?, ?)",
+                    [
+                        (str(tag.get("id")), project_id)
+                        for tag in project_data.get("tags", [])
+                    ],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO shares VALUES (?, ?)",
+                    [
+                        (str(share.get("key", "")).lower(), project_id)
+                        for share in shares_data.get("shares", [])
+                    ],
+                )
+
+                if self.fts:
+                    connection.execute(
+                        "INSERT INTO projects_fts (rowid, normalized_name) VALUES (?, ?)",
+                        (project_id, normalize(project_data.get("name", ""))),
+                    )
+                    connection.execute(
+                        "INSERT INTO screens_fts (rowid, normalized_name) "
+                        "SELECT rowid, normalized_name FROM screens WHERE project_id = ?",
+                        (project_id,),
+                    )
+
+            self.stats["projects"] += 1
+
+    def index_tags(self, tags):
+        """
+        Replaces the tags.
+
+        Args:
+            tags (list): Tags data.
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            connection = self.connect()
+
+            with connection:
+                connection.execute("DELETE FROM tags")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?)",
+                    [
+                        (str(tag.get("id")), tag.get("name"), position, json.dumps(tag))
+                        for position, tag in enumerate(tags or [])
+                    ],
+                )
+
+    def finalize(self):
+        """
+        Closes the database and prints how many projects were indexed, at the end of a scraping.
+        """
+        with self.lock:
+            if self.connection is None:
+                return
+
+            self.connection.close()
+            self.connection = None
+
+        color_print(f"\nCatalog: {self.stats['projects']} projects indexed", "yellow")
+
+
+catalog_db = CatalogDatabase(
+    Path(DOCS_ROOT) / CATALOG_DB_FILE_NAME, enabled=is_catalog_db_enabled()
+)
@@ -0,0 +1,125 @@
+import os
+import gzip
+import uuid
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    # Optional dependency, only the gzip variants are written without it
+    brotli = None
+
+# Content-Encoding of each precompressed variant, by order of preference
+COMPRESSED_VARIANTS = {"br": ".br", "gzip": ".gz"}
+
+# Files smaller than this aren't worth compressing
+COMPRESSION_MIN_SIZE = int(os.getenv("SCRAPER_COMPRESSION_MIN_SIZE", 1024))
+
+# The variants are compressed while scraping, brotli 11 takes about 50 times longer than 5
+GZIP_LEVEL = int(os.getenv("SCRAPER_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("SCRAPER_BROTLI_QUALITY", 5))
+
+
+def is_compression_enabled():
+    return os.getenv("SCRAPER_COMPRESS_JSON", "1").lower() in ["true", "1"]
+
+
+def get_variant_path(file_path: Path, encoding):
+    return file_path.with_name(file_path.name + COMPRESSED_VARIANTS[encoding])
+
+
+def compress(content: bytes, encoding):
+    """
+    Compresses content with an encoding.
+
+    Returns:
+        bytes or None: The compressed content, None if the encoding isn't available.
+    """
+    if encoding == "gzip":
+        # No timestamp in the header, the same content gives the same bytes
+        return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+
+    return None
+
+
+def write_compressed_variants(file_path: Path, content: bytes):
+    """
+    Writes the precompressed variants of a file next to it, `.br` and `.gz`.
+
+    The variants are written after the file itself, so they are never older than the
+    content they were built from. Variants that aren't smaller than the content are
+    removed.
+
+    Args:
+        file_path (Path): The file, already written.
+        content (bytes): The content of the file.
+    """
+    for encoding in COMPRESSED_VARIANTS:
+        variant_path = get_variant_path(file_path, encoding)
+
+        compressed = (
+            compress(content, encoding)
+            if is_compression_enabled() and len(content) >= COMPRESSION_MIN_SIZE
+            else None
+        )
+
+        if compressed is None or len(compressed) >= len(content):
+            variant_path.unlink(missing_ok=True)
+            continue
+
+        temp_path = variant_path.with_name(
+            f".{variant_path.name}.{uuid.uuid4().hex}.part"
+        )
+
+        try:
+            temp_path.write_bytes(compressed)
+            os.replace(temp_path, variant_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+
+def remove_compressed_variants(file_path: Path):
+    """
+    Removes the precompressed variants of a file.
+
+    Args:
+        file_path (Path): The file.
+    """
+    for encoding in COMPRESSED_VARIANTS:
+        get_variant_path(file_path, encoding).unlink(missing_ok=True)
+
+
+def get_compressed_variant(file_path: Path, accepted_encodings):
+    """
+    Finds the best precompressed variant of a file accepted by a client.
+
+    A variant older than the file is ignored, it was built from a previous content.
+
+    Args:
+        file_path (Path): The file.
+        accepted_encodings (Accept): The Accept-Encoding header of the request.
+
+    Returns:
+        tuple or None: The path and the Content-Encoding of the variant, None to send the file itself.
+    """
+    try:
+        mtime = file_path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    for encoding in COMPRESSED_VARIANTS:
+        if not accepted_encodings[encoding]:
+            continue
+
+        variant_path = get_variant_path(file_path, encoding)
+
+        try:
+            if variant_path.stat().st_mtime_ns >= mtime:
+                return variant_path, encoding
+        except OSError:
+            continue
+
+    return None
@@ -0,0 +1,240 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+THROTTLE_STATUSES = {
+    429,  # Rate limit exceeded
+    503,  # Service unavailable
+}
+
+
+def wake_waiter(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD (additive increase, multiplicative decrease) window of requests in flight.
+
+    Until the first throttled response the window grows by `increase` per success (slow
+    start, doubling each round trip). Then every success grows it by `increase / window`
+    (about `increase` per full window of successes), and every throttled response shrinks
+    it by `decrease`. Throttled responses received less than `decrease_interval` seconds
+    after a decrease answer requests sent with the previous window, so they don't shrink
+    it again.
+    """
+
+    def __init__(
+        self,
+        initial=8,
+        minimum=1,
+        maximum=64,
+        increase=1.0,
+        decrease=0.5,
+        decrease_interval=1.0,
+        history_size=200,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_interval = decrease_interval
+
+        self.window = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self.waiting = 0
+        self.slow_start = True
+        self.last_decrease = 0.0
+        self.history = deque(maxlen=history_size)
+
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.async_waiters = deque()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            initial=int(os.getenv("SCRAPER_CONCURRENCY_INITIAL", 8)),
+            minimum=int(os.getenv("SCRAPER_CONCURRENCY_MIN", 1)),
+            maximum=int(os.getenv("SCRAPER_CONCURRENCY_MAX", 64)),
+            increase=float(os.getenv("SCRAPER_CONCURRENCY_INCREASE", 1.0)),
+            decrease=float(os.getenv("SCRAPER_CONCURRENCY_DECREASE", 0.5)),
+        )
+
+    def configure(self, **kwargs):
+        """
+        Overrides some settings of the window, None values are ignored (used for CLI arguments).
+        """
+        with self.lock:
+            for key, value in kwargs.items():
+                if value is not None:
+                    setattr(self, key, value)
+
+            self.window = float(max(self.minimum, min(self.window, self.maximum)))
+            self.wake_up()
+
+    @contextmanager
+    def configured(self, **kwargs):
+        """
+        Overrides some settings of the window within a block, then restores them.
+        """
+        previous_settings = {key: getattr(self, key) for key in kwargs}
+        self.configure(**kwargs)
+
+        try:
+            yield
+        finally:
+            self.configure(**previous_settings)
+
+    @property
+    def limit(self):
+        return int(self.window)
+
+    def record_adjustment(self, previous_limit, reason):
+        self.history.append(
+            {
+                "time": time.time(),
+                "from": previous_limit,
+                "to": self.limit,
+                "reason": reason,
+            }
+        )
+
+    def on_response(self, status):
+        """
+        Adjusts the window after a response. Must be called with the lock held.
+
+        Args:
+            status (int or None): The HTTP status, None for a connection error.
+        """
+        previous_limit = self.limit
+
+        if status in THROTTLE_STATUSES:
+            now = time.monotonic()
+
+            if now - self.last_decrease < self.decrease_interval:
+                return
+
+            self.last_decrease = now
+            self.slow_start = False
+            self.window = max(self.minimum, self.window * self.decrease)
+            self.record_adjustment(previous_limit, f"throttled ({status})")
+
+        elif status is not None:
+            if self.slow_start:
+                self.window = min(self.maximum, self.window + self.increase)
+            else:
+                self.window = min(
+                    self.maximum, self.window + self.increase / self.window
+                )
+
+            if self.limit != previous_limit:
+                self.record_adjustment(previous_limit, "success")
+
+    def wake_up(self):
+        """
+        Wakes up the waiting threads and coroutines. Must be called with the lock held.
+        """
+        self.condition.notify_all()
+
+        available = self.limit - self.in_flight
+        while self.async_waiters and available > 0:
+            waiter = self.async_waiters.popleft()
+
+            if waiter.done():
+                continue
+
+            # Futures aren't thread-safe, the loop of the waiter sets its result
+            try:
+                waiter.get_loop().call_soon_threadsafe(wake_waiter, waiter)
+            except RuntimeError:
+                # Its loop is closed, nothing awaits it anymore
+                continue
+
+            available -= 1
+
+    def acquire(self):
+        with self.lock:
+            self.waiting += 1
+
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+
+            self.waiting -= 1
+            self.in_flight += 1
+
+    def release(self, status=None):
+        with self.lock:
+            self.in_flight -= 1
+            self.on_response(status)
+            self.wake_up()
+
+    async def async_acquire(self):
+        while True:
+            with self.lock:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+
+                waiter = asyncio.get_running_loop().create_future()
+                self.async_waiters.append(waiter)
+                self.waiting += 1
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self.lock:
+                    if waiter in self.async_waiters:
+                        self.async_waiters.remove(waiter)
+                    else:
+                        # Cancelled once woken up, the slot goes to the next waiter
+                        self.wake_up()
+
+                raise
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds a slot of the window while a request is in flight.
+
+        Yields:
+            dict: Set its "status" to the HTTP status of the response.
+        """
+        self.acquire()
+        outcome = {"status": None}
+
+        try:
+            yield outcome
+        finally:
+            self.release(outcome["status"])
+
+    @asynccontextmanager
+    async def async_slot(self):
+        await self.async_acquire()
+        outcome = {"status": None}
+
+        try:
+            yield outcome
+        finally:
+            self.release(outcome["status"])
+
+    def summary(self):
+        with self.lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "adjustments": list(self.history),
+            }
+
+
+concurrency = AdaptiveConcurrency.from_env()
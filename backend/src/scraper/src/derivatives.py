@@ -0,0 +1,277 @@
+import os
+import uuid
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image
+
+    # The images are exports of the account, the long retina screens exceed the bomb limit
+    Image.MAX_IMAGE_PIXELS = None
+except ImportError:
+    # Optional dependency, the images are served full size without it
+    Image = None
+
+from .utils import color_print
+from .progress import progress
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# Folder holding the derivatives of the images next to it
+DERIVATIVES_FOLDER_NAME = ".derivatives"
+
+# Widths in pixels of the derivatives, an image is never upscaled
+DERIVATIVE_WIDTHS = sorted(
+    int(width)
+    for width in os.getenv("SCRAPER_DERIVATIVE_WIDTHS", "320,768,1440").split(",")
+    if width.strip()
+)
+
+DERIVATIVE_QUALITY = int(os.getenv("SCRAPER_DERIVATIVE_QUALITY", 80))
+
+# Processes resizing the images, defaults to the number of CPUs
+SCRAPER_DERIVATIVE_WORKERS = os.getenv("SCRAPER_DERIVATIVE_WORKERS")
+
+# Largest side of a WebP image
+WEBP_MAX_SIZE = 16383
+
+IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".gif", ".webp"]
+
+
+def is_derivatives_enabled():
+    return os.getenv("SCRAPER_DERIVATIVES", "1").lower() in ["true", "1"]
+
+
+def is_image(file_path: Path):
+    return file_path.suffix.lower() in IMAGE_EXTENSIONS
+
+
+def get_derivative_path(image_path: Path, width):
+    return (
+        image_path.parent / DERIVATIVES_FOLDER_NAME / f"{image_path.stem}.{width}.webp"
+    )
+
+
+def is_derivative_fresh(derivative_path: Path, mtime):
+    try:
+        return derivative_path.stat().st_mtime_ns >= mtime
+    except OSError:
+        return False
+
+
+def are_derivatives_fresh(image_path: Path):
+    """
+    Checks if all the derivatives of an image were generated since it was written.
+    """
+    try:
+        mtime = image_path.stat().st_mtime_ns
+    except OSError:
+        return True
+
+    return all(
+        is_derivative_fresh(get_derivative_path(image_path, width), mtime)
+        for width in DERIVATIVE_WIDTHS
+    )
+
+
+def remove_derivatives(image_path: Path):
+    """
+    Removes the derivatives of an image.
+
+    Args:
+        image_path (Path): The image.
+    """
+    for width in DERIVATIVE_WIDTHS:
+        get_derivative_path(image_path, width).unlink(missing_ok=True)
+
+
+def get_derivative(image_path: Path, width):
+    """
+    Finds the narrowest derivative of an image at least as wide as requested.
+
+    A derivative older than the image is ignored, it was built from a previous version.
+
+    Args:
+        image_path (Path): The image.
+        width (int): The width the image is displayed at, in device pixels.
+
+    Returns:
+        Path or None: The derivative, None to send the image itself.
+    """
+    try:
+        mtime = image_path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    for derivative_width in DERIVATIVE_WIDTHS:
+        if derivative_width < width:
+            continue
+
+        derivative_path = get_derivative_path(image_path, derivative_width)
+
+        if is_derivative_fresh(derivative_path, mtime):
+            return derivative_path
+
+        return None
+
+    return None
+
+
+def list_images(docs_root: Path):
+    """
+    Lists the screen images and version images of a docs folder.
+
+    Yields:
+        Path: Each image.
+    """
+    for screen_folder in docs_root.glob("projects/*/screens/*"):
+        for image_path in screen_folder.glob("image.*"):
+            if is_image(image_path):
+                yield image_path
+
+        for image_path in screen_folder.glob("versions/*"):
+            if is_image(image_path) and not image_path.name.startswith("."):
+                yield image_path
+
+
+def generate_image_derivatives(image_path: Path, widths, quality):
+    """
+    Writes the WebP derivatives of an image, run by the processes of the derivatives pool.
+
+    Each derivative is written to a temporary file renamed once complete.
+
+    Returns:
+        int: The total size in bytes of the derivatives.
+    """
+    derivatives_size = 0
+
+    with Image.open(image_path) as image:
+        image.load()
+
+        has_alpha = image.mode in ["RGBA", "LA", "PA"] or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for width in widths:
+            # The long screens are narrowed to fit in a WebP image
+            scale = min(
+                1,
+                width / image.width,
+                WEBP_MAX_SIZE / image.width,
+                WEBP_MAX_SIZE / image.height,
+            )
+            size = (
+                max(1, round(image.width * scale)),
+                max(1, round(image.height * scale)),
+            )
+            derivative = (
+                image
+                if size == image.size
+                else image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+            )
+
+            derivative_path = get_derivative_path(image_path, width)
+            derivative_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = derivative_path.with_name(
+                f".{derivative_path.name}.{uuid.uuid4().hex}.part"
+            )
+
+            try:
+                derivative.save(temp_path, "WEBP", quality=quality, method=4)
+                derivatives_size += temp_path.stat().st_size
+                os.replace(temp_path, derivative_path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+
+    return derivatives_size
+
+
+class ImageDerivatives:
+    """
+    Post-scrape stage writing resized WebP variants of the screen and version images.
+
+    The derivatives of `projects/1/screens/2/image.png` are written to
+    `projects/1/screens/2/.derivatives/image.<width>.webp`, one per width of
+    `SCRAPER_DERIVATIVE_WIDTHS`. Only the images newer than their derivatives are resized,
+    by a pool of processes, so an update only processes the new and changed images. The
+    API sends the narrowest derivative matching the `width` asked for an image.
+    """
+
+    def __init__(self, root: Path, enabled=True):
+        self.root = root
+        self.enabled = enabled
+
+        self.stats = {"generated": 0, "fresh": 0, "failed": 0, "bytes": 0}
+
+    def generate(self):
+        """
+        Generates the missing and outdated derivatives of the docs folder.
+        """
+        if not self.enabled or not DERIVATIVE_WIDTHS or progress.is_cancelled():
+            return
+
+        if Image is None:
+            color_print(
+                "\nImage derivatives skipped, Pillow isn't installed (poetry install --extras images)",
+                "yellow",
+            )
+            return
+
+        image_paths = []
+
+        for image_path in list_images(self.root):
+            if are_derivatives_fresh(image_path):
+                self.stats["fresh"] += 1
+            else:
+                image_paths.append(image_path)
+
+        progress.add_total("derivatives", len(image_paths))
+
+        if image_paths:
+            # Spawned, a fork would copy the threads of the scrape jobs in their state
+            with ProcessPoolExecutor(
+                max_workers=int(SCRAPER_DERIVATIVE_WORKERS or os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                future_to_image_path = {
+                    executor.submit(
+                        generate_image_derivatives,
+                        image_path,
+                        DERIVATIVE_WIDTHS,
+                        DERIVATIVE_QUALITY,
+                    ): image_path
+                    for image_path in image_paths
+                }
+
+                for future in as_completed(future_to_image_path):
+                    progress.add_done("derivatives")
+
+                    try:
+                        derivatives_size = future.result()
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        color_print(
+                            f"   ✘  Failed to resize {future_to_image_path[future]}: {e}",
+                            "red",
+                        )
+                        continue
+
+                    self.stats["generated"] += 1
+                    self.stats["bytes"] += derivatives_size
+
+                    if progress.is_cancelled():
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        break
+
+        color_print(
+            f"\nImage derivatives: {self.stats['generated']} images resized, "
+            f"{self.stats['fresh']} up to date, {self.stats['failed']} failed, "
+            f"{self.stats['bytes'] / 1024 / 1024:.1f} MB written",
+            "yellow",
+        )
+
+
+image_derivatives = ImageDerivatives(Path(DOCS_ROOT), enabled=is_derivatives_enabled())
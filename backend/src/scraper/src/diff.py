@@ -0,0 +1,202 @@
+import json
+import shutil
+from pathlib import Path
+
+from .utils import color_print
+from .journal import journal
+from .blob_store import blob_store
+from .compression import remove_compressed_variants
+from .derivatives import remove_derivatives
+
+# Fields telling which parts of a screen changed since the last scraping
+METADATA_FIELDS = ["updatedAt", "name", "isArchived"]
+IMAGE_FIELDS = ["imageVersion"]
+CONVERSATION_FIELDS = ["conversationCount", "unreadConversationCount"]
+
+# Fields each JSON file of a screen depends on
+SCREEN_FILE_FIELDS = {
+    "screen.json": METADATA_FIELDS + IMAGE_FIELDS,
+    "inspect.json": IMAGE_FIELDS,
+    "history.json": IMAGE_FIELDS + CONVERSATION_FIELDS,
+}
+
+# Files to fetch again for each kind of change
+CHANGED_FILES = {
+    "image": ["screen.json", "inspect.json", "history.json", "image.*", "thumbnail.*"],
+    "metadata": ["screen.json"],
+    "conversations": ["history.json"],
+}
+
+CHANGE_KINDS = ["added", "removed", "image", "metadata", "conversations"]
+
+
+def get_field_values(screen, fields):
+    return [screen.get(field, 0 if "Count" in field else None) for field in fields]
+
+
+def get_screen_file_version(screen, file_name):
+    """
+    Builds the version stamp of a JSON file of a screen, from the fields it depends on.
+
+    Args:
+        screen (dict): Screen data.
+        file_name (str): "screen.json", "inspect.json" or "history.json".
+
+    Returns:
+        str: The version stamp.
+    """
+    return ":".join(
+        str(value) for value in get_field_values(screen, SCREEN_FILE_FIELDS[file_name])
+    )
+
+
+def index_screens(screens_data):
+    """
+    Indexes the screens and archived screens of a screens payload by id.
+
+    Args:
+        screens_data (dict): Screens data, including the archived screens.
+
+    Returns:
+        dict: The screens by id.
+    """
+    return {
+        screen["id"]: screen
+        for screen in screens_data.get("screens", [])
+        + screens_data.get("archivedscreens", [])
+    }
+
+
+def get_screen_changes(screen, local_screen):
+    """
+    Lists the kinds of change of a screen, the most significant first.
+
+    Args:
+        screen (dict): Screen data.
+        local_screen (dict): Screen data saved by the last scraping.
+
+    Returns:
+        list: The kinds of change ("image", "metadata", "conversations"), empty if unchanged.
+    """
+    kinds = []
+
+    for kind, fields in [
+        ("image", IMAGE_FIELDS),
+        ("metadata", METADATA_FIELDS),
+        ("conversations", CONVERSATION_FIELDS),
+    ]:
+        if get_field_values(screen, fields) != get_field_values(local_screen, fields):
+            kinds.append(kind)
+
+    return kinds
+
+
+def diff_screens(screens, local_screens_data):
+    """
+    Compares the screens of a project with the ones saved by the last scraping, by id.
+
+    A screen is classified by its most significant change, but the files of all its
+    changes are stale: a new image replaces all its files, a metadata change its details,
+    a conversation change its history.
+
+    Args:
+        screens (dict): Screens data, including the archived screens.
+        local_screens_data (dict): Local screens.json.
+
+    Returns:
+        tuple: The screen ids of each kind of change ("added", "removed", "image", "metadata",
+            "conversations"), and the stale file patterns of each changed screen.
+    """
+    remote_screens = index_screens(screens)
+    local_screens = index_screens(local_screens_data)
+
+    changes = {kind: [] for kind in CHANGE_KINDS}
+    stale_files = {}
+
+    for screen_id, screen in remote_screens.items():
+        local_screen = local_screens.get(screen_id)
+
+        if local_screen is None:
+            changes["added"].append(screen_id)
+            continue
+
+        kinds = get_screen_changes(screen, local_screen)
+
+        if kinds:
+            changes[kinds[0]].append(screen_id)
+            stale_files[screen_id] = {
+                file_pattern for kind in kinds for file_pattern in CHANGED_FILES[kind]
+            }
+
+    changes["removed"] = [
+        screen_id for screen_id in local_screens if screen_id not in remote_screens
+    ]
+
+    return changes, stale_files
+
+
+def apply_screen_changes(screens, project_folder: Path):
+    """
+    Removes the local files of the screens which changed since the last scraping, so only
+    those are fetched again, and the folders of the screens removed from the project.
+
+    Args:
+        screens (dict): Screens data, including the archived screens.
+        project_folder (Path): Local folder of the project.
+
+    Returns:
+        dict or None: The changes, None if the project was never scraped.
+    """
+    screens_json_path = project_folder / "screens.json"
+
+    if not screens_json_path.exists():
+        return None
+
+    try:
+        with screens_json_path.open("r") as f:
+            local_screens_data = json.load(f)
+    except json.JSONDecodeError:
+        return None
+
+    changes, stale_files = diff_screens(screens, local_screens_data)
+
+    for screen_id, file_patterns in stale_files.items():
+        screen_folder = project_folder / "screens" / str(screen_id)
+
+        for file_pattern in file_patterns:
+            for file_path in screen_folder.glob(file_pattern):
+                # The new version is served at the same URL, it must not be linked again
+                blob_store.forget(file_path)
+                file_path.unlink(missing_ok=True)
+                remove_compressed_variants(file_path)
+                remove_derivatives(file_path)
+                journal.forget(file_path)
+
+    for screen_id in changes["removed"]:
+        screen_folder = project_folder / "screens" / str(screen_id)
+
+        if screen_folder.exists():
+            # Its URLs may serve new versions later, they must not be linked again
+            blob_store.forget_folder(screen_folder)
+            shutil.rmtree(screen_folder, ignore_errors=True)
+            journal.forget(screen_folder)
+
+    return changes
+
+
+def print_screen_changes(changes):
+    """
+    Print the changes of the screens of a project.
+
+    Args:
+        changes (dict): The screen ids of each kind of change.
+    """
+    if not any(changes.values()):
+        color_print(f"   ⮑  No screen changed since the last scraping", "yellow")
+        return
+
+    color_print(
+        "   ⮑  Screen changes: "
+        + ", ".join(f"{len(changes[kind])} {kind}" for kind in CHANGE_KINDS),
+        "yellow",
+    )
@@ -0,0 +1,52 @@
+import os
+import uuid
+import threading
+from pathlib import Path
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# Counter bumped each time the scraper changed the docs, read by the API to refresh its catalog
+GENERATION_FILE_NAME = ".generation"
+
+generation_lock = threading.Lock()
+
+
+def read_generation(docs_root: Path):
+    """
+    Reads the scrape generation of a docs folder.
+
+    Args:
+        docs_root (Path): The docs folder.
+
+    Returns:
+        int: The generation, 0 if the folder was never scraped.
+    """
+    try:
+        return int((docs_root / GENERATION_FILE_NAME).read_text().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def bump_generation(docs_root: Path = Path(DOCS_ROOT)):
+    """
+    Increments the scrape generation, after a project was written.
+
+    Args:
+        docs_root (Path): The docs folder.
+
+    Returns:
+        int: The new generation.
+    """
+    with generation_lock:
+        generation = read_generation(docs_root) + 1
+
+        docs_root.mkdir(parents=True, exist_ok=True)
+        generation_path = docs_root / GENERATION_FILE_NAME
+        temp_path = generation_path.with_name(
+            f".{GENERATION_FILE_NAME}.{uuid.uuid4().hex}.part"
+        )
+        temp_path.write_text(str(generation))
+        os.replace(temp_path, generation_path)
+
+    return generation
@@ -0,0 +1,199 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from urllib.parse import urlencode
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .utils import color_print
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# The cache lives next to the docs folder, so it survives an 'overwrite' scraping
+SCRAPER_HTTP_CACHE_PATH = os.getenv(
+    "SCRAPER_HTTP_CACHE_PATH",
+    str(Path(DOCS_ROOT).parent / f".{Path(DOCS_ROOT).name}-http-cache.sqlite"),
+)
+
+
+def is_http_cache_enabled():
+    return os.getenv("SCRAPER_HTTP_CACHE", "1").lower() in ["true", "1"]
+
+
+class HttpCache:
+    """
+    Persistent cache of the validators (ETag, Last-Modified) and bodies of the API responses.
+
+    Requests of cached URLs are sent with If-None-Match / If-Modified-Since, and a
+    304 Not Modified answer is served with the cached body.
+    """
+
+    def __init__(self, path: Path, enabled=True):
+        self.path = path
+        self.enabled = enabled
+
+        self.lock = threading.Lock()
+        self.connection = None
+        self.stats = {"revalidated": 0, "stored": 0}
+
+    def connect(self):
+        """
+        Opens the database on first use. Must be called with the lock held.
+        """
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_type TEXT,
+                    body BLOB NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """)
+
+        return self.connection
+
+    @staticmethod
+    def get_key(url, params=None):
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached response of a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            dict or None: The etag, last_modified, content_type and body, None if not cached.
+        """
+        with self.lock:
+            row = (
+                self.connect()
+                .execute(
+                    "SELECT etag, last_modified, content_type, body FROM responses WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+
+        if row is None:
+            return None
+
+        etag, last_modified, content_type, body = row
+
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "body": body,
+        }
+
+    @staticmethod
+    def get_conditional_headers(entry):
+        headers = {}
+
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def store(self, key, url, headers, body):
+        """
+        Stores a successful response, if it has validators.
+
+        Args:
+            key (str): The cache key.
+            url (str): The requested URL.
+            headers (Mapping): The response headers.
+            body (bytes): The response body.
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+
+        if not etag and not last_modified:
+            return
+
+        with self.lock:
+            connection = self.connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    etag,
+                    last_modified,
+                    headers.get("Content-Type"),
+                    body,
+                    time.time(),
+                ),
+            )
+            connection.commit()
+
+            self.stats["stored"] += 1
+
+    def record_revalidation(self):
+        with self.lock:
+            self.stats["revalidated"] += 1
+
+    def build_response(self, entry, not_modified_response):
+        """
+        Builds the response of a 304 Not Modified from the cached one.
+
+        Args:
+            entry (dict): The cached response.
+            not_modified_response (requests.Response): The 304 response.
+
+        Returns:
+            requests.Response: A 200 response with the cached body.
+        """
+        self.record_revalidation()
+
+        response = Response()
+        response.status_code = 200
+        response._content = entry["body"]
+        response.headers = CaseInsensitiveDict(
+            {
+                "Content-Type": entry["content_type"] or "application/json",
+                "X-Cache": "revalidated",
+            }
+        )
+        response.url = not_modified_response.url
+        response.request = not_modified_response.request
+        response.reason = "OK"
+
+        return response
+
+    def finalize(self):
+        """
+        Closes the database and prints how many responses were revalidated, at the end of a scraping.
+        """
+        with self.lock:
+            if self.connection is None:
+                return
+
+            self.connection.close()
+            self.connection = None
+
+        color_print(
+            f"\nHTTP cache: {self.stats['revalidated']} responses not modified, "
+            f"{self.stats['stored']} stored",
+            "yellow",
+        )
+
+
+http_cache = HttpCache(Path(SCRAPER_HTTP_CACHE_PATH), enabled=is_http_cache_enabled())
@@ -0,0 +1,227 @@
+import os
+import json
+import uuid
+import threading
+from pathlib import Path
+
+from .utils import color_print
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+
+def is_journal_enabled():
+    return os.getenv("SCRAPER_JOURNAL", "1").lower() in ["true", "1"]
+
+
+class ScrapeJournal:
+    """
+    Append-only log of the units of work completed by the scrapings.
+
+    Each unit (project metadata, screen details, inspect, history, asset) is identified by
+    the path of the file it produced and a version stamp, and is appended once its file is
+    complete. The log is loaded in memory on first use, so a resumed scraping knows what it
+    can skip without looking at the files. Removing a folder appends a `forget` entry
+    invalidating every unit below it.
+
+    Lines are flushed one by one, so a killed scraping loses at most the line being written,
+    which is ignored when the log is loaded.
+    """
+
+    def __init__(self, path: Path, root: Path, enabled=True):
+        self.path = path
+        self.root = root
+        self.enabled = enabled
+
+        self.lock = threading.Lock()
+        self.entries = None
+        self.children = None
+        self.file = None
+        self.stats = {"skipped": 0, "recorded": 0}
+
+    def get_key(self, path):
+        try:
+            return Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def load(self):
+        """
+        Replays the log. Must be called with the lock held.
+        """
+        if self.entries is not None:
+            return
+
+        self.entries = {}
+        self.children = {}
+
+        try:
+            with self.path.open("r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Line torn by a crash
+                        continue
+
+                    if "forget" in entry:
+                        self.remove_entries(entry["forget"])
+                    else:
+                        self.add_entry(entry["path"], entry.get("version"))
+        except OSError:
+            pass
+
+    def add_entry(self, key, version):
+        """
+        Adds a unit, linked to its folders so they can be removed without scanning the
+        other units. Must be called with the lock held.
+        """
+        self.entries[key] = version
+
+        while key:
+            parent = key.rpartition("/")[0]
+            children = self.children.setdefault(parent, set())
+
+            # The folders above are already linked
+            if key in children:
+                break
+
+            children.add(key)
+            key = parent
+
+    def remove_entries(self, key):
+        """
+        Removes the units of a path and of everything below it. Must be called with the lock held.
+        """
+        self.children.get(key.rpartition("/")[0], set()).discard(key)
+        keys = [key]
+
+        while keys:
+            key = keys.pop()
+            self.entries.pop(key, None)
+            keys.extend(self.children.pop(key, ()))
+
+    def append(self, entry):
+        """
+        Writes an entry at the end of the log. Must be called with the lock held.
+        """
+        if self.file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = self.path.open("a")
+
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def is_done(self, path, version=None):
+        """
+        Checks if a unit was completed.
+
+        Args:
+            path (Path): The file produced by the unit.
+            version (str): The version stamp of the unit, None for immutable files.
+
+        Returns:
+            bool: True if the unit was completed with the same version, False otherwise.
+        """
+        if not self.enabled:
+            return False
+
+        key = self.get_key(path)
+
+        with self.lock:
+            self.load()
+
+            done = key in self.entries and self.entries[key] == version
+
+            if done:
+                self.stats["skipped"] += 1
+
+        return done
+
+    def record(self, path, version=None):
+        """
+        Records a completed unit.
+
+        Args:
+            path (Path): The file produced by the unit.
+            version (str): The version stamp of the unit, None for immutable files.
+        """
+        if not self.enabled:
+            return
+
+        key = self.get_key(path)
+
+        with self.lock:
+            self.load()
+
+            if key in self.entries and self.entries[key] == version:
+                return
+
+            self.add_entry(key, version)
+            self.append({"path": key, "version": version})
+            self.stats["recorded"] += 1
+
+    def forget(self, path):
+        """
+        Invalidates the units of a removed folder.
+
+        Args:
+            path (Path): The removed folder.
+        """
+        if not self.enabled:
+            return
+
+        key = self.get_key(path)
+
+        with self.lock:
+            self.load()
+            self.remove_entries(key)
+            self.append({"forget": key})
+
+    def compact(self):
+        """
+        Rewrites the log with one line per completed unit. Must be called with the lock held.
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.part")
+
+        with temp_path.open("w") as f:
+            for key, version in self.entries.items():
+                f.write(json.dumps({"path": key, "version": version}) + "\n")
+
+        os.replace(temp_path, self.path)
+
+    def finalize(self):
+        """
+        Compacts the log, unloads it and prints how many units were skipped, at the end of a scraping.
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            if self.entries is None:
+                return
+
+            self.compact()
+
+            # The next scraping of the process replays the file, the docs may have been removed
+            self.entries = self.children = None
+            stats = self.stats
+            self.stats = {"skipped": 0, "recorded": 0}
+
+        color_print(
+            f"\nJournal: {stats['skipped']} completed units skipped, "
+            f"{stats['recorded']} recorded",
+            "yellow",
+        )
+
+
+journal = ScrapeJournal(
+    Path(DOCS_ROOT) / ".scrape-journal.jsonl",
+    Path(DOCS_ROOT),
+    enabled=is_journal_enabled(),
+)
@@ -0,0 +1,76 @@
+import os
+import fcntl
+from pathlib import Path
+from contextlib import contextmanager
+
+# Held by the running scraper, kept when the docs are overwritten
+SCRAPE_LOCK_FILE_NAME = ".scrape.lock"
+
+# Records of the scrape jobs started from the API, kept when the docs are overwritten
+SCRAPE_JOBS_DIR_NAME = ".scrape-jobs"
+
+# Held in the jobs folder by the worker of the API running a job
+SCRAPE_JOB_LOCK_FILE_NAME = ".job.lock"
+
+KEPT_ON_OVERWRITE = [SCRAPE_LOCK_FILE_NAME, SCRAPE_JOBS_DIR_NAME]
+
+
+class ScraperAlreadyRunning(RuntimeError):
+    pass
+
+
+@contextmanager
+def scrape_lock(docs_root: Path, file_name=SCRAPE_LOCK_FILE_NAME):
+    """
+    Holds the lock of a docs folder, so only one scraper writes it at a time.
+
+    The lock is an advisory file lock, released by the system when the process exits, so
+    a killed scraper never leaves it behind. It works across the processes of the API and
+    the command line.
+
+    Args:
+        docs_root (Path): The docs folder.
+        file_name (str): The lock file in the folder.
+
+    Raises:
+        ScraperAlreadyRunning: If another scraper holds the lock.
+    """
+    docs_root.mkdir(parents=True, exist_ok=True)
+
+    file_descriptor = os.open(docs_root / file_name, os.O_RDWR | os.O_CREAT)
+
+    try:
+        try:
+            fcntl.flock(file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ScraperAlreadyRunning("Scraping is already running")
+
+        yield
+    finally:
+        # Closing the file releases the lock
+        os.close(file_descriptor)
+
+
+def is_scrape_running(docs_root: Path):
+    """
+    Checks if a scraper holds the lock of a docs folder.
+
+    Args:
+        docs_root (Path): The docs folder.
+
+    Returns:
+        bool: True if a scraper is running, False otherwise.
+    """
+    try:
+        file_descriptor = os.open(docs_root / SCRAPE_LOCK_FILE_NAME, os.O_RDWR)
+    except OSError:
+        return False
+
+    try:
+        fcntl.flock(file_descriptor, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    else:
+        return False
+    finally:
+        os.close(file_descriptor)
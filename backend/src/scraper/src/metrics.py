@@ -0,0 +1,513 @@
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+from contextlib import contextmanager
+
+from .concurrency import concurrency
+from .progress import progress
+from .lock import is_scrape_running
+
+# Constants for directories
+DOCS_ROOT = os.getenv("DOCS_ROOT", "./docs")
+
+# Metrics of the last scraping, rewritten while it runs and read by the /metrics endpoint
+METRICS_FILE_NAME = ".scrape-metrics.json"
+
+# Seconds between two writes of the metrics file while a scraping runs
+SCRAPER_METRICS_INTERVAL = float(os.getenv("SCRAPER_METRICS_INTERVAL", 5))
+
+# Upper bounds in seconds of the request duration histogram buckets
+DURATION_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+METRICS = {
+    "scraper_requests_total": (
+        "counter",
+        "Responses received by endpoint, host and status (error when the request failed)",
+    ),
+    "scraper_request_duration_seconds": (
+        "histogram",
+        "Duration of the requests by endpoint and host, from sending to reading the body (the headers for streamed downloads)",
+    ),
+    "scraper_response_bytes_total": (
+        "counter",
+        "Bytes of the response bodies by endpoint and host",
+    ),
+    "scraper_retries_total": (
+        "counter",
+        "Requests retried by endpoint and host",
+    ),
+    "scraper_retry_sleep_seconds_total": (
+        "counter",
+        "Seconds spent waiting before retrying by endpoint and host",
+    ),
+    "scraper_requests_in_flight": (
+        "gauge",
+        "Requests holding a slot of the concurrency window",
+    ),
+    "scraper_requests_waiting": (
+        "gauge",
+        "Requests waiting for a slot of the concurrency window",
+    ),
+    "scraper_concurrency_limit": (
+        "gauge",
+        "Size of the concurrency window",
+    ),
+    "scraper_tasks_active": (
+        "gauge",
+        "Screens and assets being browsed or downloaded",
+    ),
+    "scraper_tasks_pending": (
+        "gauge",
+        "Projects, screens and assets found but not done yet (active or queued)",
+    ),
+    "scraper_tasks_done_total": (
+        "counter",
+        "Projects, screens and assets done",
+    ),
+    "scraper_run_duration_seconds": (
+        "gauge",
+        "Seconds since the start of the scraping, or its duration once finished",
+    ),
+    "scraper_running": (
+        "gauge",
+        "1 while a scraper holds the lock of the docs folder",
+    ),
+}
+
+
+def get_endpoint(url):
+    """
+    Names the endpoint of a request, used to label its metrics.
+
+    Args:
+        url (str): The URL of the request.
+
+    Returns:
+        str: The API method (e.g. consoleScreen, getExtractionJSON), "login", "export" or "assets".
+    """
+    path = urlparse(url).path
+
+    # The base URL of the API may have a path of its own
+    if "/api:" in path:
+        return re.split(r"[./]", path.split("/api:", 1)[1])[-1]
+
+    if "login" in path:
+        return "login"
+
+    if path.startswith("/d/"):
+        return "export"
+
+    return "assets"
+
+
+class RequestTimer:
+    """
+    Times a request attempt and records it when leaving the block, with or without async.
+
+    Set the "status" and "bytes" of the yielded dict from the response, the attempt is
+    recorded as an error when the block raises before the status is set.
+    """
+
+    def __init__(self, metrics, endpoint, host):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.host = host
+        self.sample = {"status": None, "bytes": 0}
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self.sample
+
+    def __exit__(self, *exc_info):
+        self.metrics.record_response(
+            self.endpoint,
+            self.host,
+            self.sample["status"],
+            time.monotonic() - self.started,
+            self.sample["bytes"],
+        )
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        self.__exit__(*exc_info)
+
+
+class ScrapeMetrics:
+    """
+    Counters, gauges and histograms of a scraping, labelled by endpoint and host.
+
+    The values are kept in memory and written to `.scrape-metrics.json` in the docs folder
+    every `SCRAPER_METRICS_INTERVAL` seconds while the scraping runs, and once more when it
+    ends, with a summary per endpoint. The API exports the file in the Prometheus text
+    format, whichever process (job or command line) runs the scraper.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.started_at = None
+        self.finished_at = None
+        self.started = None
+        self.duration = None
+
+    def reset(self):
+        """
+        Clears the metrics, at the start of a scraping.
+        """
+        with self.lock:
+            self.values = {}
+            self.started_at = time.time()
+            self.finished_at = None
+            self.started = time.monotonic()
+            self.duration = None
+
+    def get_series(self, name, labels):
+        """
+        Returns the key of a series, creating it. Must be called with the lock held.
+        """
+        key = tuple(sorted(labels.items()))
+        series = self.values.setdefault(name, {})
+
+        if key not in series:
+            if METRICS[name][0] == "histogram":
+                series[key] = {
+                    "buckets": [0] * (len(DURATION_BUCKETS) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            else:
+                series[key] = 0
+
+        return key
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            key = self.get_series(name, labels)
+            self.values[name][key] += value
+
+    def observe(self, name, value, **labels):
+        with self.lock:
+            key = self.get_series(name, labels)
+            histogram = self.values[name][key]
+
+            bucket = next(
+                (
+                    index
+                    for index, bound in enumerate(DURATION_BUCKETS)
+                    if value <= bound
+                ),
+                len(DURATION_BUCKETS),
+            )
+            histogram["buckets"][bucket] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def time_request(self, endpoint, host):
+        return RequestTimer(self, endpoint, host)
+
+    def record_response(self, endpoint, host, status, duration, size=0):
+        self.inc(
+            "scraper_requests_total",
+            endpoint=endpoint,
+            host=host,
+            status=str(status or "error"),
+        )
+        self.observe(
+            "scraper_request_duration_seconds", duration, endpoint=endpoint, host=host
+        )
+
+        if size:
+            self.add_bytes(endpoint, host, size)
+
+    def add_bytes(self, endpoint, host, size):
+        self.inc("scraper_response_bytes_total", size, endpoint=endpoint, host=host)
+
+    def record_retry(self, endpoint, host, delay):
+        self.inc("scraper_retries_total", endpoint=endpoint, host=host)
+        self.inc(
+            "scraper_retry_sleep_seconds_total", delay, endpoint=endpoint, host=host
+        )
+
+    @contextmanager
+    def track_active(self, unit):
+        """
+        Counts a screen or an asset as active while the block runs.
+        """
+        self.inc("scraper_tasks_active", unit=unit)
+
+        try:
+            yield
+        finally:
+            self.inc("scraper_tasks_active", -1, unit=unit)
+
+    def collect_gauges(self):
+        """
+        Reads the gauges of the concurrency window and of the progress. Must be called with the lock held.
+        """
+        concurrency_summary = concurrency.summary()
+        progress_snapshot = progress.snapshot()
+
+        self.values["scraper_requests_in_flight"] = {
+            (): concurrency_summary["in_flight"]
+        }
+        self.values["scraper_requests_waiting"] = {(): concurrency_summary["waiting"]}
+        self.values["scraper_concurrency_limit"] = {(): concurrency_summary["limit"]}
+
+        self.values["scraper_tasks_pending"] = {
+            (("unit", unit),): max(0, counter["total"] - counter["done"])
+            for unit, counter in progress_snapshot.items()
+        }
+        self.values["scraper_tasks_done_total"] = {
+            (("unit", unit),): counter["done"]
+            for unit, counter in progress_snapshot.items()
+        }
+
+        if self.started is not None:
+            duration = self.duration
+            if duration is None:
+                duration = time.monotonic() - self.started
+
+            self.values["scraper_run_duration_seconds"] = {(): round(duration, 3)}
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The metrics, with their samples and a summary per endpoint.
+        """
+        with self.lock:
+            self.collect_gauges()
+
+            metrics = {}
+            for name, series in self.values.items():
+                metric_type, help_text = METRICS[name]
+                samples = []
+
+                for key, value in sorted(series.items()):
+                    sample = {"labels": dict(key)}
+
+                    if metric_type == "histogram":
+                        cumulative_count = 0
+                        sample["buckets"] = {}
+
+                        for bound, count in zip(
+                            DURATION_BUCKETS + ["+Inf"], value["buckets"]
+                        ):
+                            cumulative_count += count
+                            sample["buckets"][str(bound)] = cumulative_count
+
+                        sample["sum"] = round(value["sum"], 6)
+                        sample["count"] = value["count"]
+                    else:
+                        sample["value"] = (
+                            round(value, 6) if isinstance(value, float) else value
+                        )
+
+                    samples.append(sample)
+
+                metrics[name] = {
+                    "type": metric_type,
+                    "help": help_text,
+                    "samples": samples,
+                }
+
+            duration = self.values.get("scraper_run_duration_seconds", {}).get((), 0)
+
+            return {
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "updatedAt": time.time(),
+                "endpoints": self.summarize_endpoints(duration),
+                "metrics": metrics,
+            }
+
+    def summarize_endpoints(self, duration):
+        """
+        Totals the requests, bytes, time and retries of each endpoint. Must be called with the lock held.
+        """
+        endpoints = {}
+
+        def get_endpoint_summary(key):
+            return endpoints.setdefault(
+                dict(key)["endpoint"],
+                {
+                    "requests": 0,
+                    "errors": 0,
+                    "bytes": 0,
+                    "seconds": 0.0,
+                    "retries": 0,
+                    "retrySleepSeconds": 0.0,
+                },
+            )
+
+        for key, count in self.values.get("scraper_requests_total", {}).items():
+            summary = get_endpoint_summary(key)
+            summary["requests"] += count
+
+            if dict(key)["status"] not in ["200", "304"]:
+                summary["errors"] += count
+
+        for key, histogram in self.values.get(
+            "scraper_request_duration_seconds", {}
+        ).items():
+            get_endpoint_summary(key)["seconds"] += histogram["sum"]
+
+        for name, field in [
+            ("scraper_response_bytes_total", "bytes"),
+            ("scraper_retries_total", "retries"),
+            ("scraper_retry_sleep_seconds_total", "retrySleepSeconds"),
+        ]:
+            for key, value in self.values.get(name, {}).items():
+                get_endpoint_summary(key)[field] += value
+
+        for summary in endpoints.values():
+            summary["averageSeconds"] = round(
+                summary["seconds"] / summary["requests"] if summary["requests"] else 0,
+                6,
+            )
+            summary["requestsPerSecond"] = round(
+                summary["requests"] / duration if duration else 0, 3
+            )
+            summary["seconds"] = round(summary["seconds"], 3)
+            summary["retrySleepSeconds"] = round(summary["retrySleepSeconds"], 3)
+
+        return endpoints
+
+    def write(self, docs_root: Path):
+        """
+        Writes the snapshot of the metrics to the metrics file of the docs folder.
+
+        Returns:
+            dict: The snapshot.
+        """
+        snapshot = self.snapshot()
+
+        docs_root.mkdir(parents=True, exist_ok=True)
+        metrics_path = docs_root / METRICS_FILE_NAME
+        temp_path = metrics_path.with_name(
+            f".{METRICS_FILE_NAME}.{uuid.uuid4().hex}.part"
+        )
+        temp_path.write_text(json.dumps(snapshot))
+        os.replace(temp_path, metrics_path)
+
+        return snapshot
+
+    @contextmanager
+    def recording(self, docs_root: Path = Path(DOCS_ROOT)):
+        """
+        Records the metrics of a scraping, writing them while the block runs and when it ends.
+
+        Yields:
+            ScrapeMetrics: The metrics.
+        """
+        self.reset()
+        stopped = threading.Event()
+
+        def flush():
+            while not stopped.wait(SCRAPER_METRICS_INTERVAL):
+                self.write(docs_root)
+
+        flush_thread = threading.Thread(target=flush, daemon=True)
+        flush_thread.start()
+
+        try:
+            yield self
+        finally:
+            stopped.set()
+            flush_thread.join()
+
+            with self.lock:
+                self.finished_at = time.time()
+                self.duration = time.monotonic() - self.started
+
+            self.write(docs_root)
+
+
+def read_metrics(docs_root: Path):
+    """
+    Reads the metrics of the last scraping of a docs folder.
+
+    Args:
+        docs_root (Path): The docs folder.
+
+    Returns:
+        dict or None: The snapshot, None if the folder was never scraped with metrics.
+    """
+    try:
+        with (docs_root / METRICS_FILE_NAME).open("r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return (
+        "{"
+        + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+def render_prometheus(snapshot, running=False):
+    """
+    Renders a snapshot of the metrics in the Prometheus text format (version 0.0.4).
+
+    Args:
+        snapshot (dict): The snapshot, None if there's no metrics yet.
+        running (bool): Whether a scraper is running on the docs folder.
+
+    Returns:
+        str: The metrics.
+    """
+    metrics = dict((snapshot or {}).get("metrics", {}))
+    metrics["scraper_running"] = {
+        "type": METRICS["scraper_running"][0],
+        "help": METRICS["scraper_running"][1],
+        "samples": [{"labels": {}, "value": int(running)}],
+    }
+
+    lines = []
+
+    for name, metric in metrics.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+
+        for sample in metric["samples"]:
+            labels = sample["labels"]
+
+            if metric["type"] == "histogram":
+                for bound, count in sample["buckets"].items():
+                    lines.append(
+                        f"{name}_bucket{format_labels({**labels, 'le': bound})} {count}"
+                    )
+
+                lines.append(f"{name}_sum{format_labels(labels)} {sample['sum']}")
+                lines.append(f"{name}_count{format_labels(labels)} {sample['count']}")
+            else:
+                lines.append(f"{name}{format_labels(labels)} {sample['value']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def get_metrics_text(docs_root: Path):
+    """
+    Returns:
+        str: The metrics of the last scraping of a docs folder, in the Prometheus text format.
+    """
+    return render_prometheus(read_metrics(docs_root), is_scrape_running(docs_root))
+
+
+metrics = ScrapeMetrics()
@@ -0,0 +1,59 @@
+import threading
+
+# Units of work counted by the scrapings
+PROGRESS_UNITS = ["projects", "screens", "assets", "derivatives"]
+
+
+class ScrapeCancelled(Exception):
+    pass
+
+
+class ScrapeProgress:
+    """
+    Counters of the projects, screens, assets and image derivatives done out of those known so far.
+
+    The totals grow as the scraping discovers the screens of each project and the assets
+    of each payload. The counters are read by the scrape jobs of the API, which can also
+    cancel the scraping: the projects and screens not started yet are then skipped, and
+    the scraping stops once the ones in progress are done.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.counters = {}
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the counters and the cancellation, at the start of a scraping.
+        """
+        with self.lock:
+            self.counters = {unit: {"done": 0, "total": 0} for unit in PROGRESS_UNITS}
+
+        self.cancelled.clear()
+
+    def add_total(self, unit, count=1):
+        with self.lock:
+            self.counters[unit]["total"] += count
+
+    def add_done(self, unit, count=1):
+        with self.lock:
+            self.counters[unit]["done"] += count
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The done and total counts of each unit.
+        """
+        with self.lock:
+            return {unit: dict(counter) for unit, counter in self.counters.items()}
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+
+progress = ScrapeProgress()
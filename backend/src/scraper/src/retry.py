@@ -0,0 +1,170 @@
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = {
+    500,
+    502,
+    503,
+    504,
+    429,  # Rate limit exceeded
+}
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        float or None: The number of seconds to wait, None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honouring Retry-After, with a retry budget per host.
+
+    Each host starts with `budget` retry tokens. A retry costs one token and a successful
+    response gives back `budget_ratio` token, so a failing host runs out of retries
+    quickly while the other hosts keep theirs.
+    """
+
+    def __init__(
+        self,
+        max_retries=10,
+        backoff_base=1.0,
+        backoff_max=120.0,
+        retry_after_max=600.0,
+        budget=100.0,
+        budget_ratio=0.1,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.budget = budget
+        self.budget_ratio = budget_ratio
+
+        self.lock = threading.Lock()
+        self.tokens = {}
+        self.stats = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_retries=int(os.getenv("SCRAPER_MAX_RETRIES", 10)),
+            backoff_base=float(os.getenv("SCRAPER_BACKOFF_BASE", 1.0)),
+            backoff_max=float(os.getenv("SCRAPER_BACKOFF_MAX", 120.0)),
+            retry_after_max=float(os.getenv("SCRAPER_RETRY_AFTER_MAX", 600.0)),
+            budget=float(os.getenv("SCRAPER_RETRY_BUDGET", 100.0)),
+            budget_ratio=float(os.getenv("SCRAPER_RETRY_BUDGET_RATIO", 0.1)),
+        )
+
+    def configure(self, **kwargs):
+        """
+        Overrides some settings of the policy, None values are ignored (used for CLI arguments).
+        """
+        for key, value in kwargs.items():
+            if value is not None:
+                setattr(self, key, value)
+
+    def get_host_stats(self, host):
+        return self.stats.setdefault(host, {"retries": 0, "waited": 0.0})
+
+    def record_success(self, host):
+        with self.lock:
+            self.tokens[host] = min(
+                self.budget, self.tokens.get(host, self.budget) + self.budget_ratio
+            )
+
+    def get_delay(self, attempt, retry_after=None):
+        """
+        Computes the delay before the next attempt.
+
+        Args:
+            attempt (int): Number of retries already made for the request.
+            retry_after (str): Retry-After header of the failed response, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        retry_after_delay = parse_retry_after(retry_after)
+
+        if retry_after_delay is not None:
+            return min(retry_after_delay, self.retry_after_max)
+
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * (2**attempt))
+        )
+
+    def get_retry_delay(self, host, attempt, retry_after=None):
+        """
+        Decides if a failed request can be retried, and records the delay it will wait.
+
+        Args:
+            host (str): Host of the failed request.
+            attempt (int): Number of retries already made for the request.
+            retry_after (str): Retry-After header of the failed response, if any.
+
+        Returns:
+            float or None: The delay in seconds, None if the request must not be retried.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        with self.lock:
+            tokens = self.tokens.get(host, self.budget)
+
+            if tokens < 1:
+                return None
+
+            self.tokens[host] = tokens - 1
+
+            delay = self.get_delay(attempt, retry_after)
+
+            host_stats = self.get_host_stats(host)
+            host_stats["retries"] += 1
+            host_stats["waited"] += delay
+
+        return delay
+
+    def summary(self):
+        with self.lock:
+            return {
+                host: {
+                    "retries": host_stats["retries"],
+                    "waited": round(host_stats["waited"], 3),
+                    "budget": round(self.tokens.get(host, self.budget), 3),
+                }
+                for host, host_stats in self.stats.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.tokens.clear()
+            self.stats.clear()
+
+
+retry_policy = RetryPolicy.from_env()
@@ -0,0 +1,128 @@
+import os
+import logging
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+from .concurrency import concurrency
+
+# Connections kept alive per host, defaults to the maximum number of requests in flight
+SCRAPER_POOL_SIZE = os.getenv("SCRAPER_POOL_SIZE")
+
+# Per host overrides, e.g. "projects.invisionapp.com=64,assets.invisionapp.com=128"
+SCRAPER_POOL_SIZES = os.getenv("SCRAPER_POOL_SIZES", "")
+
+
+class ThreadSafeCookieJar(RequestsCookieJar):
+    """
+    Cookie jar which can be read while other threads store the cookies of their responses.
+
+    Writes are already serialized by the lock of the cookielib jar, but iterating (done by
+    every `get` and every prepared request) walks the live dictionaries. Iterations are
+    done on a snapshot taken under the same lock.
+    """
+
+    def __iter__(self):
+        with self._cookies_lock:
+            return iter(list(super().__iter__()))
+
+    def copy(self):
+        new_cj = ThreadSafeCookieJar()
+        new_cj.set_policy(self.get_policy())
+        new_cj.update(self)
+        return new_cj
+
+
+class PoolFullCounter(logging.Handler):
+    """
+    Counts the connections urllib3 had to discard because their pool was full.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        # Called with the lock of the handler held
+        if "Connection pool is full" in record.getMessage():
+            self.count += 1
+
+
+pool_full_counter = PoolFullCounter()
+logging.getLogger("urllib3.connectionpool").addHandler(pool_full_counter)
+
+
+def get_pool_sizes():
+    """
+    Parses the per host pool sizes.
+
+    Returns:
+        dict: The pool size of each configured host.
+    """
+    pool_sizes = {}
+
+    for entry in SCRAPER_POOL_SIZES.split(","):
+        if "=" in entry:
+            host, size = entry.split("=", 1)
+            pool_sizes[host.strip()] = int(size)
+
+    return pool_sizes
+
+
+def create_session():
+    """
+    Creates a session whose connection pools can hold a connection per request in flight.
+
+    Returns:
+        requests.Session: The session, to be closed by the caller.
+    """
+    session = Session()
+    session.cookies = ThreadSafeCookieJar()
+
+    pool_size = int(SCRAPER_POOL_SIZE or concurrency.maximum)
+    pool_sizes = get_pool_sizes()
+
+    # One pool per host, the API, the login and the asset hosts each get their own
+    default_adapter = HTTPAdapter(
+        pool_connections=max(10, len(pool_sizes) + 4), pool_maxsize=pool_size
+    )
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    for host, size in pool_sizes.items():
+        session.mount(
+            f"https://{host}", HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        )
+
+    return session
+
+
+def get_pool_stats(session: Session):
+    """
+    Gathers the keep-alive statistics of the connection pools of a session.
+
+    Args:
+        session (requests.Session): The session.
+
+    Returns:
+        dict: Per host, the requests sent, the connections opened and the requests which reused one.
+    """
+    pool_stats = {}
+
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+
+        for key in pools.keys():
+            pool = pools.get(key)
+
+            if pool is None:
+                continue
+
+            host_stats = pool_stats.setdefault(
+                pool.host, {"requests": 0, "connections": 0, "reused": 0}
+            )
+            host_stats["requests"] += pool.num_requests
+            host_stats["connections"] += pool.num_connections
+            host_stats["reused"] += max(0, pool.num_requests - pool.num_connections)
+
+    return pool_stats
@@ -0,0 +1,98 @@
+from unidecode import unidecode
+
+# Length of the substrings indexed
+NGRAM_SIZE = 3
+
+
+def normalize(text):
+    """
+    Folds a name for search, lowercased and transliterated to ASCII.
+
+    Args:
+        text (str): The name or the query.
+
+    Returns:
+        str: The normalized text.
+    """
+    return unidecode((text or "").lower())
+
+
+def get_ngrams(text):
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class NgramIndex:
+    """
+    Substring search over names normalized once, when the index is built.
+
+    Each trigram of the names points to the keys containing it. A query is answered by
+    intersecting the keys of its trigrams, then checking the remaining candidates. Queries
+    shorter than a trigram scan the normalized names.
+    """
+
+    def __init__(self, names):
+        """
+        Args:
+            names (dict): The name of each key.
+        """
+        self.names = {key: normalize(name) for key, name in names.items()}
+        self.ngrams = {}
+
+        for key, name in self.names.items():
+            for ngram in get_ngrams(name):
+                self.ngrams.setdefault(ngram, set()).add(key)
+
+    def add(self, key, name):
+        """
+        Indexes the name of a key, replacing its previous name.
+
+        The postings are replaced rather than modified, so the searches in progress keep
+        the ones they read.
+        """
+        self.remove(key)
+
+        name = normalize(name)
+        self.names[key] = name
+
+        for ngram in get_ngrams(name):
+            self.ngrams[ngram] = self.ngrams.get(ngram, set()) | {key}
+
+    def remove(self, key):
+        name = self.names.pop(key, None)
+
+        if name is None:
+            return
+
+        for ngram in get_ngrams(name):
+            postings = self.ngrams.get(ngram, set()) - {key}
+
+            if postings:
+                self.ngrams[ngram] = postings
+            else:
+                self.ngrams.pop(ngram, None)
+
+    def search(self, query):
+        """
+        Finds the names containing the query.
+
+        Args:
+            query (str): The query, normalized like the names.
+
+        Returns:
+            set: The keys of the matching names.
+        """
+        query = normalize(query)
+
+        if not query:
+            return set(self.names)
+
+        if len(query) < NGRAM_SIZE:
+            candidates = list(self.names)
+        else:
+            postings = sorted(
+                (self.ngrams.get(ngram, set()) for ngram in get_ngrams(query)), key=len
+            )
+            candidates = set.intersection(*postings)
+
+        # A key may be removed while searching
+        return {key for key in candidates if query in self.names.get(key, "")}
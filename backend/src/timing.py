@@ -0,0 +1,426 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import cProfile
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+from flask import g, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+# Parts of the time of a request, the rest of it is counted as "other"
+PHASES = ["io", "decode", "query", "filter", "encode"]
+
+# Upper bounds in seconds of the request duration histogram buckets
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Timings of each process of the API, merged by /stats. Defaults to a folder of the
+# temporary folder named after the docs folder, shared by the workers serving it only.
+API_STATS_DIR = os.getenv("API_STATS_DIR")
+
+# Seconds between two writes of the timings of a process
+API_STATS_FLUSH_INTERVAL = float(os.getenv("API_STATS_FLUSH_INTERVAL", 5))
+
+# Profile every request and keep the profiles of those slower than API_PROFILE_SLOW_MS
+API_PROFILE = os.getenv("API_PROFILE", "0").lower() in ["true", "1"]
+API_PROFILE_SLOW_MS = float(os.getenv("API_PROFILE_SLOW_MS", 500))
+
+# Requests sending this token in X-Profile are profiled whatever their duration
+API_PROFILE_TOKEN = os.getenv("API_PROFILE_TOKEN")
+
+API_PROFILE_DIR = Path(
+    os.getenv("API_PROFILE_DIR", Path(tempfile.gettempdir()) / "api-profiles")
+)
+API_PROFILES_KEPT = int(os.getenv("API_PROFILES_KEPT", 100))
+
+# A single profiler can be enabled per process since Python 3.12, and it sees every thread
+profile_lock = threading.Lock()
+
+
+@contextmanager
+def phase(name):
+    """
+    Counts the time spent in the block in a phase of the current request.
+
+    The phases are exclusive: the time of a phase nested in another one is taken from it.
+    Outside of a request (catalog loaded at startup) the block is just run.
+
+    Args:
+        name (str): One of PHASES.
+    """
+    timings = g.get("timings") if has_request_context() else None
+
+    if timings is None:
+        yield
+        return
+
+    outer_phase = timings["current"]
+    timings["current"] = name
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings["phases"][name] = timings["phases"].get(name, 0.0) + elapsed
+
+        if outer_phase is not None:
+            timings["phases"][outer_phase] -= elapsed
+
+        timings["current"] = outer_phase
+
+
+def load_json_file(path: Path):
+    """
+    Reads and decodes a JSON file, timing both phases.
+
+    Raises:
+        OSError: If the file can't be read.
+        json.JSONDecodeError: If the file isn't valid JSON.
+    """
+    with phase("io"):
+        content = path.read_bytes()
+
+    with phase("decode"):
+        return json.loads(content)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider of the app counting the encoding of the responses (jsonify) as a phase.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with phase("encode"):
+            return super().dumps(obj, **kwargs)
+
+
+def create_route_stats():
+    return {
+        "count": 0,
+        "errors": 0,
+        "seconds": 0.0,
+        "maxSeconds": 0.0,
+        "buckets": [0] * (len(DURATION_BUCKETS) + 1),
+        "phases": {name: 0.0 for name in PHASES + ["other"]},
+    }
+
+
+class RouteStats:
+    """
+    Latency histograms of the routes of a process, with the time spent in each phase.
+
+    Each process writes its stats to the stats folder every `API_STATS_FLUSH_INTERVAL`
+    seconds from a background thread, started by its first request, so /stats answers for
+    all the gunicorn workers whichever one receives it. The stats of the workers which
+    exited are dropped.
+    """
+
+    def __init__(self, stats_dir: Path):
+        self.stats_dir = stats_dir
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.flushing_pid = None
+
+    def record(self, route, status, duration, phases):
+        with self.lock:
+            stats = self.routes.setdefault(route, create_route_stats())
+
+            stats["count"] += 1
+            stats["seconds"] += duration
+            stats["maxSeconds"] = max(stats["maxSeconds"], duration)
+
+            if status >= 500:
+                stats["errors"] += 1
+
+            bucket = next(
+                (
+                    index
+                    for index, bound in enumerate(DURATION_BUCKETS)
+                    if duration <= bound
+                ),
+                len(DURATION_BUCKETS),
+            )
+            stats["buckets"][bucket] += 1
+
+            for name, seconds in phases.items():
+                stats["phases"][name] += seconds
+
+            stats["phases"]["other"] += max(0.0, duration - sum(phases.values()))
+
+            # The threads of the preloading process aren't forked with the workers
+            if self.flushing_pid != os.getpid():
+                self.flushing_pid = os.getpid()
+                threading.Thread(target=self.flush_periodically, daemon=True).start()
+
+    def flush_periodically(self):
+        while True:
+            time.sleep(API_STATS_FLUSH_INTERVAL)
+            self.flush()
+
+    def get_stats_path(self, pid):
+        return self.stats_dir / f"{pid}.json"
+
+    def flush(self):
+        """
+        Writes the stats of this process to its file.
+        """
+        with self.lock:
+            content = json.dumps(self.routes)
+
+        try:
+            self.stats_dir.mkdir(parents=True, exist_ok=True)
+            stats_path = self.get_stats_path(os.getpid())
+            temp_path = stats_path.with_name(f".{stats_path.name}.{uuid.uuid4().hex}")
+            temp_path.write_text(content)
+            os.replace(temp_path, stats_path)
+        except OSError as e:
+            print(f"Failed to write the API stats: {e}")
+
+    def load_all(self):
+        """
+        Returns:
+            list: The stats of each running process serving the API.
+        """
+        self.flush()
+
+        all_stats = []
+
+        for stats_path in self.stats_dir.glob("*.json"):
+            pid = int(stats_path.stem) if stats_path.stem.isdigit() else None
+
+            if pid is None or not is_process_running(pid):
+                stats_path.unlink(missing_ok=True)
+                continue
+
+            try:
+                all_stats.append(json.loads(stats_path.read_text()))
+            except (OSError, json.JSONDecodeError):
+                continue
+
+        return all_stats
+
+    def summary(self):
+        """
+        Merges the stats of the processes.
+
+        Returns:
+            dict: The processes counted and the stats of each route, with its percentiles
+                (upper bounds of the histogram buckets) and its average time per phase.
+        """
+        all_stats = self.load_all()
+        merged = {}
+
+        for process_stats in all_stats:
+            for route, stats in process_stats.items():
+                route_stats = merged.setdefault(route, create_route_stats())
+
+                route_stats["count"] += stats["count"]
+                route_stats["errors"] += stats["errors"]
+                route_stats["seconds"] += stats["seconds"]
+                route_stats["maxSeconds"] = max(
+                    route_stats["maxSeconds"], stats["maxSeconds"]
+                )
+                route_stats["buckets"] = [
+                    count + other_count
+                    for count, other_count in zip(
+                        route_stats["buckets"], stats["buckets"]
+                    )
+                ]
+
+                for name, seconds in stats["phases"].items():
+                    route_stats["phases"][name] = (
+                        route_stats["phases"].get(name, 0.0) + seconds
+                    )
+
+        routes = {}
+
+        for route, stats in sorted(merged.items()):
+            count = stats["count"]
+            blueprint, _, endpoint = route.rpartition(".")
+
+            routes[route] = {
+                "blueprint": blueprint or None,
+                "endpoint": endpoint,
+                "count": count,
+                "errors": stats["errors"],
+                "averageSeconds": round(stats["seconds"] / count, 6),
+                "maxSeconds": round(stats["maxSeconds"], 6),
+                "p50": get_percentile(stats["buckets"], 0.5),
+                "p95": get_percentile(stats["buckets"], 0.95),
+                "p99": get_percentile(stats["buckets"], 0.99),
+                "buckets": [
+                    {"le": bound, "count": count}
+                    for bound, count in zip(
+                        DURATION_BUCKETS + ["+Inf"], stats["buckets"]
+                    )
+                ],
+                "phases": {
+                    name: round(seconds / count, 6)
+                    for name, seconds in stats["phases"].items()
+                },
+            }
+
+        return {"processes": len(all_stats), "routes": routes}
+
+
+def get_percentile(buckets, percentile):
+    """
+    Returns the upper bound of the histogram bucket holding a percentile, None above the last bound.
+    """
+    rank = sum(buckets) * percentile
+    cumulative_count = 0
+
+    for bound, count in zip(DURATION_BUCKETS + [None], buckets):
+        cumulative_count += count
+
+        if cumulative_count >= rank:
+            return bound
+
+    return None
+
+
+def get_stats_dir(docs_root):
+    """
+    Returns the folder where the processes serving a docs folder write their stats.
+
+    Args:
+        docs_root (str): The docs folder.
+
+    Returns:
+        Path: `API_STATS_DIR` if set, a folder of the temporary folder otherwise.
+    """
+    if API_STATS_DIR:
+        return Path(API_STATS_DIR)
+
+    # Other apps of the host write their own stats, and drop those of their exited workers
+    digest = hashlib.sha256(str(Path(docs_root).resolve()).encode()).hexdigest()
+
+    return Path(tempfile.gettempdir()) / f"api-stats-{digest[:16]}"
+
+
+def is_process_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+def is_profile_requested():
+    return (
+        bool(API_PROFILE_TOKEN)
+        and request.headers.get("X-Profile") == API_PROFILE_TOKEN
+    )
+
+
+def start_profile():
+    """
+    Profiles the current request, unless another request of the process is profiled.
+
+    Returns:
+        cProfile.Profile or None: The enabled profiler, None if the request isn't profiled.
+    """
+    if not profile_lock.acquire(blocking=False):
+        return None
+
+    profile = cProfile.Profile()
+
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiling tool is active
+        profile_lock.release()
+        return None
+
+    return profile
+
+
+def save_profile(profile, route, duration):
+    """
+    Dumps the profile of a request to API_PROFILE_DIR, removing the oldest ones beyond API_PROFILES_KEPT.
+
+    The files can be read with `python -m pstats` or snakeviz.
+
+    Returns:
+        Path: The profile file.
+    """
+    API_PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_path = API_PROFILE_DIR / (
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{duration * 1000:.0f}ms-"
+        f"{uuid.uuid4().hex[:8]}.prof"
+    )
+    profile.dump_stats(profile_path)
+
+    profile_paths = sorted(
+        API_PROFILE_DIR.glob("*.prof"), key=lambda path: path.stat().st_mtime
+    )
+    for old_profile_path in profile_paths[:-API_PROFILES_KEPT]:
+        old_profile_path.unlink(missing_ok=True)
+
+    return profile_path
+
+
+def init_timing(app):
+    """
+    Times the requests of an app by route and phase, profiling them when enabled.
+    """
+    app.json = TimedJSONProvider(app)
+    app.extensions["route_stats"] = route_stats = RouteStats(
+        get_stats_dir(app.static_folder or app.root_path)
+    )
+
+    @app.before_request
+    def start_timing():
+        g.timings = {"started": time.perf_counter(), "current": None, "phases": {}}
+        g.profile = None
+        g.profile_requested = is_profile_requested()
+
+        if API_PROFILE or g.profile_requested:
+            g.profile = start_profile()
+
+    @app.after_request
+    def record_timing(response):
+        timings = g.pop("timings", None)
+
+        if timings is None:
+            return response
+
+        duration = time.perf_counter() - timings["started"]
+        route = request.endpoint or "unmatched"
+
+        profile = g.get("profile")
+        if profile is not None:
+            profile.disable()
+
+            # A request asking for its profile gets it whatever its duration
+            if g.profile_requested or duration * 1000 >= API_PROFILE_SLOW_MS:
+                profile_path = save_profile(profile, route, duration)
+                response.headers["X-Profile-File"] = profile_path.name
+
+        route_stats.record(route, response.status_code, duration, timings["phases"])
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f"{name};dur={seconds * 1000:.1f}"
+                for name, seconds in timings["phases"].items()
+            ]
+            + [f"total;dur={duration * 1000:.1f}"]
+        )
+
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exception):
+        # Also run when the request failed before its response
+        profile = g.pop("profile", None)
+
+        if profile is not None:
+            profile.disable()
+            profile_lock.release()
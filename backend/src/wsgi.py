@@ -0,0 +1,4 @@
+from src.app import create_app
+
+# Loaded by gunicorn (see gunicorn.conf.py) in its master process, before forking the workers
+app = create_app()
@@ -0,0 +1,131 @@
+import threading
+import requests
+
+from src.scraper.src import api_requests
+from src.scraper.src.concurrency import AdaptiveConcurrency
+from src.scraper.src.journal import ScrapeJournal
+
+
+class StreamedResponse:
+    def __init__(self, status_code, chunks, on_chunk=None):
+        self.status_code = status_code
+        self.headers = {}
+        self.url = "https://invisionapp.com/image.png"
+        self.text = ""
+        self.chunks = chunks
+        self.on_chunk = on_chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            if self.on_chunk:
+                self.on_chunk()
+
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class StubSession(requests.Session):
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+
+    def get(self, *args, **kwargs):
+        return self.responses.pop(0)
+
+
+def test_download_holds_its_slot_while_streaming(tmp_path, monkeypatch):
+    concurrency = AdaptiveConcurrency(initial=4, maximum=4)
+    monkeypatch.setattr(api_requests, "concurrency", concurrency)
+    in_flight = []
+
+    session = StubSession(
+        [
+            StreamedResponse(
+                200,
+                [b"image", b" content"],
+                lambda: in_flight.append(concurrency.in_flight),
+            )
+        ]
+    )
+    temp_path, _ = api_requests.download_to_temp_file(
+        "https://invisionapp.com/image.png", tmp_path / "image.png", session
+    )
+
+    assert in_flight == [1, 1]
+    assert concurrency.in_flight == 0
+    assert temp_path.read_bytes() == b"image content"
+
+
+def test_failed_streamed_responses_are_closed(tmp_path):
+    throttled = StreamedResponse(503, [])
+    throttled.headers["Retry-After"] = "0"
+    not_found = StreamedResponse(404, [])
+    session = StubSession([throttled, not_found])
+
+    result = api_requests.download_to_temp_file(
+        "https://invisionapp.com/image.png", tmp_path / "image.png", session
+    )
+
+    assert result is None
+    assert throttled.closed
+    assert not_found.closed
+
+
+def test_interrupted_download_leaves_no_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        api_requests, "journal", ScrapeJournal(tmp_path / "journal", tmp_path, False)
+    )
+
+    def interrupt():
+        raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+    interrupted = StreamedResponse(200, [b"partial"], interrupt)
+    session = StubSession([interrupted, StreamedResponse(200, [b"complete"])])
+    monkeypatch.setattr(api_requests.retry_policy, "backoff_base", 0)
+    destination = tmp_path / "assets" / "image.png"
+
+    assert api_requests.download_file(
+        "https://invisionapp.com/image.png", destination, session
+    )
+    assert destination.read_bytes() == b"complete"
+    assert [path.name for path in destination.parent.iterdir()] == ["image.png"]
+
+
+def test_payload_assets_are_downloaded_concurrently_and_patched(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_requests, "DOCS_ROOT", str(tmp_path))
+    both_downloading = threading.Barrier(2)
+    downloads = []
+
+    def download_file(url, destination, session):
+        downloads.append(url)
+        both_downloading.wait(timeout=5)
+
+        return "thumbnails" not in url
+
+    monkeypatch.setattr(api_requests, "download_file", download_file)
+
+    image_url = "https://assets.invisionapp.com/screens/files/2.png?v=1"
+    thumbnail_url = "https://assets.invisionapp.com/screens/thumbnails/2.png"
+    payload = {
+        "imageUrl": image_url,
+        "versions": [{"imageUrl": image_url}],
+        "thumbnailUrl": thumbnail_url,
+    }
+
+    patched = api_requests.json_patch_to_local_assets(payload, 1, 2, None)
+
+    assert sorted(downloads) == [image_url, thumbnail_url]
+    assert patched["imageUrl"] == "/projects/1/screens/2/image.png"
+    assert patched["versions"][0]["imageUrl"] == "/projects/1/screens/2/image.png"
+    # A failed download keeps its link, fetched again by the next scraping
+    assert patched["thumbnailUrl"] == thumbnail_url
+    assert api_requests.has_asset_links(patched)
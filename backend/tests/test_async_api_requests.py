@@ -0,0 +1,31 @@
+import asyncio
+
+from src.scraper.src import async_api_requests
+
+
+def test_asset_shared_by_payloads_is_downloaded_once(tmp_path, monkeypatch):
+    downloads = []
+
+    async def fetch_file(url, destination, client):
+        downloads.append(url)
+        await asyncio.sleep(0.01)
+        destination.write_bytes(b"asset")
+
+        return True
+
+    monkeypatch.setattr(async_api_requests, "fetch_file", fetch_file)
+    destination = tmp_path / "image.png"
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                async_api_requests.download_file(
+                    "https://invisionapp.com/image.png", destination, None
+                )
+                for _ in range(3)
+            )
+        )
+
+    assert asyncio.run(main()) == [True] * 3
+    assert len(downloads) == 1
+    assert async_api_requests.downloads_in_flight == {}
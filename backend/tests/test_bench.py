@@ -0,0 +1,51 @@
+from bench.api import ApiBenchmark, compare_results
+from bench.generate import generate_docs
+from src import timing
+
+
+def generate_small_docs(docs_root, seed=0):
+    generate_docs(
+        docs_root,
+        project_count=6,
+        screen_count=4,
+        tag_count=3,
+        inspect_size=500,
+        images=False,
+        seed=seed,
+        workers=1,
+    )
+
+
+def test_generated_docs_depend_on_the_seed_only(tmp_path):
+    for name in ["first", "second"]:
+        generate_small_docs(tmp_path / name)
+
+    generate_small_docs(tmp_path / "other", seed=1)
+
+    def read_screens(name):
+        return (tmp_path / name / "projects" / "1" / "screens.json").read_bytes()
+
+    assert read_screens("first") == read_screens("second")
+    assert read_screens("first") != read_screens("other")
+
+
+def test_every_api_scenario_is_answered(tmp_path, monkeypatch):
+    monkeypatch.setattr(timing, "API_STATS_DIR", str(tmp_path / "api-stats"))
+    generate_small_docs(tmp_path / "docs")
+
+    benchmark = ApiBenchmark(tmp_path / "docs")
+
+    for name, get_url in benchmark.get_scenarios().items():
+        status_code = benchmark.client.get(get_url()).status_code
+        assert status_code == (404 if name == "share_unknown" else 200), name
+
+    results = benchmark.run(requests=3, warmup=1)
+
+    assert len(results) == 17
+    assert all(result["errors"] == 0 for result in results.values())
+    assert results["screen_inspect"]["bytes"] > 500
+
+    baseline = {
+        "projects": {**results["projects"], "p95": results["projects"]["p95"] / 10}
+    }
+    assert compare_results(results, baseline, threshold=2) == ["projects"]
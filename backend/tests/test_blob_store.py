@@ -0,0 +1,65 @@
+import json
+import hashlib
+
+from src.scraper.src import diff
+from src.scraper.src.blob_store import BlobStore
+
+IMAGE_URL = "https://assets.invisionapp.com/screens/files/1.png?signature=abc"
+
+
+def save_screens(project_folder, image_version):
+    with (project_folder / "screens.json").open("w") as f:
+        json.dump({"screens": [{"id": 1, "imageVersion": image_version}]}, f)
+
+
+def fetch_image(store, destination, content):
+    def download():
+        temp_path = destination.with_name("image.part")
+        temp_path.write_bytes(content)
+
+        return temp_path, hashlib.sha256(content).hexdigest()
+
+    return store.fetch(IMAGE_URL, destination, download)
+
+
+def test_changed_image_is_downloaded_again(tmp_path, monkeypatch):
+    store = BlobStore(tmp_path / "common" / "blobs", enabled=True)
+    monkeypatch.setattr(diff, "blob_store", store)
+    monkeypatch.setattr(diff.journal, "enabled", False)
+
+    project_folder = tmp_path / "projects" / "1"
+    image_path = project_folder / "screens" / "1" / "image.png"
+    image_path.parent.mkdir(parents=True)
+
+    save_screens(project_folder, image_version=1)
+    assert fetch_image(store, image_path, b"version 1")
+
+    # The image changed behind the same path
+    changes = diff.apply_screen_changes(
+        {"screens": [{"id": 1, "imageVersion": 2}]}, project_folder
+    )
+
+    assert changes["image"] == [1]
+    assert not image_path.exists()
+
+    assert fetch_image(store, image_path, b"version 2")
+    assert image_path.read_bytes() == b"version 2"
+
+
+def test_removed_screen_is_forgotten(tmp_path, monkeypatch):
+    store = BlobStore(tmp_path / "common" / "blobs", enabled=True)
+    monkeypatch.setattr(diff, "blob_store", store)
+    monkeypatch.setattr(diff.journal, "enabled", False)
+
+    project_folder = tmp_path / "projects" / "1"
+    image_path = project_folder / "screens" / "1" / "image.png"
+    image_path.parent.mkdir(parents=True)
+
+    save_screens(project_folder, image_version=1)
+    assert fetch_image(store, image_path, b"version 1")
+
+    changes = diff.apply_screen_changes({"screens": []}, project_folder)
+
+    assert changes["removed"] == [1]
+    assert not image_path.parent.exists()
+    assert store.lookup(IMAGE_URL) is None
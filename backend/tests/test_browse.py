@@ -0,0 +1,60 @@
+import threading
+
+from src.scraper.src import browse
+from src.scraper.src.catalog_db import CatalogDatabase
+from src.scraper.src.progress import ScrapeProgress
+
+
+def build_project(project_id):
+    return {
+        "id": project_id,
+        "type": "prototype",
+        "data": {"name": f"Project {project_id}"},
+    }
+
+
+def test_projects_are_browsed_at_once(tmp_path, monkeypatch):
+    projects = [build_project(project_id) for project_id in [1, 2, 3, 4]]
+
+    monkeypatch.setattr(browse, "DOCS_ROOT", str(tmp_path))
+    monkeypatch.setattr(browse, "SCRAPER_MAX_PROJECTS", 3)
+    monkeypatch.setattr(browse, "progress", ScrapeProgress())
+    monkeypatch.setattr(browse, "catalog_db", CatalogDatabase(tmp_path / "db"))
+    monkeypatch.setattr(browse, "bump_generation", lambda: None)
+    monkeypatch.setattr(
+        browse,
+        "fetch_projects",
+        lambda isArchived, **kwargs: [] if isArchived else projects,
+    )
+    monkeypatch.setattr(browse, "fetch_tags", lambda session: [])
+    monkeypatch.setattr(
+        browse, "check_project_folder", lambda project: project["id"] != 4
+    )
+
+    # The three projects to browse must run at the same time to pass the barrier
+    barrier = threading.Barrier(3)
+
+    def browse_project(project, *args, **kwargs):
+        barrier.wait(timeout=5)
+
+        if project["id"] == 3:
+            raise RuntimeError("Broken project")
+
+        return project["id"] == 1
+
+    monkeypatch.setattr(browse, "browse_project", browse_project)
+
+    exported, ignored = [], []
+
+    def print_summary(all_projects, exported_ids, ignored_ids):
+        exported.extend(exported_ids)
+        ignored.extend(ignored_ids)
+
+        return False
+
+    monkeypatch.setattr(browse, "print_summary", print_summary)
+
+    assert browse.browse_projects(session=None, option="update") is False
+    assert exported == [1]
+    assert ignored == [4]
+    assert browse.progress.snapshot()["projects"] == {"total": 4, "done": 4}
@@ -0,0 +1,212 @@
+import os
+import json
+import shutil
+import time
+import threading
+
+from src.catalog import SORT_KEYS, ProjectCatalog, SqliteCatalog
+from src.scraper.src.catalog_db import CATALOG_DB_FILE_NAME, CatalogDatabase
+from src.scraper.src.generation import bump_generation
+
+
+def save_project(docs_root, project_id, name, updated_at=0, **data):
+    project_folder = docs_root / "projects" / str(project_id)
+    project_folder.mkdir(parents=True, exist_ok=True)
+
+    with (project_folder / "project.json").open("w") as f:
+        json.dump(
+            {
+                "id": project_id,
+                "data": {"name": name, "updatedAt": updated_at, **data},
+            },
+            f,
+        )
+
+
+def test_threads_queued_behind_a_scan_dont_scan_again(tmp_path):
+    save_project(tmp_path, 1, "Home")
+    catalog = ProjectCatalog(tmp_path)
+    catalog.refresh(force=True)
+
+    scans = []
+    scan = catalog.scan
+
+    def slow_scan():
+        scans.append(1)
+        time.sleep(0.1)
+        scan()
+
+    catalog.scan = slow_scan
+    bump_generation(tmp_path)
+
+    threads = [threading.Thread(target=catalog.refresh) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(scans) == 1
+
+
+def test_sqlite_catalog_reads_the_recreated_database(tmp_path):
+    database_path = tmp_path / CATALOG_DB_FILE_NAME
+
+    def write_tags(tags):
+        database = CatalogDatabase(database_path)
+        database.index_tags(tags)
+        database.finalize()
+
+    write_tags([{"id": 1, "name": "Before"}])
+    catalog = SqliteCatalog(database_path)
+    assert [tag["name"] for tag in catalog.get_tags()] == ["Before"]
+
+    # An overwrite removes the docs folder, the scraper writes a new database
+    database_path.unlink()
+    write_tags([{"id": 2, "name": "After"}])
+
+    assert [tag["name"] for tag in catalog.get_tags()] == ["After"]
+
+
+def test_refresh_moves_the_changed_projects_in_the_indexes(tmp_path):
+    for project_id in range(1, 41):
+        save_project(tmp_path, project_id, f"Project {project_id}", project_id)
+
+    catalog = ProjectCatalog(tmp_path)
+    catalog.refresh(force=True)
+    project_index = catalog.project_index
+
+    save_project(tmp_path, 7, "Renamed dashboard", 100)
+    os.utime(tmp_path / "projects" / "7" / "project.json", ns=(1, 1))
+    shutil.rmtree(tmp_path / "projects" / "12")
+    save_project(tmp_path, 41, "Project 41", 0)
+    catalog.refresh(force=True)
+
+    assert catalog.project_index is project_index
+    assert catalog.sort_indexes == catalog.build_sort_indexes(catalog.records.values())
+    assert catalog.search_projects("dashboard") == {"7"}
+    assert catalog.search_projects("project 1") == {"1", "10", "11"} | {
+        str(project_id) for project_id in range(13, 20)
+    }
+    assert catalog.search_projects("41") == {"41"}
+
+
+def save_shares(docs_root, project_id, keys):
+    with (docs_root / "projects" / str(project_id) / "shares.json").open("w") as f:
+        json.dump({"shares": [{"key": key} for key in keys]}, f)
+
+
+def test_share_keys_are_looked_up_case_insensitively(tmp_path):
+    save_project(tmp_path, 1, "Home")
+    save_project(tmp_path, 2, "Checkout")
+    save_shares(tmp_path, 1, ["AbC123"])
+    save_shares(tmp_path, 2, ["xyz789"])
+
+    catalog = ProjectCatalog(tmp_path)
+
+    assert catalog.get_share_project_id("abc123") == "1"
+    assert catalog.get_share_project_id("XYZ789") == "2"
+    assert catalog.get_share_project_id("unknown") is None
+
+    # The scraper replaced the shares of a project
+    save_shares(tmp_path, 2, ["new456"])
+    os.utime(tmp_path / "projects" / "2" / "shares.json", ns=(1, 1))
+    bump_generation(tmp_path)
+
+    assert catalog.get_share_project_id("xyz789") is None
+    assert catalog.get_share_project_id("NEW456") == "2"
+
+    database = CatalogDatabase(tmp_path / CATALOG_DB_FILE_NAME)
+    database.index_project(tmp_path / "projects" / "1")
+    database.finalize()
+
+    sqlite_catalog = SqliteCatalog(tmp_path / CATALOG_DB_FILE_NAME)
+    assert sqlite_catalog.get_share_project_id("ABC123") == "1"
+
+
+def save_filtered_project(docs_root, project_id, updated_at=0):
+    save_project(
+        docs_root,
+        project_id,
+        f"Project {project_id}",
+        updated_at,
+        type=["prototype", "board"][project_id % 2],
+        isArchived=project_id % 5 == 0,
+        tags=[
+            {"id": tag_id} for tag_id in range(1, 4) if project_id % (tag_id + 1) == 0
+        ],
+    )
+
+
+def test_filtered_pages_match_the_filtered_projects(tmp_path):
+    for project_id in range(1, 61):
+        save_filtered_project(tmp_path, project_id, updated_at=project_id % 7)
+
+    catalog = ProjectCatalog(tmp_path)
+    catalog.refresh(force=True)
+
+    # Moved in the indexes by the refresh
+    save_filtered_project(tmp_path, 3, updated_at=100)
+    os.utime(tmp_path / "projects" / "3" / "project.json", ns=(1, 1))
+    shutil.rmtree(tmp_path / "projects" / "8")
+    catalog.refresh(force=True)
+
+    records = list(catalog.records.values())
+    assert catalog.filter_index == catalog.build_filter_index(records)
+
+    for project_type, project_tag, search_query, project_ids in [
+        ("board", None, "", set()),
+        ("archived", None, "", set()),
+        (None, "2", "", set()),
+        ("prototype", "1", "project 1", set()),
+        (None, None, "", {"3", "8", "9", "10", "404"}),
+        ("board", "3", "", {"3", "6", "9"}),
+        (None, "404", "", set()),
+    ]:
+        expected_ids = [
+            record["id"]
+            for record in records
+            if (
+                project_type is None
+                or record["type"] == project_type
+                or (project_type == "archived" and record["isArchived"])
+            )
+            and (not project_tag or project_tag in record["tags"])
+            and (not search_query or search_query in record["name"].lower())
+            and (not project_ids or str(record["id"]) in project_ids)
+        ]
+
+        for sort_by in SORT_KEYS:
+            expected_ids.sort(
+                key=lambda project_id: SORT_KEYS[sort_by](
+                    catalog.records[str(project_id)]
+                )
+            )
+
+            # Walked by cursor, then by offset
+            page_ids, cursor = [], None
+
+            while True:
+                projects, total, cursor = catalog.query_projects(
+                    project_type,
+                    project_tag,
+                    search_query,
+                    project_ids,
+                    sort_by,
+                    0,
+                    4,
+                    cursor,
+                )
+                page_ids += [project["id"] for project in projects]
+                assert total == len(expected_ids)
+
+                if cursor is None:
+                    break
+
+            assert page_ids == expected_ids
+
+            projects, _, _ = catalog.query_projects(
+                project_type, project_tag, search_query, project_ids, sort_by, 2, 3
+            )
+            assert [project["id"] for project in projects] == expected_ids[2:5]
@@ -0,0 +1,73 @@
+import os
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+from src.responses import send_static_file
+from src.scraper.src import compression
+from src.scraper.src.compression import (
+    get_variant_path,
+    remove_compressed_variants,
+    write_compressed_variants,
+)
+
+CONTENT = json.dumps({"screens": [{"id": i, "name": "Home"} for i in range(100)]})
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__, static_url_path="/static", static_folder=tmp_path)
+    app.view_functions["static"] = send_static_file
+
+    return app.test_client()
+
+
+def save_json(file_path, content):
+    file_path.write_bytes(content)
+    write_compressed_variants(file_path, content)
+
+
+def test_variants_are_written_for_large_files_only(tmp_path):
+    large_path = tmp_path / "screens.json"
+    small_path = tmp_path / "tags.json"
+
+    save_json(large_path, CONTENT.encode())
+    save_json(small_path, b"[]")
+
+    assert gzip.decompress(get_variant_path(large_path, "gzip").read_bytes()) == (
+        CONTENT.encode()
+    )
+    assert not get_variant_path(small_path, "gzip").exists()
+
+    remove_compressed_variants(large_path)
+    assert sorted(tmp_path.iterdir()) == [large_path, small_path]
+
+
+def test_variants_are_sent_by_accept_encoding(client, tmp_path):
+    screens_json_path = tmp_path / "screens.json"
+    save_json(screens_json_path, CONTENT.encode())
+
+    identity = client.get("/static/screens.json")
+    assert identity.headers.get("Content-Encoding") is None
+    assert identity.data == CONTENT.encode()
+    assert identity.headers["Vary"] == "Accept-Encoding"
+
+    gzipped = client.get("/static/screens.json", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(gzipped.data) == CONTENT.encode()
+
+    if compression.brotli is not None:
+        preferred = client.get(
+            "/static/screens.json", headers={"Accept-Encoding": "gzip, br"}
+        )
+        assert preferred.headers["Content-Encoding"] == "br"
+        assert compression.brotli.decompress(preferred.data) == CONTENT.encode()
+
+    # A variant older than the file was built from a previous content
+    os.utime(get_variant_path(screens_json_path, "gzip"), ns=(1, 1))
+
+    stale = client.get("/static/screens.json", headers={"Accept-Encoding": "gzip"})
+    assert stale.headers.get("Content-Encoding") is None
+    assert stale.data == CONTENT.encode()
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+from src.scraper.src.concurrency import AdaptiveConcurrency
+
+
+def test_slot_released_by_a_thread_wakes_up_a_coroutine():
+    concurrency = AdaptiveConcurrency(initial=1, maximum=1)
+    concurrency.acquire()
+
+    async def main():
+        waiter = asyncio.create_task(concurrency.async_acquire())
+        await asyncio.sleep(0.05)
+
+        threading.Thread(target=concurrency.release).start()
+        await asyncio.wait_for(waiter, timeout=2)
+
+    asyncio.run(main())
+
+    assert concurrency.in_flight == 1
+
+
+def test_coroutine_cancelled_once_woken_up_passes_its_slot_on():
+    concurrency = AdaptiveConcurrency(initial=1, maximum=1)
+    concurrency.acquire()
+
+    async def main():
+        cancelled = asyncio.create_task(concurrency.async_acquire())
+        waiter = asyncio.create_task(concurrency.async_acquire())
+        await asyncio.sleep(0)
+
+        # Wakes up the first coroutine, cancelled before it takes the slot
+        concurrency.release()
+        cancelled.cancel()
+
+        await asyncio.wait_for(waiter, timeout=2)
+        assert cancelled.cancelled()
+
+    asyncio.run(main())
+
+    assert concurrency.in_flight == 1
+    assert concurrency.waiting == 0
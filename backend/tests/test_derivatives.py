@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from flask import Flask
+
+from src.responses import send_static_file
+from src.scraper.src import derivatives
+from src.scraper.src.derivatives import (
+    generate_image_derivatives,
+    get_derivative,
+    get_derivative_path,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+WIDTHS = [320, 768, 1440]
+
+
+@pytest.fixture
+def image_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(derivatives, "DERIVATIVE_WIDTHS", WIDTHS)
+
+    image_path = tmp_path / "projects" / "1" / "screens" / "1" / "image.png"
+    image_path.parent.mkdir(parents=True)
+    Image.new("RGB", (1000, 2000), "white").save(image_path)
+
+    # The derivatives are written after the image
+    os.utime(image_path, ns=(1, 1))
+    generate_image_derivatives(image_path, WIDTHS, 80)
+
+    return image_path
+
+
+def test_narrowest_fresh_derivative_is_chosen(image_path):
+    with Image.open(get_derivative_path(image_path, 1440)) as derivative:
+        # Never upscaled
+        assert derivative.size == (1000, 2000)
+
+    with Image.open(get_derivative_path(image_path, 320)) as derivative:
+        assert derivative.size == (320, 640)
+
+    assert get_derivative(image_path, 200) == get_derivative_path(image_path, 320)
+    assert get_derivative(image_path, 400) == get_derivative_path(image_path, 768)
+    assert get_derivative(image_path, 2000) is None
+
+    # A new version of the image was downloaded
+    image_path.touch()
+    assert get_derivative(image_path, 400) is None
+
+
+def test_derivatives_are_sent_to_the_clients_accepting_webp(image_path, tmp_path):
+    app = Flask(__name__, static_url_path="/static", static_folder=tmp_path)
+    app.view_functions["static"] = send_static_file
+    client = app.test_client()
+
+    url = "/static/projects/1/screens/1/image.png?width=400"
+
+    webp = client.get(url, headers={"Accept": "image/webp,*/*"})
+    assert webp.mimetype == "image/webp"
+    assert webp.data == get_derivative_path(image_path, 768).read_bytes()
+    assert webp.headers["Vary"] == "Accept"
+
+    png = client.get(url, headers={"Accept": "*/*"})
+    assert png.mimetype == "image/png"
+    assert png.data == image_path.read_bytes()
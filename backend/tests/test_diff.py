@@ -0,0 +1,81 @@
+import json
+
+from src.scraper.src import diff
+
+
+def build_screen(screen_id, **fields):
+    return {
+        "id": screen_id,
+        "name": f"Screen {screen_id}",
+        "updatedAt": 1,
+        "imageVersion": 1,
+        "conversationCount": 0,
+        **fields,
+    }
+
+
+def test_screens_are_classified_by_their_most_significant_change():
+    local_screens = {
+        "screens": [build_screen(screen_id) for screen_id in [1, 2, 3, 4, 5]]
+    }
+    screens = {
+        "screens": [
+            build_screen(1),
+            build_screen(2, imageVersion=2, name="Renamed"),
+            build_screen(3, name="Renamed"),
+            build_screen(6),
+        ],
+        "archivedscreens": [build_screen(4, conversationCount=1)],
+    }
+
+    changes, stale_files = diff.diff_screens(screens, local_screens)
+
+    assert changes == {
+        "added": [6],
+        "removed": [5],
+        "image": [2],
+        "metadata": [3],
+        "conversations": [4],
+    }
+    assert stale_files == {
+        2: {"screen.json", "inspect.json", "history.json", "image.*", "thumbnail.*"},
+        3: {"screen.json"},
+        4: {"history.json"},
+    }
+
+
+def test_only_the_stale_files_are_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(diff.journal, "enabled", False)
+
+    project_folder = tmp_path / "projects" / "1"
+    screens_folder = project_folder / "screens"
+    file_names = ["screen.json", "screen.json.gz", "history.json", "image.png"]
+
+    for screen_id in [1, 2, 3]:
+        for file_name in file_names:
+            (screens_folder / str(screen_id)).mkdir(parents=True, exist_ok=True)
+            (screens_folder / str(screen_id) / file_name).write_text("{}")
+
+    with (project_folder / "screens.json").open("w") as f:
+        json.dump({"screens": [build_screen(1), build_screen(2), build_screen(3)]}, f)
+
+    changes = diff.apply_screen_changes(
+        {"screens": [build_screen(1), build_screen(2, name="Renamed")]},
+        project_folder,
+    )
+
+    assert changes["metadata"] == [2]
+    assert changes["removed"] == [3]
+
+    assert sorted(path.name for path in (screens_folder / "1").iterdir()) == sorted(
+        file_names
+    )
+    assert sorted(path.name for path in (screens_folder / "2").iterdir()) == [
+        "history.json",
+        "image.png",
+    ]
+    assert not (screens_folder / "3").exists()
+
+
+def test_project_never_scraped_has_no_changes(tmp_path):
+    assert diff.apply_screen_changes({"screens": []}, tmp_path) is None
@@ -0,0 +1,33 @@
+from bench.fake_invision import FakeInVision, start_fake_server
+from bench.scrape import ScrapeBenchmark
+
+
+def list_docs(docs_root):
+    return {
+        path.relative_to(docs_root).as_posix(): path.read_bytes()
+        for path in docs_root.glob("projects/**/*")
+        if path.is_file()
+    }
+
+
+def test_async_engine_writes_the_same_docs_as_the_threaded_one(tmp_path):
+    fake_options = {"project_count": 2, "screen_count": 3, "asset_size": 2000}
+    benchmark = ScrapeBenchmark(fake_options, tmp_path, ["--no-derivatives"])
+    docs = {}
+
+    for engine in ["threads", "async"]:
+        fake = FakeInVision(**fake_options)
+        server = start_fake_server(fake)
+
+        try:
+            result = benchmark.run_scraper(
+                fake, engine, tmp_path / engine, None, tmp_path / f"{engine}.log"
+            )
+        finally:
+            server.shutdown()
+
+        assert result["returncode"] == 0, (tmp_path / f"{engine}.log").read_text()
+        docs[engine] = list_docs(tmp_path / engine)
+
+    assert any(name.endswith("/image.png") for name in docs["async"])
+    assert docs["async"] == docs["threads"]
@@ -0,0 +1,58 @@
+from bench.fake_invision import FakeInVision, create_fake_app
+
+PROJECTS_URL = "/api:unifiedprojects.getProjects?isArchived=False"
+
+
+def log_in(client):
+    response = client.post(
+        "/login-api/api/v2/login", json={"email": "a@b.c", "password": "secret"}
+    )
+    assert response.status_code == 200
+
+
+def test_projects_are_revalidated_until_mutated():
+    fake = FakeInVision(project_count=4, screen_count=3, asset_size=1000)
+    client = create_fake_app(fake).test_client()
+
+    assert client.get(PROJECTS_URL).status_code == 401
+    log_in(client)
+
+    response = client.get(PROJECTS_URL)
+    etag = response.headers["ETag"]
+    assert len(response.get_json()["results"]) > 0
+
+    not_modified = client.get(PROJECTS_URL, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    assert client.post("/_fake/mutate?ratio=0.5").get_json()["projects"] == 2
+
+    modified = client.get(PROJECTS_URL, headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+    assert client.get("/_fake/stats").get_json()["notModified"] == 1
+
+
+def test_assets_are_public_and_stable():
+    fake = FakeInVision(project_count=1, asset_size=1000)
+    client = create_fake_app(fake).test_client()
+
+    first = client.get("/assets/screens/1/image.png")
+    second = client.get("/assets/screens/1/image.png")
+    other = client.get("/assets/screens/2/image.png")
+
+    assert first.status_code == 200
+    assert first.mimetype == "image/png"
+    assert first.data == second.data != other.data
+
+
+def test_faults_are_injected_at_the_configured_rates():
+    throttled = create_fake_app(
+        FakeInVision(project_count=1, throttle_rate=1, retry_after=2)
+    ).test_client()
+    response = throttled.get("/assets/screens/1/image.png")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+    failing = create_fake_app(FakeInVision(project_count=1, error_rate=1))
+    assert failing.test_client().get("/assets/screens/1/image.png").status_code == 503
@@ -0,0 +1,61 @@
+import time
+import runpy
+import signal
+import threading
+from types import SimpleNamespace
+from pathlib import Path
+
+from test_catalog import save_project
+
+from src.catalog import ProjectCatalog
+from src.scraper.src.lock import scrape_lock
+from src.scraper.src.generation import bump_generation
+
+GUNICORN_CONF_PATH = Path(__file__).parents[1] / "gunicorn.conf.py"
+
+
+class WorkersReloaded(Exception):
+    pass
+
+
+def test_workers_are_reloaded_once_the_scraping_is_over(tmp_path):
+    # The functions see the globals of the module, not the copy returned by run_path
+    conf = runpy.run_path(str(GUNICORN_CONF_PATH))["watch_generation"].__globals__
+    signals = []
+
+    def kill(pid, signal_number):
+        signals.append((pid, signal_number))
+
+        # Ends the watching loop
+        raise WorkersReloaded()
+
+    conf["CATALOG_RELOAD_DELAY"] = 0.01
+    conf["os"] = SimpleNamespace(kill=kill)
+
+    save_project(tmp_path, 1, "Home")
+    catalog = ProjectCatalog(tmp_path)
+    catalog.refresh(force=True)
+
+    server = SimpleNamespace(pid=1234, log=SimpleNamespace(info=lambda message: None))
+
+    def watch_generation():
+        try:
+            conf["watch_generation"](server, catalog)
+        except WorkersReloaded:
+            pass
+
+    watcher = threading.Thread(target=watch_generation, daemon=True)
+
+    with scrape_lock(tmp_path):
+        save_project(tmp_path, 2, "Checkout")
+        bump_generation(tmp_path)
+        watcher.start()
+        time.sleep(0.1)
+
+        # The workers refresh their own catalogs while the scraper runs
+        assert signals == []
+
+    watcher.join(timeout=5)
+
+    assert signals == [(1234, signal.SIGHUP)]
+    assert sorted(catalog.records) == ["1", "2"]
@@ -0,0 +1,68 @@
+import requests
+
+from src.scraper.src import api_requests
+from src.scraper.src.http_cache import HttpCache
+
+PROJECTS_URL = "https://projects.invisionapp.com/api/account/projects"
+
+
+def build_response(status_code, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = PROJECTS_URL
+
+    return response
+
+
+class RecordingSession(requests.Session):
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self.sent_headers = []
+
+    def get(self, *args, headers=None, **kwargs):
+        self.sent_headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_not_modified_response_is_served_from_the_cache(tmp_path, monkeypatch):
+    cache = HttpCache(tmp_path / "http-cache.sqlite")
+    monkeypatch.setattr(api_requests, "http_cache", cache)
+
+    session = RecordingSession(
+        [
+            build_response(
+                200,
+                b'{"projects": []}',
+                {"ETag": '"v1"', "Content-Type": "application/json"},
+            ),
+            build_response(304),
+        ]
+    )
+
+    first = api_requests.request(session, "GET", PROJECTS_URL)
+    second = api_requests.request(session, "GET", PROJECTS_URL)
+
+    assert session.sent_headers[0] == {}
+    assert session.sent_headers[1] == {"If-None-Match": '"v1"'}
+
+    assert first.json() == second.json() == {"projects": []}
+    assert second.status_code == 200
+    assert second.headers["X-Cache"] == "revalidated"
+    assert cache.stats == {"revalidated": 1, "stored": 1}
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = HttpCache(tmp_path / "http-cache.sqlite")
+    key = cache.get_key(PROJECTS_URL, {"page": 1})
+
+    cache.store(key, PROJECTS_URL, {"Content-Type": "application/json"}, b"{}")
+    assert cache.get(key) is None
+
+    cache.store(key, PROJECTS_URL, {"Last-Modified": "Sat, 17 Oct 2026"}, b"{}")
+    assert cache.get_conditional_headers(cache.get(key)) == {
+        "If-Modified-Since": "Sat, 17 Oct 2026"
+    }
+    assert key != cache.get_key(PROJECTS_URL, {"page": 2})
@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from src import jobs
+from src.jobs import ScrapeJobs
+from src.scraper.src.lock import ScraperAlreadyRunning, scrape_lock
+
+
+def test_one_job_runs_at_a_time_across_the_workers(tmp_path, monkeypatch):
+    scraping = threading.Event()
+    finished = threading.Event()
+
+    def run_scraper(option, engine):
+        scraping.set()
+        finished.wait(timeout=5)
+
+    monkeypatch.setattr(jobs, "run_scraper", run_scraper)
+
+    # The jobs of two workers of the API serving the same docs folder
+    worker_jobs = ScrapeJobs(tmp_path)
+    other_worker_jobs = ScrapeJobs(tmp_path)
+
+    job = worker_jobs.submit(option="update")
+    assert scraping.wait(timeout=5)
+
+    with pytest.raises(ScraperAlreadyRunning):
+        other_worker_jobs.submit()
+
+    with pytest.raises(ScraperAlreadyRunning):
+        worker_jobs.submit()
+
+    finished.set()
+    worker_jobs.executor.shutdown(wait=True)
+
+    assert worker_jobs.get(job["id"])["status"] == "succeeded"
+
+    other_job = other_worker_jobs.submit()
+    other_worker_jobs.executor.shutdown(wait=True)
+
+    assert other_worker_jobs.get(other_job["id"])["status"] == "succeeded"
+
+
+def test_jobs_are_rejected_during_a_command_line_scraping(tmp_path):
+    with scrape_lock(tmp_path):
+        with pytest.raises(ScraperAlreadyRunning):
+            ScrapeJobs(tmp_path).submit()
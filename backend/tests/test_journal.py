@@ -0,0 +1,30 @@
+from src.scraper.src.journal import ScrapeJournal
+
+
+def test_forgotten_folder_removes_only_the_units_below_it(tmp_path):
+    journal = ScrapeJournal(tmp_path / "journal.jsonl", tmp_path)
+    screens_folder = tmp_path / "projects" / "1" / "screens"
+
+    journal.record(screens_folder / "1" / "screen.json", "v1")
+    journal.record(screens_folder / "1" / "versions" / "2.png")
+    journal.record(screens_folder / "10" / "screen.json", "v1")
+
+    journal.forget(screens_folder / "1")
+
+    assert not journal.is_done(screens_folder / "1" / "screen.json", "v1")
+    assert not journal.is_done(screens_folder / "1" / "versions" / "2.png")
+    assert journal.is_done(screens_folder / "10" / "screen.json", "v1")
+
+    # Recorded again after being forgotten
+    journal.record(screens_folder / "1" / "screen.json", "v2")
+    journal.forget(screens_folder / "10" / "screen.json")
+
+    # The log replays to the same units
+    replayed = ScrapeJournal(tmp_path / "journal.jsonl", tmp_path)
+
+    for scrape_journal in [journal, replayed]:
+        assert scrape_journal.is_done(screens_folder / "1" / "screen.json", "v2")
+        assert not scrape_journal.is_done(screens_folder / "10" / "screen.json", "v1")
+
+    journal.forget(tmp_path / "projects")
+    assert journal.entries == {}
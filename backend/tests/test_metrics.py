@@ -0,0 +1,77 @@
+import time
+
+import pytest
+from flask import Flask
+
+from src import routes
+from src.scraper.src import metrics as metrics_module
+from src.scraper.src.metrics import ScrapeMetrics, get_endpoint, read_metrics
+from src.scraper.src.lock import scrape_lock
+
+API_URL = "https://projects.invisionapp.com"
+
+
+@pytest.mark.parametrize(
+    "url, endpoint",
+    [
+        (f"{API_URL}/api:unifiedprojects.getProjects?page=2", "getProjects"),
+        (f"{API_URL}/api:desktop_partials/screenQuickView", "screenQuickView"),
+        (f"{API_URL}/api/account/login", "login"),
+        (f"{API_URL}/d/main#/projects/1", "export"),
+        ("https://assets.invisionapp.com/screens/1.png?signature=abc", "assets"),
+    ],
+)
+def test_requests_are_labelled_by_endpoint(url, endpoint):
+    assert get_endpoint(url) == endpoint
+
+
+def test_metrics_are_exported_in_the_prometheus_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_module, "SCRAPER_METRICS_INTERVAL", 0.01)
+    metrics = ScrapeMetrics()
+
+    with metrics.recording(tmp_path):
+        with metrics.time_request("getProjects", "invisionapp.com") as sample:
+            sample["status"] = 200
+            sample["bytes"] = 512
+
+        metrics.record_response("getProjects", "invisionapp.com", 503, 3.0)
+        metrics.record_retry("getProjects", "invisionapp.com", 1.5)
+        time.sleep(0.05)
+
+        # Written while the scraping runs
+        assert read_metrics(tmp_path)["finishedAt"] is None
+
+    snapshot = read_metrics(tmp_path)
+    assert snapshot["finishedAt"] is not None
+    assert snapshot["endpoints"]["getProjects"] == {
+        **snapshot["endpoints"]["getProjects"],
+        "requests": 2,
+        "errors": 1,
+        "bytes": 512,
+        "retries": 1,
+        "retrySleepSeconds": 1.5,
+    }
+
+    app = Flask(__name__, static_folder=tmp_path)
+    app.register_blueprint(routes.scrape)
+
+    with scrape_lock(tmp_path):
+        response = app.test_client().get("/metrics")
+
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.mimetype == "text/plain"
+    assert "# TYPE scraper_request_duration_seconds histogram" in lines
+    assert (
+        'scraper_requests_total{endpoint="getProjects",host="invisionapp.com",status="503"} 1'
+        in lines
+    )
+    assert (
+        'scraper_request_duration_seconds_bucket{endpoint="getProjects",host="invisionapp.com",le="5.0"} 2'
+        in lines
+    )
+    assert (
+        'scraper_request_duration_seconds_bucket{endpoint="getProjects",host="invisionapp.com",le="2.5"} 1'
+        in lines
+    )
+    assert "scraper_running 1" in lines
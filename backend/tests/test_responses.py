@@ -0,0 +1,71 @@
+import os
+import json
+
+import pytest
+from flask import Flask
+
+from src.responses import send_static_file
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__, static_url_path="/static", static_folder=tmp_path)
+    app.view_functions["static"] = send_static_file
+
+    return app.test_client()
+
+
+def save_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.open("w") as f:
+        json.dump(data, f)
+
+
+def test_blob_store_is_not_served(client, tmp_path):
+    save_json(tmp_path / "common" / "blobs" / "index.json", {"url": "digest"})
+    save_json(tmp_path / "common" / "figma.json", {})
+
+    assert client.get("/static/common/figma.json").status_code == 200
+    assert client.get("/static/common/blobs/index.json").status_code == 404
+    assert client.get("/static/common/x/../blobs/index.json").status_code == 404
+
+
+def test_json_file_is_sent_as_stored_with_an_etag(client, tmp_path):
+    screen_json_path = tmp_path / "projects" / "1" / "screens" / "1" / "screen.json"
+    screen_json_path.parent.mkdir(parents=True)
+    screen_json_path.write_bytes(b'{"id":1,"name":"Home"}')
+
+    url = "/static/projects/1/screens/1/screen.json"
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.data == b'{"id":1,"name":"Home"}'
+    assert response.mimetype == "application/json"
+    assert response.headers["ETag"]
+
+    not_modified = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+
+    # Rewritten by the scraper
+    screen_json_path.write_bytes(b'{"id":1,"name":"Home page"}')
+    os.utime(screen_json_path, ns=(1, 1))
+
+    modified = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+    assert modified.status_code == 200
+    assert modified.data == b'{"id":1,"name":"Home page"}'
+
+
+def test_missing_json_file_is_not_found(client):
+    assert client.get("/static/projects/1/project.json").status_code == 404
+
+
+def test_hidden_files_are_not_served(client, tmp_path):
+    save_json(tmp_path / ".scrape-jobs" / "job.json", {"status": "running"})
+    (tmp_path / ".scrape-journal.jsonl").write_text("{}")
+    (tmp_path / ".generation").write_text("1")
+
+    assert client.get("/static/.scrape-jobs/job.json").status_code == 404
+    assert client.get("/static/.scrape-journal.jsonl").status_code == 404
+    assert client.get("/static/projects/../.generation").status_code == 404
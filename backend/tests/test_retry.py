@@ -0,0 +1,16 @@
+from src.scraper import main
+from src.scraper.src.retry import retry_policy
+
+
+def test_run_scraper_resets_retry_budgets(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "DOCS_ROOT", str(tmp_path))
+    monkeypatch.setattr(main, "scrape", lambda option, engine: None)
+
+    # A previous scraping of the process used up the budget of its host
+    while retry_policy.get_retry_delay("example.com", 0, "0") is not None:
+        pass
+
+    main.run_scraper()
+
+    assert retry_policy.summary() == {}
+    assert retry_policy.get_retry_delay("example.com", 0, "0") == 0.0
@@ -0,0 +1,23 @@
+import pytest
+
+from src.scraper import main
+from src.scraper.src.journal import ScrapeJournal
+
+
+def test_failed_scraping_unloads_the_journal(tmp_path, monkeypatch):
+    journal = ScrapeJournal(tmp_path / ".scrape-journal.jsonl", tmp_path)
+    monkeypatch.setattr(main, "journal", journal)
+    monkeypatch.setattr(main, "login_classic", lambda *args: None)
+    monkeypatch.setattr(main, "login_api", lambda *args: None)
+
+    def browse_projects(session, option):
+        journal.record(tmp_path / "projects" / "1" / "project.json")
+        raise RuntimeError("Browsing failed")
+
+    monkeypatch.setattr(main, "browse_projects", browse_projects)
+
+    with pytest.raises(RuntimeError):
+        main.scrape(None, "threads")
+
+    assert journal.entries is None
+    assert journal.path.exists()
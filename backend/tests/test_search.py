@@ -0,0 +1,25 @@
+from src.search import NgramIndex
+
+
+def test_names_are_searched_by_substring():
+    index = NgramIndex({1: "Café Menu", 2: "Checkout", 3: "Œuvre", 4: "Home"})
+
+    assert index.search("") == {1, 2, 3, 4}
+    assert index.search("e") == {1, 2, 3, 4}
+    assert index.search("ho") == {4}
+    assert index.search("CAFE") == {1}
+    assert index.search("café m") == {1}
+    assert index.search("oeuv") == {3}
+    assert index.search("menus") == set()
+
+
+def test_renamed_and_removed_names_are_searched_again():
+    index = NgramIndex({1: "Home", 2: "Homepage"})
+
+    index.add(1, "Landing")
+    index.remove(2)
+
+    assert index.search("home") == set()
+    assert index.search("landing") == {1}
+    assert index.search("an") == {1}
+    assert "hom" not in index.ngrams
@@ -0,0 +1,65 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.scraper.src import session as session_module
+from src.scraper.src.concurrency import AdaptiveConcurrency
+from src.scraper.src.session import PoolFullCounter, create_session, get_pool_stats
+
+
+def test_pools_hold_a_connection_per_request_in_flight(monkeypatch):
+    monkeypatch.setattr(session_module, "concurrency", AdaptiveConcurrency(maximum=48))
+    monkeypatch.setattr(session_module, "SCRAPER_POOL_SIZE", None)
+    monkeypatch.setattr(
+        session_module, "SCRAPER_POOL_SIZES", "assets.invisionapp.com=128"
+    )
+
+    with create_session() as session:
+        assert (
+            session.get_adapter("https://projects.invisionapp.com")._pool_maxsize == 48
+        )
+        assert (
+            session.get_adapter("https://assets.invisionapp.com/a.png")._pool_maxsize
+            == 128
+        )
+
+
+def test_pool_full_counter_counts_the_discarded_connections():
+    counter = PoolFullCounter()
+    logger = logging.getLogger("test.connectionpool")
+    logger.addHandler(counter)
+
+    logger.warning("Connection pool is full, discarding connection: %s", "host")
+    logger.warning("Retrying")
+
+    assert counter.count == 1
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_pool_stats_count_the_kept_alive_connections():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with create_session() as session:
+            for _ in range(3):
+                session.get(f"http://127.0.0.1:{server.server_port}/")
+
+            pool_stats = get_pool_stats(session)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert pool_stats["127.0.0.1"] == {"requests": 3, "connections": 1, "reused": 2}
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import threading
+
+from flask import Flask
+
+from src import timing
+
+
+def test_concurrent_requests_are_profiled_one_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(timing, "API_PROFILE", True)
+    monkeypatch.setattr(timing, "API_PROFILE_SLOW_MS", 0)
+    monkeypatch.setattr(timing, "API_PROFILE_DIR", tmp_path)
+
+    app = Flask(__name__)
+    timing.init_timing(app)
+    barrier = threading.Barrier(4)
+
+    @app.get("/slow")
+    def slow():
+        barrier.wait(timeout=5)
+        time.sleep(0.05)
+
+        return "ok"
+
+    @app.get("/fast")
+    def fast():
+        return "ok"
+
+    responses = []
+
+    def send_request():
+        responses.append(app.test_client().get("/slow"))
+
+    threads = [threading.Thread(target=send_request) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert sum("X-Profile-File" in response.headers for response in responses) == 1
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+    # The profiler is free again once the requests are done
+    assert "X-Profile-File" in app.test_client().get("/fast").headers
+
+
+def test_stats_are_written_in_the_background_per_docs_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(timing, "API_STATS_DIR", None)
+    monkeypatch.setattr(timing, "API_STATS_FLUSH_INTERVAL", 0.2)
+    monkeypatch.setattr(timing.tempfile, "gettempdir", lambda: str(tmp_path))
+
+    apps = [Flask(__name__, static_folder=tmp_path / name) for name in ["docs", "demo"]]
+
+    def ping():
+        return "ok"
+
+    for app in apps:
+        timing.init_timing(app)
+        app.add_url_rule("/ping", view_func=ping)
+
+    stats_dir, other_stats_dir = [
+        app.extensions["route_stats"].stats_dir for app in apps
+    ]
+    assert stats_dir != other_stats_dir
+
+    # The stats of an exited worker of the other app, above the largest pid
+    other_stats_dir.mkdir()
+    (other_stats_dir / "4194305.json").write_text("{}")
+
+    apps[0].test_client().get("/ping")
+    stats_path = stats_dir / f"{os.getpid()}.json"
+
+    # Not written by the request itself
+    assert not stats_path.exists()
+
+    deadline = time.monotonic() + 5
+    while not stats_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert json.loads(stats_path.read_text())["ping"]["count"] == 1
+    assert apps[0].extensions["route_stats"].summary()["processes"] == 1
+    assert (other_stats_dir / "4194305.json").exists()
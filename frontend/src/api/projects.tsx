@@ -6,6 +6,7 @@ export interface FetchProjectsParams {
   type?: 'board' | 'prototype' | 'archived';
   tag?: Tag['id'];
   page?: number;
+  cursor?: string;
   limit?: number;
   search?: string;
   sort?: 'updatedAt' | 'name';
@@ -18,6 +19,7 @@ export interface FetchProjectsResponse {
   page: number;
   previousPage: number;
   nextPage: number;
+  nextCursor: string | null;
 }
 
 export const fetchProjects: QueryFunction<